@@ -3,16 +3,27 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from streamlit_option_menu import option_menu
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import json
 from datetime import datetime
 import os
 import base64
+import functools
+import time
+import uuid
 
 # Import custom modules
-from utils.calculations import UnitEconomicsCalculator
+from utils.calculations import UnitEconomicsCalculator, shared_calculator
 from utils.data_models import MarketplaceData, BusinessMetrics
 from utils.export import ExportManager
+from utils.profiling import TRACING_HOOKS, RerunTimer, Tracer, instrument
+from utils.session import CalculatorSession
+from utils import snapshot
+from utils.telemetry import DEFAULT_DB_PATH, TelemetryStore, session_state_size
 from data.marketplace_data import MARKETPLACE_COMMISSIONS, BENCHMARKS
+from pages.portfolio import create_portfolio_dashboard
+import pages.dashboard
+import pages.portfolio
 
 # Configure page
 st.set_page_config(
@@ -22,13 +33,122 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Глубина истории отмены изменений (UNIT_ECON_UNDO_STEPS, по умолчанию история выключена)
+UNDO_STEPS = int(os.environ.get('UNIT_ECON_UNDO_STEPS', '0') or 0)
+
 # Initialize session state
 if 'calculator_data' not in st.session_state:
-    st.session_state.calculator_data = {}
+    st.session_state.calculator_data = CalculatorSession(history_size=UNDO_STEPS)
 if 'current_step' not in st.session_state:
     st.session_state.current_step = 1
 if 'completed_steps' not in st.session_state:
     st.session_state.completed_steps = set()
+if 'rerun_timer' not in st.session_state:
+    st.session_state.rerun_timer = RerunTimer()
+
+# Трассировка по функциям (включается в боковой панели или UNIT_ECON_TRACE=1)
+TRACING_HOOKS.add(UnitEconomicsCalculator, 'calculations')
+TRACING_HOOKS.add(pages.dashboard, 'dashboard', prefix='show_')
+TRACING_HOOKS.add(pages.portfolio, 'dashboard', prefix='show_')
+if 'tracer' not in st.session_state:
+    st.session_state.tracer = Tracer(TRACING_HOOKS)
+    st.session_state.tracer.set_enabled(os.environ.get('UNIT_ECON_TRACE') == '1')
+if 'telemetry_session_id' not in st.session_state:
+    st.session_state.telemetry_session_id = uuid.uuid4().hex
+
+@st.cache_resource
+def get_telemetry_store():
+    """
+    Хранилище телеметрии, общее для всех сессий
+    
+    UNIT_ECON_TELEMETRY=1 - запись в telemetry.sqlite3, другое значение - путь
+    к базе; без переменной телеметрия выключена.
+    """
+    setting = os.environ.get('UNIT_ECON_TELEMETRY', '')
+    if setting in ('', '0'):
+        return None
+    return TelemetryStore(DEFAULT_DB_PATH if setting == '1' else setting)
+
+def record_telemetry(scope, wall_ms, page=None, page_ms=None):
+    """Запись времени перезапуска и размера состояния сессии"""
+    store = get_telemetry_store()
+    if store is None:
+        return
+    store.record(
+        st.session_state.telemetry_session_id,
+        scope,
+        wall_ms,
+        page=page,
+        page_ms=page_ms,
+        state_sizes=session_state_size(st.session_state)
+    )
+
+def step_fragment(step: int):
+    """
+    Оформляет панели этапа как фрагмент Streamlit.
+
+    Взаимодействие с виджетом внутри фрагмента перезапускает только сам
+    фрагмент, а не весь скрипт (боковую панель, навигацию и прочие графики).
+    Поля ввода и живые метрики этапа находятся в одном фрагменте: Streamlit
+    перезапускает только фрагмент, которому принадлежит виджет, поэтому
+    метрики в отдельном фрагменте не увидели бы новые значения.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            scope = f"fragment:step_{step}"
+            ctx = get_script_run_ctx()
+            if ctx is None or not ctx.fragment_ids_this_run:
+                # Фрагмент выполняется в составе полного перезапуска: время уже входит в script:step_N
+                with st.session_state.tracer.rerun(scope):
+                    return func(*args, **kwargs)
+            
+            start = time.perf_counter()
+            with st.session_state.rerun_timer.measure(scope), st.session_state.tracer.rerun(scope):
+                result = func(*args, **kwargs)
+            record_telemetry(scope, (time.perf_counter() - start) * 1000, page="Калькулятор")
+            return result
+        return st.fragment(wrapper)
+    return decorator
+
+def show_tracing_panel():
+    """Отладочная панель трассировки: вызовы и время по функциям за перезапуск"""
+    tracer = st.session_state.tracer
+    
+    with st.expander("🔬 Профилирование"):
+        st.toggle(
+            "Трассировка функций",
+            value=tracer.enabled,
+            key="tracing_enabled",
+            on_change=lambda: tracer.set_enabled(st.session_state.tracing_enabled)
+        )
+        
+        rerun = tracer.last_rerun()
+        if not tracer.enabled or rerun is None:
+            st.caption("Включите трассировку и выполните действие в приложении")
+            return
+        
+        st.caption(
+            f"Предыдущий перезапуск ({rerun['label']}): {rerun['duration_ms']:.1f} мс, "
+            f"вне функций (виджеты, Streamlit): {tracer.untraced_ms(rerun):.1f} мс"
+        )
+        st.dataframe(pd.DataFrame([
+            {
+                'Функция': entry['name'],
+                'Категория': entry['category'],
+                'Вызовов': entry['calls'],
+                'Всего (мс)': round(entry['total_ms'], 2),
+                'Макс. (мс)': round(entry['max_ms'], 2)
+            }
+            for entry in tracer.rerun_stats(rerun)
+        ]), hide_index=True)
+        
+        st.download_button(
+            label="📥 Chrome trace (JSON)",
+            data=json.dumps(tracer.chrome_trace()),
+            file_name="unit_economics_trace.json",
+            mime="application/json"
+        )
 
 def validate_current_step():
     """Проверяет валидность текущего шага и необходимые данные."""
@@ -96,11 +216,16 @@ def main():
         
         # Кнопка сброса данных
         if st.button("🔄 Сбросить все данные"):
-            st.session_state.calculator_data = {}
+            load_calculator_data(CalculatorSession(history_size=UNDO_STEPS))
             st.session_state.current_step = 1
             st.session_state.completed_steps = set()
             st.rerun()
         
+        # Отмена последнего изменения введенных данных
+        if UNDO_STEPS:
+            st.button("↩️ Отменить изменение", on_click=undo_last_change,
+                      disabled=not st.session_state.calculator_data.can_undo)
+        
         # Сохранение и загрузка расчетов
         st.subheader("Сохранение/Загрузка")
         
@@ -112,9 +237,33 @@ def main():
             else:
                 st.error("❌ Нет данных для сохранения")
         
+        # Бинарный снимок: вводы, результаты и прогресс мастера
+        if st.button("⚡ Снимок сессии", disabled=not st.session_state.calculator_data):
+            st.download_button(
+                "⬇️ Скачать снимок",
+                data=snapshot.dumps(st.session_state.calculator_data, st.session_state.current_step,
+                                    st.session_state.completed_steps),
+                file_name=f"unit_economics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{snapshot.SNAPSHOT_EXTENSION}",
+                mime="application/octet-stream"
+            )
+        
         # Загрузка расчетов
-        uploaded_file = st.file_uploader("📂 Загрузить расчет", type=["json"])
-        if uploaded_file is not None:
+        uploaded_file = st.file_uploader("📂 Загрузить расчет", type=["json", snapshot.SNAPSHOT_EXTENSION])
+        # Файл остается в загрузчике: расчет восстанавливается из него один раз
+        if uploaded_file is not None and st.session_state.get('restored_file') == uploaded_file.file_id:
+            pass
+        elif uploaded_file is not None and snapshot.is_snapshot(uploaded_file.name):
+            try:
+                # Снимок той же версии движка восстанавливается без пересчета
+                (calculator_data, st.session_state.current_step,
+                 st.session_state.completed_steps) = snapshot.loads(uploaded_file.getvalue(), history_size=UNDO_STEPS)
+                load_calculator_data(calculator_data)
+                st.session_state.restored_file = uploaded_file.file_id
+                st.success(f"✅ Снимок восстановлен (шаг {st.session_state.current_step} из 10)")
+                st.rerun()
+            except (ValueError, ImportError) as e:
+                st.error(f"❌ Ошибка при загрузке снимка: {e}")
+        elif uploaded_file is not None:
             try:
                 data = json.load(uploaded_file)
                 
@@ -122,7 +271,9 @@ def main():
                 metadata = data.pop('_metadata', {})
                 
                 # Обновляем данные калькулятора
-                st.session_state.calculator_data = data
+                load_calculator_data(CalculatorSession.from_dict(
+                    data, has_results=metadata.get('has_results', False), history_size=UNDO_STEPS
+                ))
                 
                 # Восстанавливаем состояние шагов из метаданных
                 if 'current_step' in metadata:
@@ -178,17 +329,35 @@ def main():
                     st.session_state.completed_steps = completed_steps
                     st.session_state.current_step = max_step
                 
+                st.session_state.restored_file = uploaded_file.file_id
                 st.success(f"✅ Данные успешно загружены (шаг {st.session_state.current_step} из 10)")
                 st.rerun()
             except Exception as e:
                 st.error(f"❌ Ошибка при загрузке файла: {e}")
                 st.exception(e)  # Показываем подробности ошибки для отладки
+        
+        # Время перезапусков: весь скрипт против фрагмента этапа
+        with st.expander("⏱ Время перезапусков"):
+            comparison = st.session_state.rerun_timer.compare_steps()
+            if comparison:
+                st.dataframe(pd.DataFrame([
+                    {
+                        'Этап': step,
+                        'Весь скрипт (мс)': round(timings.get('script_ms', 0), 1),
+                        'Фрагмент (мс)': round(timings.get('fragment_ms', 0), 1)
+                    }
+                    for step, timings in comparison.items()
+                ]), hide_index=True)
+            else:
+                st.caption("Нет данных о перезапусках")
+        
+        show_tracing_panel()
     
     # Navigation menu
     selected = option_menu(
         menu_title=None,
-        options=["Калькулятор", "Дашборд", "Методология", "Экспорт"],
-        icons=["calculator", "graph-up", "book", "download"],
+        options=["Калькулятор", "Дашборд", "Портфель", "Методология", "Экспорт"],
+        icons=["calculator", "graph-up", "collection", "book", "download"],
         menu_icon="cast",
         default_index=0,
         orientation="horizontal",
@@ -205,14 +374,19 @@ def main():
         },
     )
     
+    page_start = time.perf_counter()
     if selected == "Калькулятор":
         calculator_page()
     elif selected == "Дашборд":
         dashboard_page()
+    elif selected == "Портфель":
+        create_portfolio_dashboard()
     elif selected == "Методология":
         methodology_page()
     elif selected == "Экспорт":
         export_page()
+    
+    return selected, (time.perf_counter() - page_start) * 1000
 
 def calculator_page():
     st.header("📋 10-этапный расчет юнит-экономики")
@@ -379,9 +553,19 @@ def step_3_cost_structure():
         quality_control = st.number_input("Контроль качества (₽):", min_value=0.0, step=1.0, key="quality_control")
         certification = st.number_input("Сертификация (₽ на единицу):", min_value=0.0, step=1.0, key="certification")
     
+    # Save data (себестоимость считается в сессии по формуле STEP_RESULTS)
+    data = st.session_state.calculator_data
+    data.update({
+        'purchase_cost': purchase_cost,
+        'packaging_cost': packaging_cost,
+        'labeling_cost': labeling_cost,
+        'quality_control': quality_control,
+        'certification': certification
+    })
+    
     with col2:
-        total_cost = purchase_cost + packaging_cost + labeling_cost + quality_control + certification
-        selling_price = st.session_state.calculator_data.get('selling_price', 0)
+        total_cost = data['total_cost']
+        selling_price = data.get('selling_price', 0)
         
         st.metric("Общая себестоимость", f"{total_cost:,.0f} ₽")
         
@@ -401,20 +585,14 @@ def step_3_cost_structure():
         st.write("• Одежда: 50-70%")
         st.write("• Товары для дома: 40-60%")
         st.write("• Красота и здоровье: 60-80%")
-    
-    # Save data
-    st.session_state.calculator_data.update({
-        'purchase_cost': purchase_cost,
-        'packaging_cost': packaging_cost,
-        'labeling_cost': labeling_cost,
-        'quality_control': quality_control,
-        'certification': certification,
-        'total_cost': total_cost
-    })
 
 def step_4_marketplace_costs():
     st.subheader("🏪 Этап 4: Расходы маркетплейса")
-    
+    _step_4_panels()
+
+@step_fragment(4)
+def _step_4_panels():
+    """Панель ввода и живые метрики этапа 4 (перезапускаются отдельно от страницы)"""
     marketplace = st.session_state.calculator_data.get('marketplace', 'OZON')
     category = st.session_state.calculator_data.get('category', 'Электроника')
     selling_price = st.session_state.calculator_data.get('selling_price', 0)
@@ -452,47 +630,49 @@ def step_4_marketplace_costs():
         
         payment_processing = st.slider("Эквайринг (%)", min_value=1.0, max_value=5.0, value=2.5, step=0.1, key="payment_processing")
     
+    # Save data (комиссии и итог считаются в сессии по формулам STEP_RESULTS)
+    data = st.session_state.calculator_data
+    data.update({
+        'commission_rate': commission_rate,
+        'fulfillment_cost': fulfillment_cost,
+        'storage_days': storage_days,
+        'storage_total': storage_days * storage_cost_per_day,
+        'payment_processing': payment_processing
+    })
+    
     with col2:
         st.write("#### Расчет общих расходов")
         
-        commission_amount = selling_price * (commission_rate / 100)
-        storage_total = storage_days * storage_cost_per_day
-        payment_amount = selling_price * (payment_processing / 100)
+        commission_amount = data.get('commission_amount', 0)
+        storage_total = data['storage_total']
+        payment_amount = data.get('payment_amount', 0)
         
         st.metric("Комиссия маркетплейса", f"{commission_amount:,.0f} ₽")
         st.metric("Фулфилмент", f"{fulfillment_cost:,.0f} ₽")
         st.metric("Хранение", f"{storage_total:,.0f} ₽")
         st.metric("Эквайринг", f"{payment_amount:,.0f} ₽")
         
-        total_marketplace_costs = commission_amount + fulfillment_cost + storage_total + payment_amount
+        # Итог включает обязательную маркетинговую комиссию OZON
+        total_marketplace_costs = data.get('total_marketplace_costs', 0)
         st.metric("**Всего расходов МП**", f"{total_marketplace_costs:,.0f} ₽")
         
         if marketplace == "OZON":
             st.warning("⚠️ **Дополнительные расходы OZON:**")
-            mandatory_marketing = selling_price * 0.02  # 2% обязательная маркетинговая комиссия
+            mandatory_marketing = data.get('mandatory_marketing', 0)
             st.write(f"• Обязательная маркетинговая комиссия: {mandatory_marketing:,.0f} ₽")
-            total_marketplace_costs += mandatory_marketing
         
         # Calculate percentage of selling price
         if selling_price > 0:
             percentage = (total_marketplace_costs / selling_price) * 100
             st.metric("% от цены продажи", f"{percentage:.1f}%")
-    
-    # Save data
-    st.session_state.calculator_data.update({
-        'commission_rate': commission_rate,
-        'commission_amount': commission_amount,
-        'fulfillment_cost': fulfillment_cost,
-        'storage_days': storage_days,
-        'storage_total': storage_total,
-        'payment_processing': payment_processing,
-        'payment_amount': payment_amount,
-        'total_marketplace_costs': total_marketplace_costs
-    })
 
 def step_5_marketing_costs():
     st.subheader("📈 Этап 5: Маркетинговые расходы")
-    
+    _step_5_panels()
+
+@step_fragment(5)
+def _step_5_panels():
+    """Панель ввода и живые метрики этапа 5"""
     selling_price = st.session_state.calculator_data.get('selling_price', 0)
     
     col1, col2 = st.columns(2)
@@ -517,16 +697,27 @@ def step_5_marketing_costs():
         influencer_marketing = st.number_input("Инфлюенсер-маркетинг (₽ на единицу):", min_value=0.0, step=1.0, key="influencer_marketing")
         content_creation = st.number_input("Создание контента (₽ на единицу):", min_value=0.0, step=1.0, value=50.0, key="content_creation")
     
+    # Save data (расходы на единицу и CAC считаются в сессии по формулам STEP_RESULTS)
+    data = st.session_state.calculator_data
+    data.update({
+        'ppc_budget_percent': ppc_budget_percent,
+        'avg_cpc': avg_cpc,
+        'conversion_rate': conversion_rate,
+        'external_marketing': external_marketing,
+        'influencer_marketing': influencer_marketing,
+        'content_creation': content_creation
+    })
+    
     with col2:
         st.write("#### Анализ эффективности")
         
-        ppc_cost_per_unit = selling_price * (ppc_budget_percent / 100)
-        cac_ppc = avg_cpc / (conversion_rate / 100) if conversion_rate > 0 else 0
+        ppc_cost_per_unit = data.get('ppc_cost_per_unit', 0)
+        cac_ppc = data['cac_ppc']
         
         st.metric("PPC расходы на единицу", f"{ppc_cost_per_unit:,.0f} ₽")
         st.metric("CAC (только PPC)", f"{cac_ppc:,.0f} ₽")
         
-        total_marketing_costs = ppc_cost_per_unit + external_marketing + influencer_marketing + content_creation
+        total_marketing_costs = data.get('total_marketing_costs', 0)
         st.metric("**Общие маркетинговые расходы**", f"{total_marketing_costs:,.0f} ₽")
         
         if selling_price > 0:
@@ -544,23 +735,14 @@ def step_5_marketing_costs():
         st.write("• Новый продукт: 20-35% от оборота")
         st.write("• Зрелый продукт: 10-20% от оборота")
         st.write("• Премиум сегмент: 15-25% от оборота")
-    
-    # Save data
-    st.session_state.calculator_data.update({
-        'ppc_budget_percent': ppc_budget_percent,
-        'ppc_cost_per_unit': ppc_cost_per_unit,
-        'avg_cpc': avg_cpc,
-        'conversion_rate': conversion_rate,
-        'cac_ppc': cac_ppc,
-        'external_marketing': external_marketing,
-        'influencer_marketing': influencer_marketing,
-        'content_creation': content_creation,
-        'total_marketing_costs': total_marketing_costs
-    })
 
 def step_6_operational_costs():
     st.subheader("⚙️ Этап 6: Операционные расходы")
-    
+    _step_6_panels()
+
+@step_fragment(6)
+def _step_6_panels():
+    """Панель ввода и живые метрики этапа 6"""
     col1, col2 = st.columns(2)
     
     with col1:
@@ -609,15 +791,29 @@ def step_6_operational_costs():
         return_rate = st.slider("Процент возвратов (%):", min_value=0.0, max_value=50.0, value=8.0, step=1.0, key="return_rate")
         return_cost = st.number_input("Стоимость обработки возврата (₽):", min_value=0.0, step=1.0, value=100.0, key="return_cost")
     
+    # Save data (возвраты и итог считаются в сессии по формулам STEP_RESULTS)
+    data = st.session_state.calculator_data
+    data.update({
+        'staff_costs': staff_costs,
+        'office_rent': office_rent,
+        'software_subscriptions': software_subscriptions,
+        'customer_service': customer_service,
+        'return_rate': return_rate,
+        'return_cost': return_cost,
+        'monthly_sales_volume': monthly_sales_volume,
+        'fixed_cost_per_unit': fixed_cost_per_unit,
+        'expense_input_method': expense_input_method  # Сохраняем выбранный метод ввода
+    })
+    
     with col2:
         st.write("#### Расчет операционных расходов на единицу")
         
         # Fixed costs per unit уже рассчитаны выше
         
         # Variable costs per unit
-        return_cost_per_unit = (return_rate / 100) * return_cost
+        return_cost_per_unit = data['return_cost_per_unit']
         
-        total_operational_costs = fixed_cost_per_unit + customer_service + return_cost_per_unit
+        total_operational_costs = data['total_operational_costs']
         
         st.metric("Постоянные расходы на единицу", f"{fixed_cost_per_unit:,.0f} ₽")
         st.metric("Обработка заказа", f"{customer_service:,.0f} ₽")
@@ -656,21 +852,6 @@ def step_6_operational_costs():
                 labels={"x": "Объем продаж", "y": "Расходы на единицу (₽)"}
             )
             st.plotly_chart(fig_volume, use_container_width=True)
-    
-    # Save data
-    st.session_state.calculator_data.update({
-        'staff_costs': staff_costs,
-        'office_rent': office_rent,
-        'software_subscriptions': software_subscriptions,
-        'customer_service': customer_service,
-        'return_rate': return_rate,
-        'return_cost': return_cost,
-        'monthly_sales_volume': monthly_sales_volume,
-        'fixed_cost_per_unit': fixed_cost_per_unit,
-        'return_cost_per_unit': return_cost_per_unit,
-        'total_operational_costs': total_operational_costs,
-        'expense_input_method': expense_input_method  # Сохраняем выбранный метод ввода
-    })
 
 def step_7_ltv_cac_analysis():
     st.subheader("👥 Этап 7: Анализ LTV/CAC")
@@ -699,6 +880,11 @@ def step_7_ltv_cac_analysis():
         ```
         """)
     
+    _step_7_panels()
+
+@step_fragment(7)
+def _step_7_panels():
+    """Панель ввода и живые метрики этапа 7"""
     col1, col2 = st.columns(2)
     
     with col1:
@@ -730,20 +916,25 @@ def step_7_ltv_cac_analysis():
                                         key="referral_bonus",
                                         help="Средний доход от новых клиентов, привлеченных по рекомендации одного существующего клиента")
     
+    # Save data (LTV, соотношение и окупаемость считаются в сессии по формулам STEP_RESULTS)
+    data = st.session_state.calculator_data
+    selling_price = data.get('selling_price', 0)
+    data.update({
+        'repeat_purchase_rate': repeat_purchase_rate,
+        'avg_purchases_per_year': avg_purchases_per_year,
+        'customer_lifespan_months': customer_lifespan_months,
+        'cross_sell_revenue': cross_sell_revenue,
+        'referral_bonus': referral_bonus,
+        # CAC calculation (simplified - should include all acquisition costs)
+        'cac': data.get('total_marketing_costs', 0)
+    })
+    
     with col2:
         st.write("#### Расчет LTV и CAC")
         
-        selling_price = st.session_state.calculator_data.get('selling_price', 0)
-        total_marketing_costs = st.session_state.calculator_data.get('total_marketing_costs', 0)
-        
         # LTV calculation
-        purchases_per_customer = (customer_lifespan_months / 12) * avg_purchases_per_year
-        repeat_customers = repeat_purchase_rate / 100
-        
-        ltv = (selling_price * purchases_per_customer + cross_sell_revenue + referral_bonus)
-        
-        # CAC calculation (simplified - should include all acquisition costs)
-        cac = total_marketing_costs  # This is a simplified version
+        ltv = data.get('ltv', 0)
+        cac = data['cac']
         
         st.metric("LTV (Customer Lifetime Value)", 
                  f"{ltv:,.0f} ₽",
@@ -754,7 +945,7 @@ def step_7_ltv_cac_analysis():
                  help="Стоимость привлечения одного клиента")
         
         if cac > 0:
-            ltv_cac_ratio = ltv / cac
+            ltv_cac_ratio = data.get('ltv_cac_ratio', 0)
             st.metric("LTV/CAC соотношение", 
                      f"{ltv_cac_ratio:.1f}",
                      help="Отношение пожизненной ценности клиента к стоимости его привлечения")
@@ -766,7 +957,7 @@ def step_7_ltv_cac_analysis():
             else:
                 st.error("🔴 Низкое соотношение LTV/CAC (<2)")
         
-        payback_period = cac / (selling_price * avg_purchases_per_year / 12) if selling_price > 0 and avg_purchases_per_year > 0 else 0
+        payback_period = data.get('payback_period', 0)
         st.metric("Период окупаемости", 
                  f"{payback_period:.1f} мес.",
                  help="Сколько месяцев требуется, чтобы окупить затраты на привлечение клиента")
@@ -820,20 +1011,6 @@ def step_7_ltv_cac_analysis():
         )
         
         st.plotly_chart(fig_ltv, use_container_width=True)
-    
-    # Save data
-    st.session_state.calculator_data.update({
-        'repeat_purchase_rate': repeat_purchase_rate,
-        'avg_purchases_per_year': avg_purchases_per_year,
-        'customer_lifespan_months': customer_lifespan_months,
-        'cross_sell_revenue': cross_sell_revenue,
-        'referral_bonus': referral_bonus,
-        'ltv': ltv,
-        'cac': cac,
-        'ltv_cac_ratio': ltv_cac_ratio if cac > 0 else 0,
-        'payback_period': payback_period,
-        'purchases_per_customer': purchases_per_customer
-    })
 
 def step_8_profit_analysis():
     st.subheader("💎 Этап 8: Анализ прибыльности")
@@ -859,9 +1036,14 @@ def step_8_profit_analysis():
         ```
         """)
     
+    _step_8_panels()
+
+@step_fragment(8)
+def _step_8_panels():
+    """Расчет и графики этапа 8"""
     try:
         # Calculate unit economics
-        calculator = UnitEconomicsCalculator()
+        calculator = shared_calculator()
         result = calculator.calculate_unit_economics(st.session_state.calculator_data)
         
         col1, col2 = st.columns(2)
@@ -1067,9 +1249,13 @@ def step_8_profit_analysis():
 
 def step_9_scenario_planning():
     st.subheader("🎯 Этап 9: Сценарное планирование")
-    
+    _step_9_panels()
+
+@step_fragment(9)
+def _step_9_panels():
+    """Панель сценариев и сравнение результатов этапа 9"""
     base_data = st.session_state.calculator_data
-    calculator = UnitEconomicsCalculator()
+    calculator = shared_calculator()
     
     # Scenario definitions
     scenarios = {
@@ -1225,7 +1411,7 @@ def step_10_recommendations():
     st.subheader("🎯 Этап 10: Рекомендации и план действий")
     
     data = st.session_state.calculator_data
-    calculator = UnitEconomicsCalculator()
+    calculator = shared_calculator()
     recommendations = calculator.generate_recommendations(data)
     
     col1, col2 = st.columns(2)
@@ -1339,7 +1525,7 @@ def dashboard_page():
         st.warning("⚠️ Сначала выполните расчет в калькуляторе")
         return
     
-    data = st.session_state.calculator_data
+    data = st.session_state.calculator_data.copy()
     
     # Key metrics overview
     col1, col2, col3, col4 = st.columns(4)
@@ -1386,12 +1572,11 @@ def dashboard_page():
                 'Операционные': data.get('operational_costs', 0)
             }
             
-            fig_costs = px.pie(
+            pages.dashboard.show_cached_chart('overview_costs', costs, lambda: px.pie(
                 values=list(costs.values()),
                 names=list(costs.keys()),
                 title="Структура затрат"
-            )
-            st.plotly_chart(fig_costs, use_container_width=True)
+            ))
     
     with col2:
         # Scenario comparison
@@ -1400,13 +1585,12 @@ def dashboard_page():
             scenario_names = list(scenarios.keys())
             profits = [scenarios[name]['unit_profit'] for name in scenario_names]
             
-            fig_scenarios = px.bar(
+            pages.dashboard.show_cached_chart('overview_scenarios', [scenario_names, profits], lambda: px.bar(
                 x=scenario_names,
                 y=profits,
                 title="Сравнение сценариев",
                 labels={'x': 'Сценарий', 'y': 'Прибыль (₽)'}
-            )
-            st.plotly_chart(fig_scenarios, use_container_width=True)
+            ))
     
     # Detailed analysis
     st.subheader("📋 Детальный анализ")
@@ -1457,6 +1641,8 @@ def dashboard_page():
         
         df_analysis = pd.DataFrame(analysis_data)
         st.dataframe(df_analysis, use_container_width=True)
+    
+    pages.dashboard.show_figure_debug_panel()
 
 def methodology_page():
     st.header("📚 Методология расчетов")
@@ -1473,6 +1659,12 @@ def methodology_page():
     Прибыль на единицу = Доход на единицу - Расходы на единицу
     """)
 
+# Форматы экспорта: (расширение файла, MIME-тип)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+}
+
 def export_page():
     st.header("📁 Экспорт данных")
     
@@ -1480,35 +1672,38 @@ def export_page():
         st.warning("⚠️ Сначала выполните расчет в калькуляторе")
         return
     
-    data = st.session_state.calculator_data
+    data = st.session_state.calculator_data.copy()
     
     # Export options
     col1, col2 = st.columns(2)
     
     with col1:
         st.write("#### Выберите формат экспорта:")
-        format = st.selectbox("Формат:", ["CSV", "Excel"])
+        format = st.selectbox("Формат:", list(EXPORT_FORMATS.keys()))
     
     with col2:
-        if st.button("Экспортировать данные"):
-            if format == "CSV":
-                export_csv(data)
-            elif format == "Excel":
-                export_excel(data)
+        # Файл выбранного формата формируется только при нажатии кнопки и один раз
+        # для каждого содержимого расчета; повторные скачивания берут байты из кэша
+        export_file(format, data)
 
-def export_csv(data):
-    csv_data = json.dumps(data)
+# Кэш готовых файлов: не больше 32 записей, каждая живет не дольше часа
+@st.cache_data(max_entries=32, ttl=3600, show_spinner=False)
+def build_export(format, digest, _data):
+    """Формирование файла экспорта (кэшируется по формату и хэшу содержимого расчета)"""
+    export_manager = ExportManager()
+    if format == "CSV":
+        return export_manager.create_csv_report(_data)
+    return export_manager.create_excel_report(_data)
+
+def export_file(format, data):
+    extension, mime = EXPORT_FORMATS[format]
     st.download_button(
-        label="Скачать данные в формате CSV",
-        data=csv_data,
-        file_name="unit_economics_data.csv",
-        mime="text/csv"
+        label=f"Скачать данные в формате {format}",
+        data=functools.partial(build_export, format, ExportManager.content_digest(data), data),
+        file_name=f"unit_economics_data.{extension}",
+        mime=mime
     )
 
-def export_excel(data):
-    # Implementation of exporting to Excel
-    st.warning("Экспорт в Excel не реализован в этой версии приложения")
-
 def save_calculation():
     """Сохраняет текущий расчет в файл."""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -1519,25 +1714,78 @@ def save_calculation():
     
     filename = f"unit_economics_{product_name}_{timestamp}.json"
     
-    # Добавляем метаданные
-    data_to_save = st.session_state.calculator_data.copy()
+    # Сохраняются только вводы (и сценарии): результаты пересчитываются при загрузке
+    session = st.session_state.calculator_data
+    data_to_save = session.to_dict(include_results=False)
     data_to_save['_metadata'] = {
         'saved_at': datetime.now().isoformat(),
         'version': '1.0',
         'current_step': st.session_state.current_step,
-        'completed_steps': list(st.session_state.completed_steps)  # Преобразуем set в list для JSON
+        'completed_steps': list(st.session_state.completed_steps),  # Преобразуем set в list для JSON
+        'has_results': session.has_results
     }
     
+    json_str = json.dumps(data_to_save, ensure_ascii=False, separators=(',', ':'))
     with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data_to_save, f, ensure_ascii=False, indent=4)
+        f.write(json_str)
     
     # Создаем ссылку для скачивания файла
-    json_str = json.dumps(data_to_save, ensure_ascii=False, indent=4)
     b64 = base64.b64encode(json_str.encode('utf-8')).decode()
     href = f'<a href="data:application/json;base64,{b64}" download="{filename}">Скачать файл расчета</a>'
     st.sidebar.markdown(href, unsafe_allow_html=True)
     
     return filename
 
+# Виджеты этапов, значение которых не хранится во вводах: ключ -> значение из вводов
+DERIVED_WIDGETS = {
+    'storage_cost_per_day': lambda data: data['storage_total'] / data['storage_days'],
+    'staff_costs_per_unit': lambda data: data['staff_costs'] / data['monthly_sales_volume'],
+    'office_rent_per_unit': lambda data: data['office_rent'] / data['monthly_sales_volume'],
+    'software_subscriptions_per_unit': lambda data: data['software_subscriptions'] / data['monthly_sales_volume']
+}
+
+def seed_widgets(keys, inputs):
+    """
+    Значения виджетов этапов по вводам после их замены (загрузка, сброс, отмена)
+    
+    Ключи виджетов этапов совпадают с ключами вводов: виджеты получают
+    новые значения, ключи без ввода сбрасываются к значениям по умолчанию.
+    Иначе этап записал бы прежние значения виджетов поверх новых.
+    Виджеты DERIVED_WIDGETS пересчитываются из вводов.
+    """
+    for key in keys:
+        if key in inputs:
+            st.session_state[key] = inputs[key]
+        else:
+            st.session_state.pop(key, None)
+    
+    for key, value in DERIVED_WIDGETS.items():
+        try:
+            st.session_state[key] = float(value(inputs))
+        except (KeyError, TypeError, ZeroDivisionError):
+            st.session_state.pop(key, None)
+
+def load_calculator_data(session: CalculatorSession):
+    """Замена данных калькулятора загруженными (или пустыми при сбросе)"""
+    inputs = session.inputs
+    seed_widgets(st.session_state.calculator_data.inputs.keys() | inputs.keys(), inputs)
+    st.session_state.calculator_data = session
+
+def undo_last_change():
+    """Отмена последнего изменения вводов; значения виджетов возвращаются вместе с данными"""
+    data = st.session_state.calculator_data
+    restored = data.undo()
+    seed_widgets(restored.keys(), data.inputs)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    tracer = st.session_state.tracer
+    if tracer.enabled:
+        # Функции скрипта определяются заново при каждом перезапуске
+        instrument(globals(), 'wizard', names=[name for name in list(globals()) if name[:5] == 'step_' and name[5:6].isdigit()])
+        instrument(globals(), 'page', names=[name for name in list(globals()) if name.endswith('_page')])
+    
+    scope = f"script:step_{st.session_state.current_step}"
+    start = time.perf_counter()
+    with st.session_state.rerun_timer.measure(scope), tracer.rerun(scope):
+        page, page_ms = main()
+    record_telemetry(scope, (time.perf_counter() - start) * 1000, page=page, page_ms=page_ms)
\ No newline at end of file
@@ -0,0 +1,3 @@
+"""
+Бенчмарки расчетного ядра, экспорта и построения графиков
+"""
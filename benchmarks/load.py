@@ -0,0 +1,258 @@
+"""
+Нагрузочный тест: параллельные сессии мастера, дашборда и экспорта через AppTest
+"""
+
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+from data.synthetic_catalog import DEFAULT_SEED, generate_catalog
+from utils.telemetry import session_state_size
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+
+# AppTest не потокобезопасен (каждый запуск подменяет глобальный Runtime),
+# поэтому перезапуски разных сессий выполняются по очереди. Для процесса
+# сервера это почти ничего не меняет: перезапуски упираются в процессор и GIL
+# и параллельно все равно не выполняются, а ожидание очереди входит в задержку.
+_RERUN_LOCK = threading.Lock()
+
+# Таймаут одного перезапуска скрипта
+RERUN_TIMEOUT_S = 120
+
+LATENCY_PERCENTILES = (50, 90, 95, 99)
+
+NEXT_BUTTON_LABEL = "Далее →"
+
+
+def _page_script(page):
+    """Скрипт отдельной страницы: меню option_menu недоступно в AppTest"""
+    import app
+    getattr(app, f"{page}_page")()
+
+
+def wizard_inputs(row: Dict[str, Any], rng: random.Random) -> Dict[Any, Any]:
+    """
+    Значения виджетов по этапам для одного прохода мастера
+    
+    Основа - строка синтетического каталога; значения слайдеров приводятся
+    к их диапазону и шагу.
+    """
+    selling_price = float(row['selling_price'])
+    ppc_percent = row['ppc_cost_per_unit'] / selling_price * 100 if selling_price > 0 else 0.0
+    return {
+        1: {'marketplace': str(row['marketplace'])},
+        2: {
+            'product_name': f"Товар {row['sku']}",
+            'selling_price': selling_price,
+            'weight': round(rng.uniform(0.1, 5.0), 1)
+        },
+        3: {'purchase_cost': float(row['purchase_cost']), 'packaging_cost': float(row['packaging_cost'])},
+        4: {'commission_rate': float(np.clip(round(row['commission_rate'] * 2) / 2, 5.0, 50.0))},
+        5: {'ppc_budget_percent': float(np.clip(round(ppc_percent), 0, 50))},
+        6: {
+            'monthly_sales_volume': max(1, int(row['monthly_sales_volume'])),
+            'return_rate': float(np.clip(round(row['return_rate']), 0, 50))
+        },
+        7: {
+            'repeat_purchase_rate': float(np.clip(round(row['repeat_purchase_rate']), 0, 100)),
+            'avg_purchases_per_year': float(np.clip(round(row['avg_purchases_per_year'], 1), 0.1, 12.0)),
+            'customer_lifespan_months': int(np.clip(row['customer_lifespan_months'], 1, 60))
+        },
+        9: {'custom_price': rng.randint(-50, 50)},
+        'export_format': rng.choice(["CSV", "Excel"])
+    }
+
+
+def _widget(at: AppTest, key: str):
+    """Виджет по ключу (тип виджета заранее не известен)"""
+    for kind in ('selectbox', 'slider', 'number_input', 'text_input'):
+        matches = [widget for widget in getattr(at, kind) if widget.key == key]
+        if matches:
+            return matches[0]
+    raise LookupError(f"Виджет {key!r} не найден")
+
+
+class LoadSession:
+    """
+    Одна пользовательская сессия: проходы мастера, дашборд и экспорт
+    
+    Каждое действие - отдельный перезапуск скрипта; в latencies записываются
+    имя действия, задержка с учетом очереди и время самого перезапуска (мс).
+    Между действиями сессия "думает" think_time секунд в среднем.
+    """
+    
+    def __init__(self, index: int, rows: List[Dict[str, Any]], seed: int,
+                 think_time: float = 0.0, timeout: float = RERUN_TIMEOUT_S):
+        self.index = index
+        self.rows = rows
+        self.rng = random.Random(seed * 1_000_003 + index)
+        self.think_time = think_time
+        self.timeout = timeout
+        self.app_test: Optional[AppTest] = None
+        self.latencies: List[tuple] = []
+        self.state_bytes: List[int] = []
+        self.errors: List[str] = []
+        self.passes = 0
+    
+    def _run(self, action: str, at: AppTest, change=None):
+        start = time.perf_counter()
+        with _RERUN_LOCK:
+            service_start = time.perf_counter()
+            if change is not None:
+                change()
+            at.run(timeout=self.timeout)
+            end = time.perf_counter()
+        self.latencies.append((action, (end - start) * 1000, (end - service_start) * 1000))
+        if at.exception:
+            raise RuntimeError(f"{action}: {at.exception[0].message}")
+    
+    def _think(self):
+        if self.think_time > 0:
+            time.sleep(self.rng.expovariate(1 / self.think_time))
+    
+    def run(self):
+        """Все проходы сессии (ошибка прерывает сессию и попадает в отчет)"""
+        try:
+            # Объект теста хранится до конца замера, как состояние живой сессии сервера
+            at = self.app_test = AppTest.from_file(APP_PATH, default_timeout=self.timeout)
+            self._run('start', at)
+            for row in self.rows:
+                self._wizard_pass(at, wizard_inputs(row, self.rng))
+                self.passes += 1
+                self.state_bytes.append(sum(session_state_size(at.session_state).values()))
+        except Exception as e:
+            self.errors.append(f"{type(e).__name__}: {e}")
+        return self
+    
+    def _wizard_pass(self, at: AppTest, inputs: Dict[Any, Any]):
+        at.session_state['current_step'] = 1
+        self._run('restart', at)
+        
+        for step in range(1, 11):
+            for key, value in inputs.get(step, {}).items():
+                self._think()
+                self._run(f"step_{step}:input", at, lambda: _widget(at, key).set_value(value))
+            if step < 10:
+                self._think()
+                next_button = next(button for button in at.button if button.label == NEXT_BUTTON_LABEL)
+                self._run(f"step_{step}:next", at, next_button.click)
+                if at.session_state['current_step'] != step + 1:
+                    raise RuntimeError(f"этап {step} не пройден: {[e.value for e in at.error]}")
+        
+        data = dict(at.session_state['calculator_data'])
+        for page in ('dashboard', 'export'):
+            # from_function перезаписывает общий временный файл скрипта - не во время чужого прогона
+            with _RERUN_LOCK:
+                page_test = AppTest.from_function(_page_script, args=(page,), default_timeout=self.timeout)
+            page_test.session_state['calculator_data'] = data
+            self._think()
+            self._run(page, page_test)
+            if page == 'export':
+                self._run(page, page_test, lambda: page_test.selectbox[0].set_value(inputs['export_format']))
+
+
+def process_memory_bytes() -> Optional[int]:
+    """Резидентная память процесса (None, если платформа не позволяет узнать)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Пиковое значение: в Linux в килобайтах, в macOS в байтах
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def latency_summary(values: List[float]) -> Dict[str, float]:
+    """Перцентили и максимум времени перезапуска (мс)"""
+    if not values:
+        return {}
+    percentiles = np.percentile(values, LATENCY_PERCENTILES)
+    summary = {f"p{p}_ms": float(value) for p, value in zip(LATENCY_PERCENTILES, percentiles)}
+    summary.update({'count': len(values), 'mean_ms': statistics.fmean(values), 'max_ms': max(values)})
+    return summary
+
+
+def run_load_test(sessions: int, passes: int = 1, seed: int = DEFAULT_SEED,
+                  think_time: float = 0.0, timeout: float = RERUN_TIMEOUT_S) -> Dict[str, Any]:
+    """
+    Параллельный запуск sessions сессий по passes проходов в каждой
+    
+    Сессии работают в потоках одного процесса и делят кэши Streamlit, как
+    сессии одного сервера. Входные данные - строки синтетического каталога.
+    При think_time=0 сессии отправляют действия без пауз (максимальная нагрузка).
+    
+    Returns:
+        Отчет: пропускная способность, перцентили задержек (всего и по действиям),
+        рост памяти процесса и состояния сессий
+    """
+    catalog = generate_catalog(sessions * passes + 1, seed).to_dict('records')
+    
+    # Импорт модулей приложения и прогрев кэшей не входят в замер
+    warmup = LoadSession(-1, catalog[-1:], seed, timeout=timeout).run()
+    if warmup.errors:
+        raise RuntimeError(f"Прогревочный проход не выполнен: {warmup.errors[0]}")
+    
+    load_sessions = [
+        LoadSession(index, catalog[index * passes:(index + 1) * passes], seed, think_time, timeout)
+        for index in range(sessions)
+    ]
+    
+    memory_before = process_memory_bytes()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions, thread_name_prefix='load-session') as executor:
+        list(executor.map(LoadSession.run, load_sessions))
+    seconds = time.perf_counter() - start
+    memory_after = process_memory_bytes()
+    
+    latencies, service = [], []
+    by_action: Dict[str, List[float]] = {}
+    for session in load_sessions:
+        for action, latency_ms, service_ms in session.latencies:
+            latencies.append(latency_ms)
+            service.append(service_ms)
+            by_action.setdefault(action, []).append(latency_ms)
+    
+    completed = sum(session.passes for session in load_sessions)
+    state_bytes = [session.state_bytes for session in load_sessions if session.state_bytes]
+    memory_growth = None
+    if memory_before is not None and memory_after is not None:
+        memory_growth = memory_after - memory_before
+    
+    return {
+        'sessions': sessions,
+        'passes_per_session': passes,
+        'think_time_s': think_time,
+        'completed_passes': completed,
+        'failed_sessions': {session.index: session.errors for session in load_sessions if session.errors},
+        'seconds': seconds,
+        'reruns': len(latencies),
+        'reruns_per_second': len(latencies) / seconds if seconds > 0 else 0.0,
+        'passes_per_second': completed / seconds if seconds > 0 else 0.0,
+        'latency': latency_summary(latencies),
+        'service': latency_summary(service),
+        'latency_by_action': {action: latency_summary(values) for action, values in sorted(by_action.items())},
+        'memory': {
+            'process_before_bytes': memory_before,
+            'process_growth_bytes': memory_growth,
+            'process_growth_per_session_bytes': memory_growth / sessions if memory_growth is not None else None,
+            'session_state_bytes': statistics.fmean(values[-1] for values in state_bytes) if state_bytes else None,
+            'session_state_growth_per_pass_bytes': (
+                statistics.fmean((values[-1] - values[0]) / (len(values) - 1) for values in state_bytes)
+                if passes > 1 and state_bytes else None
+            )
+        }
+    }
@@ -0,0 +1,175 @@
+"""
+Набор бенчмарков: расчетное ядро, экспорт и построение графиков
+"""
+
+import io
+import os
+import tempfile
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from data.synthetic_catalog import DEFAULT_SEED, generate_catalog
+from utils.calculations import UnitEconomicsCalculator
+from utils.columnar import write_parquet
+from utils.data_models import UnitInputs
+from utils.density import density_scatter_figure
+from utils.export import ExportManager
+from utils.portfolio import add_monthly_profit, margin_distribution, portfolio_kpis, query_portfolio
+
+# Сценарии и параметры анализа чувствительности (как на этапе 9 калькулятора)
+SCENARIOS = {
+    'Пессимистичный': {'price_change': -0.1, 'cost_change': 0.1, 'volume_change': -0.2},
+    'Реалистичный': {},
+    'Оптимистичный': {'price_change': 0.1, 'cost_change': -0.05, 'volume_change': 0.2}
+}
+SENSITIVITY_VARIABLES = ['selling_price', 'purchase_cost', 'commission_rate']
+SENSITIVITY_CHANGES = [-20, -10, 0, 10, 20]
+
+
+class BenchmarkData:
+    """Входные данные одного размера каталога (готовятся вне замера)"""
+    
+    def __init__(self, sku_count: int, seed: int = DEFAULT_SEED):
+        self.sku_count = sku_count
+        self.seed = seed
+        self.calculator = UnitEconomicsCalculator()
+        self.export_manager = ExportManager()
+        self._tmpdir = tempfile.TemporaryDirectory(prefix='benchmarks_')
+    
+    @cached_property
+    def inputs(self) -> pd.DataFrame:
+        return generate_catalog(self.sku_count, self.seed)
+    
+    @cached_property
+    def records(self) -> List[Dict[str, Any]]:
+        return self.inputs.to_dict('records')
+    
+    @cached_property
+    def unit_inputs(self) -> List[UnitInputs]:
+        return [UnitInputs.from_dict(record) for record in self.records]
+    
+    @cached_property
+    def results(self) -> pd.DataFrame:
+        return add_monthly_profit(self.calculator.calculate_unit_economics_batch(self.inputs))
+    
+    @cached_property
+    def report(self) -> Dict[str, Any]:
+        """Данные одного расчета в том виде, в котором они попадают в экспорт"""
+        data = dict(self.records[0])
+        data.update(self.calculator.calculate_unit_economics(data))
+        data['scenarios'] = self.calculator.calculate_scenarios(data, SCENARIOS)
+        return data
+    
+    def path(self, name: str) -> str:
+        """Путь к временному файлу для бенчмарков записи"""
+        return os.path.join(self._tmpdir.name, name)
+    
+    def cleanup(self):
+        self._tmpdir.cleanup()
+
+
+@dataclass
+class Benchmark:
+    """Описание бенчмарка: замеряется только run(data)"""
+    name: str
+    group: str
+    run: Callable[[BenchmarkData], Any]
+    max_size: Optional[int] = None  # выше этого размера бенчмарк пропускается
+
+
+def _loop(method_name: str, *args) -> Callable[[BenchmarkData], Any]:
+    """Поштучный вызов метода калькулятора для каждого SKU"""
+    def run(data: BenchmarkData):
+        method = getattr(data.calculator, method_name)
+        for record in data.records:
+            method(record, *args)
+    return run
+
+
+def _dashboard_figures():
+    # Импорт страницы тянет Streamlit - выполняется только при запуске графиков
+    from pages import dashboard
+    return dashboard
+
+
+def _cost_breakdown(data: BenchmarkData):
+    report = data.report
+    costs = {name: report[key] for name, key in [
+        ('Себестоимость', 'total_cogs'), ('Маркетплейс', 'marketplace_costs'),
+        ('Маркетинг', 'marketing_costs'), ('Операционные', 'operational_costs')
+    ]}
+    return _dashboard_figures().build_cost_breakdown_figure(costs)
+
+
+def _waterfall(data: BenchmarkData):
+    report = data.report
+    categories = ['Выручка', 'Себестоимость', 'Маркетплейс', 'Маркетинг', 'Операционные', 'Прибыль']
+    values = [report['selling_price'], -report['total_cogs'], -report['marketplace_costs'],
+              -report['marketing_costs'], -report['operational_costs'], report['unit_profit']]
+    return _dashboard_figures().build_waterfall_figure(categories, values)
+
+
+def _scenario_figure(data: BenchmarkData):
+    scenarios = data.report['scenarios']
+    return _dashboard_figures().build_scenario_figure(
+        list(scenarios), [s['unit_profit'] for s in scenarios.values()], [s['profit_margin'] for s in scenarios.values()]
+    )
+
+
+def _cumulative_ltv(data: BenchmarkData):
+    cohort = data.calculator.calculate_cohort_ltv(dict(data.report, customer_lifespan_months=36))
+    return _dashboard_figures().build_cumulative_ltv_figure(
+        cohort['cumulative_ltv'], cohort['discounted_ltv'], data.report['marketing_costs']
+    )
+
+
+BENCHMARKS = [
+    # Расчетное ядро
+    Benchmark('calculate_unit_economics', 'calculations', _loop('calculate_unit_economics')),
+    Benchmark('calculate_unit_economics_record', 'calculations',
+              lambda data: [data.calculator.calculate_unit_economics(inputs) for inputs in data.unit_inputs]),
+    Benchmark('calculate_unit_economics_batch', 'calculations',
+              lambda data: data.calculator.calculate_unit_economics_batch(data.inputs)),
+    Benchmark('calculate_unit_economics_batch_kopecks', 'calculations',
+              lambda data: data.calculator.calculate_unit_economics_batch_kopecks(data.inputs)),
+    Benchmark('calculate_unit_economics_batch_float32', 'calculations',
+              lambda data: data.calculator.calculate_unit_economics_batch(data.inputs, float32=True)),
+    Benchmark('calculate_scenarios', 'calculations', _loop('calculate_scenarios', SCENARIOS)),
+    Benchmark('calculate_cohort_ltv', 'calculations', _loop('calculate_cohort_ltv')),
+    Benchmark('perform_sensitivity_analysis', 'calculations',
+              _loop('perform_sensitivity_analysis', SENSITIVITY_VARIABLES, SENSITIVITY_CHANGES),
+              max_size=100_000),
+    
+    # Экспорт одного расчета
+    Benchmark('create_excel_report', 'export', lambda data: data.export_manager.create_excel_report(data.report), max_size=1),
+    Benchmark('create_csv_report', 'export', lambda data: data.export_manager.create_csv_report(data.report), max_size=1),
+    Benchmark('create_pdf_report', 'export', lambda data: data.export_manager.create_pdf_report(data.report), max_size=1),
+    Benchmark('create_json_export', 'export', lambda data: data.export_manager.create_json_export(data.report), max_size=1),
+    
+    # Экспорт каталога
+    Benchmark('create_pdf_batch', 'export',
+              lambda data: data.export_manager.create_pdf_batch(data.records, io.BytesIO()), max_size=1000),
+    Benchmark('write_catalog_excel', 'export',
+              lambda data: data.export_manager.write_catalog_excel(data.results, data.path('catalog.xlsx')),
+              max_size=100_000),
+    Benchmark('write_catalog_ndjson', 'export',
+              lambda data: data.export_manager.write_catalog_ndjson(data.results, data.path('catalog.ndjson'))),
+    Benchmark('write_parquet', 'export', lambda data: write_parquet(data.results, data.path('catalog.parquet'))),
+    
+    # Графики дашборда (не зависят от размера каталога)
+    Benchmark('build_cost_breakdown_figure', 'figures', _cost_breakdown, max_size=1),
+    Benchmark('build_waterfall_figure', 'figures', _waterfall, max_size=1),
+    Benchmark('build_scenario_figure', 'figures', _scenario_figure, max_size=1),
+    Benchmark('build_cumulative_ltv_figure', 'figures', _cumulative_ltv, max_size=1),
+    
+    # Портфель
+    Benchmark('portfolio_kpis', 'portfolio', lambda data: portfolio_kpis(data.results)),
+    Benchmark('margin_distribution', 'portfolio', lambda data: margin_distribution(data.results)),
+    Benchmark('query_portfolio', 'portfolio',
+              lambda data: query_portfolio(data.results, marketplaces=['OZON'], sort_by='profit_margin', page=2)),
+    Benchmark('density_scatter_figure', 'figures',
+              lambda data: density_scatter_figure(data.results['selling_price'], data.results['profit_margin']))
+]
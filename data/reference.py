@@ -0,0 +1,61 @@
+"""
+Справочные таблицы маркетплейсов в виде скомпилированных массивов
+
+Таблица сегментов маркетплейс × категория (тарифы и бенчмарки) собирается
+один раз на процесс и доступна только для чтения.
+"""
+
+import functools
+
+import numpy as np
+
+from data.marketplace_data import MARKETPLACE_COMMISSIONS, get_category_benchmark
+
+# Числовые поля сегмента: имя -> путь в тарифе MARKETPLACE_COMMISSIONS
+TARIFF_FIELDS = {
+    'commission_rate': ('commission_rate',),
+    'fulfillment_base': ('fulfillment_base',),
+    'storage_per_day': ('storage_per_day',),
+    'mandatory_marketing': ('mandatory_marketing',),
+    'processing_returns': ('additional_fees', 'processing_returns'),
+    'packaging': ('additional_fees', 'packaging'),
+}
+
+# Числовые поля сегмента из бенчмарков категории
+BENCHMARK_FIELDS = ('avg_price', 'avg_conversion', 'avg_return_rate', 'avg_margin', 'avg_ltv_cac')
+
+
+def _lookup(table: dict, path: tuple) -> float:
+    for key in path:
+        table = table[key]
+    return float(table)
+
+
+def compile_segments() -> np.ndarray:
+    """
+    Таблица сегментов маркетплейс × категория из справочника
+    
+    Returns:
+        Структурированный массив (marketplace, category и числовые поля)
+        только для чтения; порядок строк - порядок MARKETPLACE_COMMISSIONS
+    """
+    rows = []
+    for marketplace, categories in MARKETPLACE_COMMISSIONS.items():
+        for category, tariff in categories.items():
+            benchmark = get_category_benchmark(marketplace, category)
+            rows.append((marketplace, category)
+                        + tuple(_lookup(tariff, path) for path in TARIFF_FIELDS.values())
+                        + tuple(float(benchmark[name]) for name in BENCHMARK_FIELDS))
+    
+    text_size = max(len(text) for row in rows for text in row[:2])
+    dtype = ([('marketplace', f'U{text_size}'), ('category', f'U{text_size}')]
+             + [(name, np.float64) for name in (*TARIFF_FIELDS, *BENCHMARK_FIELDS)])
+    segments = np.array(rows, dtype=dtype)
+    segments.flags.writeable = False
+    return segments
+
+
+@functools.lru_cache(maxsize=None)
+def reference_segments() -> np.ndarray:
+    """Таблица сегментов, общая для всех сессий процесса"""
+    return compile_segments()
@@ -0,0 +1,189 @@
+"""
+Генератор синтетического каталога товаров по тарифам и бенчмаркам маркетплейсов
+
+Пример:
+    python -m data.synthetic_catalog 1000000 catalog.parquet --seed 42
+"""
+
+import argparse
+import os
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from data.reference import reference_segments
+
+DEFAULT_SEED = 42
+
+# Размер части при записи больших каталогов
+CATALOG_CHUNK_SIZE = 1_000_000
+
+# Разброс параметров вокруг бенчмарков категории
+PRICE_SIGMA = 0.6            # логнормальный разброс цены
+MARGIN_SIGMA = 0.12          # разброс целевой маржинальности (доли)
+PRICE_MARGIN_CORRELATION = 0.3  # дорогие товары в среднем маржинальнее
+
+ACQUIRING_RATE = 0.015       # эквайринг, доля от цены
+MIN_PURCHASE_SHARE = 0.1     # закупка не дешевле 10% цены
+
+
+def generate_catalog(sku_count: int, seed: int = DEFAULT_SEED,
+                     marketplace_weights: Optional[Dict[str, float]] = None,
+                     sku_offset: int = 0) -> pd.DataFrame:
+    """
+    Синтетический каталог из sku_count товаров со всеми полями калькулятора
+    
+    Товары распределяются по парам маркетплейс × категория из
+    MARKETPLACE_COMMISSIONS (равномерно или с весами маркетплейсов);
+    цена, конверсия, доля возвратов и маржинальность разбрасываются
+    вокруг BENCHMARKS категории. Себестоимость подбирается под целевую
+    маржу с учетом остальных статей, поэтому структура затрат
+    согласована: дорогие и низкоконверсионные товары тратят больше
+    на рекламу, а затраты на возвраты растут с долей возвратов.
+    
+    Все вычисления векторные; при одинаковом seed результат совпадает.
+    
+    Args:
+        sku_count: Количество товаров
+        seed: Зерно генератора
+        marketplace_weights: Доли маркетплейсов (по умолчанию - по числу категорий)
+        sku_offset: Начальный номер SKU (для генерации по частям)
+    """
+    rng = np.random.default_rng(seed)
+    # Таблица сегментов маркетплейс × категория - общая для процесса, только для чтения
+    segments = reference_segments()
+    n = sku_count
+    
+    weights = np.ones(len(segments))
+    if marketplace_weights:
+        weights = np.array([marketplace_weights.get(marketplace, 0.0) for marketplace in segments['marketplace']])
+        # Вес маркетплейса делится между его категориями
+        _, marketplace_index, category_counts = np.unique(segments['marketplace'], return_inverse=True,
+                                                          return_counts=True)
+        weights = weights / category_counts[marketplace_index]
+    segment = rng.choice(len(segments), size=n, p=weights / weights.sum())
+    
+    def param(name):
+        return segments[name][segment]
+    
+    # Цена и целевая маржа коррелированы через общий латентный фактор
+    price_z = rng.standard_normal(n)
+    margin_z = (PRICE_MARGIN_CORRELATION * price_z
+                + np.sqrt(1 - PRICE_MARGIN_CORRELATION ** 2) * rng.standard_normal(n))
+    avg_price = param('avg_price')
+    selling_price = np.round(avg_price * np.exp(PRICE_SIGMA * price_z), 0).clip(50)
+    target_margin = np.clip(param('avg_margin') + MARGIN_SIGMA * margin_z, -0.3, 0.7)
+    
+    conversion = np.clip(param('avg_conversion') * rng.lognormal(0, 0.35, n), 0.002, 0.2)
+    return_rate = np.clip(rng.beta(2, 2 / np.maximum(param('avg_return_rate'), 0.01) - 2), 0, 0.9)
+    
+    # Расходы маркетплейса по тарифам категории
+    commission_rate = param('commission_rate')
+    fulfillment_cost = np.round(param('fulfillment_base') * (selling_price / avg_price) ** 0.3
+                                * rng.lognormal(0, 0.15, n), 2)
+    storage_days = rng.gamma(2.0, 15.0, n)
+    storage_total = np.round(param('storage_per_day') * storage_days, 2)
+    payment_amount = np.round(selling_price * ACQUIRING_RATE, 2)
+    
+    # Реклама дороже при низкой конверсии
+    ad_share = np.clip(0.08 * param('avg_conversion') / conversion, 0, 0.3)
+    ppc_cost_per_unit = np.round(selling_price * ad_share, 2)
+    external_marketing = np.round(rng.exponential(5.0, n) * (rng.random(n) < 0.3), 2)
+    
+    packaging_cost = np.round(param('packaging') * rng.lognormal(0, 0.2, n), 2)
+    labeling_cost = np.round(rng.uniform(2, 8, n), 2)
+    quality_control = np.round(rng.uniform(0, 15, n), 2)
+    fixed_cost_per_unit = np.round(rng.uniform(5, 40, n), 2)
+    customer_service = np.round(rng.uniform(2, 15, n), 2)
+    return_cost_per_unit = np.round(param('processing_returns') * return_rate, 2)
+    
+    other_costs = (
+        selling_price * commission_rate / 100 + fulfillment_cost + storage_total + payment_amount
+        + np.where(segments['marketplace'][segment] == 'OZON', selling_price * 0.02, 0.0)
+        + ppc_cost_per_unit + external_marketing + packaging_cost + labeling_cost + quality_control
+        + fixed_cost_per_unit + customer_service + return_cost_per_unit
+    )
+    purchase_cost = np.round(np.maximum(selling_price * (1 - target_margin) - other_costs,
+                                        selling_price * MIN_PURCHASE_SHARE), 2)
+    
+    # Спрос падает с ценой и растет с конверсией
+    monthly_sales_volume = np.maximum(1, np.round(
+        300 * (avg_price / selling_price) ** 0.7 * (conversion / param('avg_conversion'))
+        * rng.lognormal(0, 0.8, n)
+    ))
+    
+    marketplaces = pd.unique(segments['marketplace'].astype(object))
+    categories = pd.unique(segments['category'].astype(object))
+    sku = np.char.add('SKU-', np.char.zfill(np.arange(sku_offset, sku_offset + n).astype('U'), 8))
+    
+    return pd.DataFrame({
+        'sku': sku,
+        'marketplace': pd.Categorical.from_codes(
+            pd.Index(marketplaces).get_indexer(segments['marketplace'])[segment], categories=marketplaces),
+        'category': pd.Categorical.from_codes(
+            pd.Index(categories).get_indexer(segments['category'])[segment], categories=categories),
+        'selling_price': selling_price,
+        'purchase_cost': purchase_cost,
+        'packaging_cost': packaging_cost,
+        'labeling_cost': labeling_cost,
+        'quality_control': quality_control,
+        'certification': np.zeros(n),
+        'commission_rate': commission_rate,
+        'fulfillment_cost': fulfillment_cost,
+        'storage_total': storage_total,
+        'payment_amount': payment_amount,
+        'ppc_cost_per_unit': ppc_cost_per_unit,
+        'external_marketing': external_marketing,
+        'influencer_marketing': np.zeros(n),
+        'content_creation': np.zeros(n),
+        'fixed_cost_per_unit': fixed_cost_per_unit,
+        'customer_service': customer_service,
+        'return_cost_per_unit': return_cost_per_unit,
+        'monthly_sales_volume': monthly_sales_volume,
+        'conversion_rate': np.round(conversion * 100, 3),
+        'return_rate': np.round(return_rate * 100, 2),
+        'repeat_purchase_rate': np.round(rng.uniform(5, 60, n), 1),
+        'customer_lifespan_months': rng.integers(1, 37, n),
+        'avg_purchases_per_year': np.round(rng.uniform(0.5, 6, n), 1)
+    })
+
+
+def iter_catalog_chunks(sku_count: int, seed: int = DEFAULT_SEED,
+                        chunk_size: int = CATALOG_CHUNK_SIZE, **kwargs) -> Iterator[pd.DataFrame]:
+    """Генерация большого каталога по частям (каждая часть - свое зерно от seed)"""
+    for index, start in enumerate(range(0, sku_count, chunk_size)):
+        yield generate_catalog(min(chunk_size, sku_count - start), seed=[seed, index],
+                               sku_offset=start, **kwargs)
+
+
+def write_catalog(sku_count: int, path: str, seed: int = DEFAULT_SEED,
+                  chunk_size: int = CATALOG_CHUNK_SIZE, **kwargs) -> int:
+    """
+    Запись синтетического каталога в Parquet или CSV (по расширению файла)
+    
+    Returns:
+        Количество записанных строк
+    """
+    chunks = iter_catalog_chunks(sku_count, seed=seed, chunk_size=chunk_size, **kwargs)
+    
+    if path.lower().endswith('.parquet'):
+        from utils.columnar import write_parquet
+        return write_parquet(chunks, path)
+    
+    rows = 0
+    for chunk in chunks:
+        chunk.to_csv(path, mode='a' if rows else 'w', header=not rows, index=False)
+        rows += len(chunk)
+    return rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Генерация синтетического каталога товаров")
+    parser.add_argument('sku_count', type=int, help="Количество товаров")
+    parser.add_argument('path', help="Файл для записи (.parquet или .csv)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="Зерно генератора")
+    args = parser.parse_args()
+    
+    rows = write_catalog(args.sku_count, args.path, seed=args.seed)
+    print(f"Записано {rows:,} SKU в {os.path.abspath(args.path)}")
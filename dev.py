@@ -1,10 +1,18 @@
 """
 Скрипт для запуска приложения в режиме разработки
 с автоматической перезагрузкой при изменении кода
+
+Примеры:
+    python dev.py                   # код перезагружается в работающем сервере (runOnSave)
+    python dev.py --mode restart    # перезапуск сервера при любом изменении
 """
+import argparse
+import fnmatch
+import hashlib
 import os
 import sys
 import subprocess
+import threading
 import time
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
@@ -31,22 +39,171 @@ def print_banner():
 {BLUE}==========================================================={RESET}
 """)
 
+# Файлы, изменения которых отслеживаются, и исключения (glob от корня проекта или имя файла)
+WATCH_INCLUDE = ["*.py", "*.json"]
+WATCH_EXCLUDE = [
+    "unit_economics_*.json",   # сохраненные расчеты (save_calculation)
+    "benchmarks/results/*",
+    "benchmarks/baseline.json",
+    "venv/*", ".venv/*", ".git/*", "__pycache__/*", "*/__pycache__/*", ".pytest_cache/*",
+]
+
+# Пауза без изменений, после которой пачка изменений обрабатывается одной перезагрузкой, с
+WATCH_DEBOUNCE_S = 0.5
+
+def file_hash(path):
+    """Хеш содержимого файла (None, если файл недоступен)"""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.blake2b(f.read(), digest_size=16).digest()
+    except OSError:
+        return None
+
+def matches(path, patterns):
+    """Совпадение относительного пути или имени файла с одним из шаблонов"""
+    name = os.path.basename(path)
+    return any(fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
 class StreamlitHandler(FileSystemEventHandler):
-    """Обработчик изменений файлов"""
-    def __init__(self, process_func):
+    """
+    Обработчик изменений файлов
+    
+    Отбирает файлы по шаблонам include/exclude, собирает изменения до паузы
+    в debounce секунд и передает в process_func одним списком только файлы,
+    содержимое которых действительно изменилось.
+    """
+    def __init__(self, process_func, include=WATCH_INCLUDE, exclude=WATCH_EXCLUDE,
+                 debounce=WATCH_DEBOUNCE_S, root="."):
         self.process_func = process_func
-        self.last_modified = time.time()
+        self.include = list(include)
+        self.exclude = list(exclude)
+        self.debounce = debounce
+        self.root = root
+        self.hashes = {}
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.timer = None
+        
+        # Исходные хеши: первое сохранение без изменений тоже не вызывает перезагрузку
+        for directory, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if not self.is_excluded(os.path.join(directory, d))]
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                if self.is_watched(path):
+                    self.hashes[self.relative(path)] = file_hash(path)
+    
+    def relative(self, path):
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+    
+    def is_excluded(self, path):
+        relative = self.relative(path)
+        return matches(relative, self.exclude) or matches(relative + "/", self.exclude)
+    
+    def is_watched(self, path):
+        """Файл подходит под include и не подходит под exclude"""
+        relative = self.relative(path)
+        return matches(relative, self.include) and not matches(relative, self.exclude)
     
-    def on_modified(self, event):
-        # Игнорируем события от директорий и слишком частые события
-        if event.is_directory or time.time() - self.last_modified < 1:
+    def on_any_event(self, event):
+        if event.is_directory or event.event_type not in ("created", "modified", "moved", "deleted"):
             return
         
-        # Фильтруем только Python файлы и JSON
-        if event.src_path.endswith(('.py', '.json')):
-            self.last_modified = time.time()
-            print(f"{YELLOW}[DEV] Изменен файл: {event.src_path}{RESET}")
-            self.process_func()
+        paths = [event.src_path]
+        if event.event_type == "moved":
+            paths.append(event.dest_path)
+        paths = [path for path in paths if self.is_watched(path)]
+        if not paths:
+            return
+        
+        with self.lock:
+            self.pending.update(self.relative(path) for path in paths)
+            if self.timer:
+                self.timer.cancel()
+            self.timer = threading.Timer(self.debounce, self.flush)
+            self.timer.daemon = True
+            self.timer.start()
+    
+    def flush(self):
+        """Обработка накопленных изменений после паузы"""
+        with self.lock:
+            pending, self.pending = self.pending, set()
+            self.timer = None
+        
+        changed = []
+        for path in sorted(pending):
+            digest = file_hash(os.path.join(self.root, path))
+            if digest != self.hashes.get(path):
+                self.hashes[path] = digest
+                changed.append(path)
+        
+        if changed:
+            for path in changed:
+                print(f"{YELLOW}[DEV] Изменен файл: {path}{RESET}")
+            self.process_func(changed)
+
+def is_reloadable_module(path):
+    """
+    Файл, изменение которого Streamlit применяет сам
+    
+    Сервер следит за app.py и импортированными локальными модулями: при
+    изменении выгружает их из sys.modules и перезапускает скрипт (runOnSave).
+    Модули, которые приложение не импортирует, на сервер не влияют.
+    """
+    return path.endswith('.py')
+
+def handle_change(paths):
+    """Реакция на пачку изменений (пути относительно корня) в зависимости от режима"""
+    if reload_mode and all(is_reloadable_module(path) for path in paths):
+        print(f"{GREEN}[DEV] Код будет перезагружен в работающем сервере{RESET}")
+        return
+    # Остальные файлы (*.json и т.п.) Streamlit не отслеживает - перезапуск
+    restart_streamlit()
+
+# Строки лога из потоков stdout и stderr выводятся целиком, не перемешиваясь
+_print_lock = threading.Lock()
+
+def log_color(line, in_traceback):
+    """Цвет строки лога по уровню; строки трассировки стека - красным"""
+    upper = line.upper()
+    if in_traceback or any(marker in upper for marker in ("ERROR", "CRITICAL", "TRACEBACK", "EXCEPTION")):
+        return RED
+    if "WARNING" in upper:
+        return YELLOW
+    return ""
+
+def pump_output(stream, name):
+    """
+    Пересылка вывода процесса в консоль с временем и цветом уровня
+    
+    Выполняется в отдельном потоке до конца вывода (завершения процесса),
+    поэтому основной цикл и перезапуск не ждут блокирующего чтения.
+    """
+    in_traceback = False
+    for line in iter(stream.readline, ""):
+        line = line.rstrip()
+        if not line:
+            continue
+        
+        if line.startswith("Traceback"):
+            in_traceback = True
+        color = log_color(line, in_traceback)
+        # Трассировка заканчивается первой строкой без отступа (текст исключения)
+        if in_traceback and not line.startswith(("Traceback", " ", "\t")):
+            in_traceback = False
+        
+        with _print_lock:
+            print(f"{BLUE}{time.strftime('%H:%M:%S')}{RESET} {name} {color}{line}{RESET if color else ''}", flush=True)
+    stream.close()
+
+def start_log_pumps(process):
+    """Потоки, одновременно вычитывающие stdout и stderr процесса"""
+    threads = [
+        threading.Thread(target=pump_output, args=(stream, name), daemon=True)
+        for stream, name in ((process.stdout, "out"), (process.stderr, "err"))
+    ]
+    for thread in threads:
+        thread.start()
+    return threads
 
 def restart_streamlit():
     """Перезапуск процесса Streamlit"""
@@ -59,15 +216,34 @@ def restart_streamlit():
         streamlit_process.wait()
     
     # Запускаем новый процесс
+    command = ["streamlit", "run", "app.py"]
+    if reload_mode:
+        command += ["--server.runOnSave", "true"]
     streamlit_process = subprocess.Popen(
-        ["streamlit", "run", "app.py"],
+        command,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
         universal_newlines=True,
+        errors="replace",
+        bufsize=1,
     )
+    start_log_pumps(streamlit_process)
     print(f"{GREEN}[DEV] Сервер перезапущен{RESET}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Запуск приложения в режиме разработки")
+    parser.add_argument("--mode", choices=["reload", "restart"], default="reload",
+                        help="reload - перезагрузка кода в работающем сервере "
+                             "(перезапуск только при изменении других файлов), restart - перезапуск при любом изменении")
+    parser.add_argument("--include", action="append", default=[], metavar="GLOB",
+                        help=f"Дополнительный шаблон отслеживаемых файлов (по умолчанию {' '.join(WATCH_INCLUDE)})")
+    parser.add_argument("--exclude", action="append", default=[], metavar="GLOB",
+                        help="Дополнительный шаблон игнорируемых файлов")
+    parser.add_argument("--debounce", type=float, default=WATCH_DEBOUNCE_S,
+                        help="Пауза без изменений перед перезагрузкой, с")
+    args = parser.parse_args()
+    reload_mode = args.mode == "reload"
+    
     # Проверка наличия необходимых файлов
     if not os.path.exists("app.py"):
         print(f"{RED}ОШИБКА: app.py не найден. Запустите скрипт из корневой директории проекта.{RESET}")
@@ -84,25 +260,19 @@ if __name__ == "__main__":
         restart_streamlit()
         
         # Настройка наблюдателя за изменениями файлов
-        event_handler = StreamlitHandler(restart_streamlit)
+        event_handler = StreamlitHandler(handle_change, WATCH_INCLUDE + args.include,
+                                         WATCH_EXCLUDE + args.exclude, args.debounce)
         observer = Observer()
         
-        # Наблюдаем за несколькими директориями
-        paths_to_watch = [".", "utils", "data", "pages"]
-        for path in paths_to_watch:
-            if os.path.exists(path):
-                observer.schedule(event_handler, path, recursive=True)
+        # Корень проекта рекурсивно (utils, data и pages - внутри)
+        observer.schedule(event_handler, ".", recursive=True)
         
         observer.start()
         print(f"{BLUE}[DEV] Отслеживание изменений запущено{RESET}")
         
-        # Поддерживаем скрипт запущенным и выводим логи Streamlit
+        # Поддерживаем скрипт запущенным (логи Streamlit выводят потоки start_log_pumps)
         while True:
-            if streamlit_process and streamlit_process.poll() is None:
-                output = streamlit_process.stdout.readline()
-                if output:
-                    print(output.strip())
-            time.sleep(0.1)
+            time.sleep(0.5)
             
     except KeyboardInterrupt:
         print(f"\n{YELLOW}[DEV] Завершение работы...{RESET}")
@@ -9,7 +9,8 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
 from datetime import datetime, timedelta
-from utils.calculations import UnitEconomicsCalculator
+from utils.calculations import shared_calculator
+from utils.figure_cache import FigureCache
 from data.marketplace_data import BENCHMARKS, get_category_benchmark
 
 def create_dashboard():
@@ -20,7 +21,7 @@ def create_dashboard():
         st.warning("⚠️ Сначала выполните расчет в калькуляторе")
         return
     
-    data = st.session_state.calculator_data
+    data = st.session_state.calculator_data.copy()
     
     # Основные метрики
     show_key_metrics(data)
@@ -41,6 +42,40 @@ def create_dashboard():
     show_cohort_ltv_analysis(data)
     show_profit_matrix(data)
     show_recommendations_summary(data)
+    
+    show_figure_debug_panel()
+
+def get_figure_cache() -> FigureCache:
+    """Кэш графиков текущей сессии"""
+    if 'figure_cache' not in st.session_state:
+        st.session_state.figure_cache = FigureCache()
+    return st.session_state.figure_cache
+
+def show_cached_chart(name, deps, builder):
+    """Отображение графика, который перестраивается только при изменении deps"""
+    figure = get_figure_cache().get_or_build(name, deps, builder)
+    st.plotly_chart(figure, use_container_width=True)
+
+def show_figure_debug_panel():
+    """Отладочная панель: время построения и попадания в кэш по графикам"""
+    with st.expander("🐞 Построение графиков"):
+        stats = get_figure_cache().stats
+        if not stats:
+            st.caption("Графики еще не строились")
+            return
+        
+        df_stats = pd.DataFrame([
+            {
+                'График': name,
+                'Построений': int(s['builds']),
+                'Из кэша': int(s['hits']),
+                'Последнее построение (мс)': round(s['last_build_ms'], 1),
+                'Всего на построение (мс)': round(s['total_build_ms'], 1),
+                'Размер данных (КБ)': round(s['size_bytes'] / 1024, 1)
+            }
+            for name, s in stats.items()
+        ])
+        st.dataframe(df_stats, use_container_width=True, hide_index=True)
 
 def show_key_metrics(data):
     """Отображение ключевых метрик"""
@@ -103,20 +138,7 @@ def show_cost_breakdown(data):
         costs = {k: v for k, v in costs.items() if v > 0}
         
         if costs:
-            fig_costs = px.pie(
-                values=list(costs.values()),
-                names=list(costs.keys()),
-                title="Распределение затрат",
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
-            
-            fig_costs.update_traces(
-                textposition='inside', 
-                textinfo='percent+label',
-                hovertemplate='<b>%{label}</b><br>Сумма: %{value:,.0f} ₽<br>Доля: %{percent}<extra></extra>'
-            )
-            
-            st.plotly_chart(fig_costs, use_container_width=True)
+            show_cached_chart('cost_breakdown', costs, lambda: build_cost_breakdown_figure(costs))
             
             # Таблица с детализацией
             selling_price = data.get('selling_price', 1)
@@ -133,6 +155,23 @@ def show_cost_breakdown(data):
             df_costs = pd.DataFrame(cost_table)
             st.dataframe(df_costs, use_container_width=True, hide_index=True)
 
+def build_cost_breakdown_figure(costs):
+    """Круговая диаграмма распределения затрат"""
+    fig_costs = px.pie(
+        values=list(costs.values()),
+        names=list(costs.keys()),
+        title="Распределение затрат",
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    
+    fig_costs.update_traces(
+        textposition='inside', 
+        textinfo='percent+label',
+        hovertemplate='<b>%{label}</b><br>Сумма: %{value:,.0f} ₽<br>Доля: %{percent}<extra></extra>'
+    )
+    
+    return fig_costs
+
 def show_profitability_analysis(data):
     """Анализ прибыльности"""
     st.subheader("📊 Анализ прибыльности")
@@ -152,6 +191,10 @@ def show_profitability_analysis(data):
         unit_profit
     ]
     
+    show_cached_chart('waterfall', values, lambda: build_waterfall_figure(categories, values))
+
+def build_waterfall_figure(categories, values):
+    """Водопадная диаграмма формирования прибыли"""
     fig_waterfall = go.Figure(go.Waterfall(
         name="Структура прибыли",
         orientation="v",
@@ -170,7 +213,7 @@ def show_profitability_analysis(data):
         yaxis_title="Сумма (₽)"
     )
     
-    st.plotly_chart(fig_waterfall, use_container_width=True)
+    return fig_waterfall
 
 def show_scenario_comparison(data):
     """Сравнение сценариев"""
@@ -185,30 +228,12 @@ def show_scenario_comparison(data):
         margins = [scenarios[name]['profit_margin'] for name in scenario_names]
         
         # Столбчатая диаграмма прибыли
-        fig_scenarios = go.Figure()
-        
-        colors = ['red', 'blue', 'green']  # Пессимистичный, реалистичный, оптимистичный
-        
-        for i, (name, profit) in enumerate(zip(scenario_names, profits)):
-            fig_scenarios.add_trace(go.Bar(
-                name=name,
-                x=[name],
-                y=[profit],
-                text=[f"{profit:+,.0f} ₽"],
-                textposition='auto',
-                marker_color=colors[i % len(colors)],
-                hovertemplate=f'<b>{name}</b><br>Прибыль: %{{y:+,.0f}} ₽<br>Маржа: {margins[i]:.1f}%<extra></extra>'
-            ))
-        
-        fig_scenarios.update_layout(
-            title="Прибыль по сценариям",
-            xaxis_title="Сценарий",
-            yaxis_title="Прибыль (₽)",
-            showlegend=False
+        show_cached_chart(
+            'scenarios',
+            [scenario_names, profits, margins],
+            lambda: build_scenario_figure(scenario_names, profits, margins)
         )
         
-        st.plotly_chart(fig_scenarios, use_container_width=True)
-        
         # Таблица сравнения
         monthly_volume = data.get('monthly_sales_volume', 100)
         
@@ -227,6 +252,32 @@ def show_scenario_comparison(data):
     else:
         st.info("Сравнение сценариев будет доступно после завершения всех этапов калькулятора")
 
+def build_scenario_figure(scenario_names, profits, margins):
+    """Столбчатая диаграмма прибыли по сценариям"""
+    fig_scenarios = go.Figure()
+    
+    colors = ['red', 'blue', 'green']  # Пессимистичный, реалистичный, оптимистичный
+    
+    for i, (name, profit) in enumerate(zip(scenario_names, profits)):
+        fig_scenarios.add_trace(go.Bar(
+            name=name,
+            x=[name],
+            y=[profit],
+            text=[f"{profit:+,.0f} ₽"],
+            textposition='auto',
+            marker_color=colors[i % len(colors)],
+            hovertemplate=f'<b>{name}</b><br>Прибыль: %{{y:+,.0f}} ₽<br>Маржа: {margins[i]:.1f}%<extra></extra>'
+        ))
+    
+    fig_scenarios.update_layout(
+        title="Прибыль по сценариям",
+        xaxis_title="Сценарий",
+        yaxis_title="Прибыль (₽)",
+        showlegend=False
+    )
+    
+    return fig_scenarios
+
 def show_benchmark_comparison(data):
     """Сравнение с отраслевыми бенчмарками"""
     st.subheader("📈 Сравнение с рынком")
@@ -261,37 +312,12 @@ def show_benchmark_comparison(data):
             100 - (benchmark.get('avg_return_rate', 0.12) * 100)
         ]
         
-        fig_radar = go.Figure()
-        
-        fig_radar.add_trace(go.Scatterpolar(
-            r=current_values,
-            theta=categories,
-            fill='toself',
-            name='Ваши показатели',
-            line_color='blue'
-        ))
-        
-        fig_radar.add_trace(go.Scatterpolar(
-            r=benchmark_values,
-            theta=categories,
-            fill='toself',
-            name='Рыночные бенчмарки',
-            line_color='red',
-            opacity=0.6
-        ))
-        
-        fig_radar.update_layout(
-            polar=dict(
-                radialaxis=dict(
-                    visible=True,
-                    range=[0, 100]
-                )),
-            showlegend=True,
-            title="Сравнение с рыночными показателями"
+        show_cached_chart(
+            'benchmark_radar',
+            [current_values, benchmark_values],
+            lambda: build_benchmark_radar_figure(categories, current_values, benchmark_values)
         )
         
-        st.plotly_chart(fig_radar, use_container_width=True)
-        
         st.caption("*Конверсия и возвраты нормализованы для визуализации")
         
         # Текстовое сравнение
@@ -309,6 +335,39 @@ def show_benchmark_comparison(data):
     else:
         st.info("Бенчмарки недоступны для выбранной комбинации маркетплейса и категории")
 
+def build_benchmark_radar_figure(categories, current_values, benchmark_values):
+    """Радарная диаграмма сравнения с рыночными бенчмарками"""
+    fig_radar = go.Figure()
+    
+    fig_radar.add_trace(go.Scatterpolar(
+        r=current_values,
+        theta=categories,
+        fill='toself',
+        name='Ваши показатели',
+        line_color='blue'
+    ))
+    
+    fig_radar.add_trace(go.Scatterpolar(
+        r=benchmark_values,
+        theta=categories,
+        fill='toself',
+        name='Рыночные бенчмарки',
+        line_color='red',
+        opacity=0.6
+    ))
+    
+    fig_radar.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 100]
+            )),
+        showlegend=True,
+        title="Сравнение с рыночными показателями"
+    )
+    
+    return fig_radar
+
 def show_ltv_cac_analysis(data):
     """Анализ LTV/CAC"""
     st.subheader("👥 Анализ LTV/CAC")
@@ -321,61 +380,11 @@ def show_ltv_cac_analysis(data):
     col1, col2 = st.columns(2)
     
     with col1:
-        # Визуализация LTV vs CAC
-        fig_ltv_cac = go.Figure()
-        
-        # Добавляем точку текущих значений
-        fig_ltv_cac.add_trace(go.Scatter(
-            x=[cac],
-            y=[ltv],
-            mode='markers',
-            marker=dict(size=20, color='blue'),
-            name='Ваш товар',
-            text=[f'LTV: {ltv:,.0f}₽<br>CAC: {cac:,.0f}₽<br>Ratio: {ltv_cac_ratio:.1f}'],
-            hovertemplate='%{text}<extra></extra>'
-        ))
-        
-        # Добавляем зоны эффективности
-        x_range = np.linspace(0, max(cac * 1.5, 1000), 100)
-        
-        # Зона убыточности (LTV < CAC)
-        fig_ltv_cac.add_trace(go.Scatter(
-            x=x_range,
-            y=x_range,
-            mode='lines',
-            line=dict(color='red', dash='dash'),
-            name='Зона убыточности (LTV=CAC)',
-            hoverinfo='skip'
-        ))
-        
-        # Зона минимальной эффективности (LTV = 2*CAC)
-        fig_ltv_cac.add_trace(go.Scatter(
-            x=x_range,
-            y=x_range * 2,
-            mode='lines',
-            line=dict(color='orange', dash='dash'),
-            name='Минимальная эффективность (2:1)',
-            hoverinfo='skip'
-        ))
-        
-        # Зона хорошей эффективности (LTV = 3*CAC)
-        fig_ltv_cac.add_trace(go.Scatter(
-            x=x_range,
-            y=x_range * 3,
-            mode='lines',
-            line=dict(color='green', dash='dash'),
-            name='Хорошая эффективность (3:1)',
-            hoverinfo='skip'
-        ))
-        
-        fig_ltv_cac.update_layout(
-            title='Позиционирование LTV vs CAC',
-            xaxis_title='CAC (₽)',
-            yaxis_title='LTV (₽)',
-            showlegend=True
+        show_cached_chart(
+            'ltv_cac',
+            [ltv, cac, ltv_cac_ratio],
+            lambda: build_ltv_cac_figure(ltv, cac, ltv_cac_ratio)
         )
-        
-        st.plotly_chart(fig_ltv_cac, use_container_width=True)
     
     with col2:
         # Метрики и рекомендации
@@ -407,11 +416,69 @@ def show_ltv_cac_analysis(data):
         else:
             st.error("🔴 Медленная окупаемость")
 
+def build_ltv_cac_figure(ltv, cac, ltv_cac_ratio):
+    """Позиционирование LTV vs CAC относительно зон эффективности"""
+    # Визуализация LTV vs CAC
+    fig_ltv_cac = go.Figure()
+    
+    # Добавляем точку текущих значений
+    fig_ltv_cac.add_trace(go.Scatter(
+        x=[cac],
+        y=[ltv],
+        mode='markers',
+        marker=dict(size=20, color='blue'),
+        name='Ваш товар',
+        text=[f'LTV: {ltv:,.0f}₽<br>CAC: {cac:,.0f}₽<br>Ratio: {ltv_cac_ratio:.1f}'],
+        hovertemplate='%{text}<extra></extra>'
+    ))
+    
+    # Добавляем зоны эффективности
+    x_range = np.linspace(0, max(cac * 1.5, 1000), 100)
+    
+    # Зона убыточности (LTV < CAC)
+    fig_ltv_cac.add_trace(go.Scatter(
+        x=x_range,
+        y=x_range,
+        mode='lines',
+        line=dict(color='red', dash='dash'),
+        name='Зона убыточности (LTV=CAC)',
+        hoverinfo='skip'
+    ))
+    
+    # Зона минимальной эффективности (LTV = 2*CAC)
+    fig_ltv_cac.add_trace(go.Scatter(
+        x=x_range,
+        y=x_range * 2,
+        mode='lines',
+        line=dict(color='orange', dash='dash'),
+        name='Минимальная эффективность (2:1)',
+        hoverinfo='skip'
+    ))
+    
+    # Зона хорошей эффективности (LTV = 3*CAC)
+    fig_ltv_cac.add_trace(go.Scatter(
+        x=x_range,
+        y=x_range * 3,
+        mode='lines',
+        line=dict(color='green', dash='dash'),
+        name='Хорошая эффективность (3:1)',
+        hoverinfo='skip'
+    ))
+    
+    fig_ltv_cac.update_layout(
+        title='Позиционирование LTV vs CAC',
+        xaxis_title='CAC (₽)',
+        yaxis_title='LTV (₽)',
+        showlegend=True
+    )
+    
+    return fig_ltv_cac
+
 def show_cohort_ltv_analysis(data):
     """Отображение расширенного анализа LTV с когортами"""
     st.subheader("👥 Когортный анализ LTV")
     
-    calculator = UnitEconomicsCalculator()
+    calculator = shared_calculator()
     cohort_data = calculator.calculate_cohort_ltv(data)
     
     col1, col2 = st.columns(2)
@@ -421,26 +488,12 @@ def show_cohort_ltv_analysis(data):
         retention_months = list(range(1, len(cohort_data['retention_by_month']) + 1))
         retention_values = [r * 100 for r in cohort_data['retention_by_month']]
         
-        fig_retention = px.line(
-            x=retention_months,
-            y=retention_values,
-            markers=True,
-            title="Удержание клиентов по месяцам",
-            labels={'x': 'Месяц', 'y': 'Удержание (%)'},
-            color_discrete_sequence=['#2D6A9D']
-        )
-        
-        fig_retention.update_traces(
-            hovertemplate='Месяц %{x}: %{y:.1f}%<extra></extra>'
-        )
-        
-        fig_retention.update_layout(
-            xaxis=dict(tickmode='linear', dtick=1),
-            yaxis=dict(range=[0, max(retention_values) * 1.1])
+        show_cached_chart(
+            'cohort_retention',
+            retention_values,
+            lambda: build_retention_figure(retention_months, retention_values)
         )
         
-        st.plotly_chart(fig_retention, use_container_width=True)
-        
         # Информация о LTV
         st.info(f"""
         **Сравнение методов расчета LTV:**
@@ -453,79 +506,14 @@ def show_cohort_ltv_analysis(data):
     
     with col2:
         # График накопительного LTV
-        months = list(range(1, len(cohort_data['cumulative_ltv']) + 1))
-        
-        fig_ltv = go.Figure()
-        
-        # Накопительный LTV без дисконтирования
-        fig_ltv.add_trace(go.Scatter(
-            x=months,
-            y=cohort_data['cumulative_ltv'],
-            name='LTV простой',
-            mode='lines',
-            line=dict(color='#2D6A9D', width=2),
-            hovertemplate='Месяц %{x}: %{y:,.0f} ₽<extra></extra>'
-        ))
-        
-        # Накопительный LTV с дисконтированием
-        fig_ltv.add_trace(go.Scatter(
-            x=months,
-            y=cohort_data['discounted_ltv'],
-            name='LTV с дисконтированием',
-            mode='lines',
-            line=dict(color='#9D2D3C', width=2, dash='dash'),
-            hovertemplate='Месяц %{x}: %{y:,.0f} ₽<extra></extra>'
-        ))
-        
-        # Точка окупаемости CAC
-        cac = data.get('cac', 0)
-        if cac > 0:
-            # Находим месяц окупаемости без дисконтирования
-            payback_month = next((i for i, value in enumerate(cohort_data['cumulative_ltv']) if value >= cac), len(months))
-            payback_month_disc = next((i for i, value in enumerate(cohort_data['discounted_ltv']) if value >= cac), len(months))
-            
-            if payback_month < len(months):
-                payback_month += 1  # Корректировка индексации
-                fig_ltv.add_trace(go.Scatter(
-                    x=[payback_month],
-                    y=[cohort_data['cumulative_ltv'][payback_month-1]],
-                    name='Точка окупаемости',
-                    mode='markers',
-                    marker=dict(color='green', size=10, symbol='star'),
-                    hovertemplate=f'Окупаемость: {payback_month} мес.<extra></extra>'
-                ))
-            
-            if payback_month_disc < len(months):
-                payback_month_disc += 1  # Корректировка индексации
-                fig_ltv.add_trace(go.Scatter(
-                    x=[payback_month_disc],
-                    y=[cohort_data['discounted_ltv'][payback_month_disc-1]],
-                    name='Точка окупаемости (диск.)',
-                    mode='markers',
-                    marker=dict(color='orange', size=10, symbol='star'),
-                    hovertemplate=f'Окупаемость (диск.): {payback_month_disc} мес.<extra></extra>'
-                ))
-            
-            # Горизонтальная линия CAC
-            fig_ltv.add_trace(go.Scatter(
-                x=[1, len(months)],
-                y=[cac, cac],
-                name='CAC',
-                mode='lines',
-                line=dict(color='red', width=1, dash='dot'),
-                hovertemplate=f'CAC: {cac:,.0f} ₽<extra></extra>'
-            ))
-        
-        fig_ltv.update_layout(
-            title="Накопительный LTV по месяцам",
-            xaxis_title="Месяц",
-            yaxis_title="LTV (₽)",
-            xaxis=dict(tickmode='linear', dtick=1),
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+        show_cached_chart(
+            'cohort_cumulative_ltv',
+            [cohort_data['cumulative_ltv'], cohort_data['discounted_ltv'], data.get('cac', 0)],
+            lambda: build_cumulative_ltv_figure(
+                cohort_data['cumulative_ltv'], cohort_data['discounted_ltv'], data.get('cac', 0)
+            )
         )
         
-        st.plotly_chart(fig_ltv, use_container_width=True)
-        
     # Таблица с детализацией
     with st.expander("🔍 Детализация по месяцам"):
         months = list(range(1, len(cohort_data['revenue_by_month']) + 1))
@@ -539,11 +527,107 @@ def show_cohort_ltv_analysis(data):
         
         st.dataframe(ltv_data, use_container_width=True, hide_index=True)
 
+def build_retention_figure(retention_months, retention_values):
+    """Линейный график удержания клиентов по месяцам"""
+    fig_retention = px.line(
+        x=retention_months,
+        y=retention_values,
+        markers=True,
+        title="Удержание клиентов по месяцам",
+        labels={'x': 'Месяц', 'y': 'Удержание (%)'},
+        color_discrete_sequence=['#2D6A9D']
+    )
+    
+    fig_retention.update_traces(
+        hovertemplate='Месяц %{x}: %{y:.1f}%<extra></extra>'
+    )
+    
+    fig_retention.update_layout(
+        xaxis=dict(tickmode='linear', dtick=1),
+        yaxis=dict(range=[0, max(retention_values) * 1.1])
+    )
+    
+    return fig_retention
+
+def build_cumulative_ltv_figure(cumulative_ltv, discounted_ltv, cac):
+    """Накопительный LTV (простой и дисконтированный) с точками окупаемости CAC"""
+    months = list(range(1, len(cumulative_ltv) + 1))
+    
+    fig_ltv = go.Figure()
+    
+    # Накопительный LTV без дисконтирования
+    fig_ltv.add_trace(go.Scatter(
+        x=months,
+        y=cumulative_ltv,
+        name='LTV простой',
+        mode='lines',
+        line=dict(color='#2D6A9D', width=2),
+        hovertemplate='Месяц %{x}: %{y:,.0f} ₽<extra></extra>'
+    ))
+    
+    # Накопительный LTV с дисконтированием
+    fig_ltv.add_trace(go.Scatter(
+        x=months,
+        y=discounted_ltv,
+        name='LTV с дисконтированием',
+        mode='lines',
+        line=dict(color='#9D2D3C', width=2, dash='dash'),
+        hovertemplate='Месяц %{x}: %{y:,.0f} ₽<extra></extra>'
+    ))
+    
+    # Точка окупаемости CAC
+    if cac > 0:
+        # Находим месяц окупаемости без дисконтирования
+        payback_month = next((i for i, value in enumerate(cumulative_ltv) if value >= cac), len(months))
+        payback_month_disc = next((i for i, value in enumerate(discounted_ltv) if value >= cac), len(months))
+        
+        if payback_month < len(months):
+            payback_month += 1  # Корректировка индексации
+            fig_ltv.add_trace(go.Scatter(
+                x=[payback_month],
+                y=[cumulative_ltv[payback_month-1]],
+                name='Точка окупаемости',
+                mode='markers',
+                marker=dict(color='green', size=10, symbol='star'),
+                hovertemplate=f'Окупаемость: {payback_month} мес.<extra></extra>'
+            ))
+        
+        if payback_month_disc < len(months):
+            payback_month_disc += 1  # Корректировка индексации
+            fig_ltv.add_trace(go.Scatter(
+                x=[payback_month_disc],
+                y=[discounted_ltv[payback_month_disc-1]],
+                name='Точка окупаемости (диск.)',
+                mode='markers',
+                marker=dict(color='orange', size=10, symbol='star'),
+                hovertemplate=f'Окупаемость (диск.): {payback_month_disc} мес.<extra></extra>'
+            ))
+        
+        # Горизонтальная линия CAC
+        fig_ltv.add_trace(go.Scatter(
+            x=[1, len(months)],
+            y=[cac, cac],
+            name='CAC',
+            mode='lines',
+            line=dict(color='red', width=1, dash='dot'),
+            hovertemplate=f'CAC: {cac:,.0f} ₽<extra></extra>'
+        ))
+    
+    fig_ltv.update_layout(
+        title="Накопительный LTV по месяцам",
+        xaxis_title="Месяц",
+        yaxis_title="LTV (₽)",
+        xaxis=dict(tickmode='linear', dtick=1),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    
+    return fig_ltv
+
 def show_profit_matrix(data):
     """P.R.O.F.I.T. матрица"""
     st.subheader("🎯 P.R.O.F.I.T. Матрица")
     
-    calculator = UnitEconomicsCalculator()
+    calculator = shared_calculator()
     recommendations = calculator.generate_recommendations(data)
     profit_matrix = recommendations.get('profit_matrix', {})
     
@@ -552,39 +636,12 @@ def show_profit_matrix(data):
         categories = list(profit_matrix.keys())
         values = list(profit_matrix.values())
         
-        fig_profit = go.Figure()
-        
-        fig_profit.add_trace(go.Scatterpolar(
-            r=values,
-            theta=categories,
-            fill='toself',
-            name='Текущее состояние',
-            line_color='blue'
-        ))
-        
-        # Добавляем целевые показатели
-        target_values = [85, 80, 75, 80, 70, 75]  # Целевые бенчмарки
-        fig_profit.add_trace(go.Scatterpolar(
-            r=target_values,
-            theta=categories,
-            fill='toself',
-            name='Целевые показатели',
-            line_color='green',
-            opacity=0.3
-        ))
-        
-        fig_profit.update_layout(
-            polar=dict(
-                radialaxis=dict(
-                    visible=True,
-                    range=[0, 100]
-                )),
-            showlegend=True,
-            title="P.R.O.F.I.T. Анализ эффективности бизнеса"
+        show_cached_chart(
+            'profit_matrix_radar',
+            profit_matrix,
+            lambda: build_profit_matrix_figure(categories, values)
         )
         
-        st.plotly_chart(fig_profit, use_container_width=True)
-        
         # Детализация по каждому компоненту
         col1, col2, col3 = st.columns(3)
         
@@ -609,11 +666,46 @@ def show_profit_matrix(data):
             st.write("**T** - Transformation Strategy:")
             st.write(f"• Оценка: {profit_matrix.get('Transformation Strategy', 0):.0f}/100")
 
+def build_profit_matrix_figure(categories, values):
+    """Радарная диаграмма P.R.O.F.I.T. с целевыми показателями"""
+    fig_profit = go.Figure()
+    
+    fig_profit.add_trace(go.Scatterpolar(
+        r=values,
+        theta=categories,
+        fill='toself',
+        name='Текущее состояние',
+        line_color='blue'
+    ))
+    
+    # Добавляем целевые показатели
+    target_values = [85, 80, 75, 80, 70, 75]  # Целевые бенчмарки
+    fig_profit.add_trace(go.Scatterpolar(
+        r=target_values,
+        theta=categories,
+        fill='toself',
+        name='Целевые показатели',
+        line_color='green',
+        opacity=0.3
+    ))
+    
+    fig_profit.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 100]
+            )),
+        showlegend=True,
+        title="P.R.O.F.I.T. Анализ эффективности бизнеса"
+    )
+    
+    return fig_profit
+
 def show_recommendations_summary(data):
     """Краткое резюме рекомендаций"""
     st.subheader("💡 Ключевые рекомендации")
     
-    calculator = UnitEconomicsCalculator()
+    calculator = shared_calculator()
     recommendations = calculator.generate_recommendations(data)
     
     col1, col2, col3 = st.columns(3)
@@ -0,0 +1,285 @@
+"""
+Модуль портфельного дашборда для каталогов из тысяч SKU
+"""
+
+import os
+import tempfile
+from pathlib import Path
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+from utils.calculations import shared_calculator
+from utils.columnar import read_parquet
+from utils.density import RAW_POINTS_MAX, WEBGL_POINTS_MAX, density_scatter_figure
+from utils.export import ExportManager
+from utils.portfolio import (
+    SORTABLE_COLUMNS,
+    add_ltv_cac,
+    add_monthly_profit,
+    margin_distribution,
+    portfolio_kpis,
+    query_portfolio
+)
+
+# Столбцы таблицы портфеля и их заголовки
+PORTFOLIO_TABLE_COLUMNS = {
+    'sku': 'SKU',
+    'product_name': 'Товар',
+    'marketplace': 'Маркетплейс',
+    'category': 'Категория',
+    'selling_price': 'Цена (₽)',
+    'total_costs': 'Затраты (₽)',
+    'unit_profit': 'Прибыль/ед. (₽)',
+    'profit_margin': 'Маржа (%)',
+    'monthly_sales_volume': 'Объем (шт/мес)',
+    'monthly_profit': 'Месячная прибыль (₽)'
+}
+
+# Наибольший архив отчетов, который отдается кнопкой скачивания: при нажатии
+# Streamlit читает файл целиком в память процесса сервера
+PORTFOLIO_REPORTS_MAX_ARCHIVE_MB = 256
+
+def create_portfolio_dashboard():
+    """Создание портфельного дашборда"""
+    st.header("🗂️ Портфель товаров")
+    
+    load_portfolio()
+    
+    results = st.session_state.get('portfolio_results')
+    if results is None:
+        st.info(
+            "Загрузите CSV или Parquet каталога: одна строка - один SKU с полями калькулятора "
+            "(selling_price, purchase_cost, commission_rate, marketplace, category, "
+            "monthly_sales_volume и т.д.)"
+        )
+        return
+    
+    show_portfolio_kpis(results)
+    show_margin_distribution(results)
+    show_portfolio_scatter(results)
+    show_portfolio_table(results)
+    show_portfolio_reports(results)
+
+def load_portfolio():
+    """Загрузка каталога и пакетный расчет (выполняется один раз на файл)"""
+    uploaded_file = st.file_uploader("📂 Загрузить каталог (CSV или Parquet)", type=["csv", "parquet"], key="portfolio_file")
+    if uploaded_file is None:
+        return
+    
+    if st.session_state.get('portfolio_file_id') == uploaded_file.file_id:
+        return
+    
+    try:
+        if uploaded_file.name.lower().endswith('.parquet'):
+            inputs = read_parquet(uploaded_file)
+        else:
+            inputs = pd.read_csv(uploaded_file)
+        results = shared_calculator().calculate_unit_economics_batch(inputs)
+        st.session_state.portfolio_results = add_ltv_cac(add_monthly_profit(results), inputs)
+        st.session_state.portfolio_file_id = uploaded_file.file_id
+    except Exception as e:
+        st.error(f"❌ Ошибка при расчете каталога: {e}")
+
+def show_portfolio_kpis(results):
+    """Ключевые показатели портфеля"""
+    kpis = portfolio_kpis(results)
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("📦 SKU", f"{kpis['sku_count']:,}")
+    
+    with col2:
+        st.metric("💎 Месячная прибыль", f"{kpis['total_monthly_profit']:+,.0f} ₽")
+    
+    with col3:
+        st.metric("🔴 Убыточные SKU", f"{kpis['loss_making_share']:.1%}")
+    
+    with col4:
+        st.metric("📊 Медианная маржа", f"{kpis['median_margin']:.1f}%")
+    
+    if kpis['margin_percentiles']:
+        st.caption("Перцентили маржинальности: " + ", ".join(
+            f"P{p}: {value:.1f}%" for p, value in kpis['margin_percentiles'].items()
+        ))
+
+def show_margin_distribution(results):
+    """Распределение маржинальности (в браузер передаются только корзины)"""
+    counts, edges = margin_distribution(results)
+    centers = (edges[:-1] + edges[1:]) / 2
+    
+    fig_margin = go.Figure(go.Bar(
+        x=centers,
+        y=counts,
+        width=edges[1] - edges[0],
+        marker_color=['#E74C3C' if center < 0 else '#27AE60' for center in centers],
+        hovertemplate='Маржа %{x:.0f}%: %{y:,} SKU<extra></extra>'
+    ))
+    
+    fig_margin.update_layout(
+        title="Распределение маржинальности",
+        xaxis_title="Маржинальность (%)",
+        yaxis_title="Количество SKU",
+        bargap=0.05
+    )
+    
+    st.plotly_chart(fig_margin, use_container_width=True)
+
+def show_portfolio_scatter(results):
+    """Диаграммы рассеяния портфеля с выбором способа отображения по числу точек"""
+    with st.expander("⚙️ Настройки отображения точек"):
+        st.caption("Меньше первого порога - обычные маркеры, до второго - WebGL, выше - тепловая карта плотности")
+        raw_max = st.number_input(
+            "Обычные маркеры, до (точек):", min_value=0, step=1000, value=RAW_POINTS_MAX, key="portfolio_raw_max"
+        )
+        webgl_max = st.number_input(
+            "WebGL, до (точек):", min_value=0, step=10000, value=WEBGL_POINTS_MAX, key="portfolio_webgl_max"
+        )
+    
+    hover_text = results['sku'].astype(str).tolist() if 'sku' in results and len(results) <= webgl_max else None
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        fig_price = density_scatter_figure(
+            results['selling_price'].to_numpy(),
+            results['profit_margin'].to_numpy(),
+            title="Маржинальность vs цена",
+            x_title="Цена (₽)",
+            y_title="Маржа (%)",
+            raw_max=raw_max,
+            webgl_max=webgl_max,
+            hover_text=hover_text
+        )
+        st.plotly_chart(fig_price, use_container_width=True)
+    
+    with col2:
+        if 'ltv' in results:
+            fig_ltv_cac = density_scatter_figure(
+                results['cac'].to_numpy(),
+                results['ltv'].to_numpy(),
+                title="LTV vs CAC",
+                x_title="CAC (₽)",
+                y_title="LTV (₽)",
+                raw_max=raw_max,
+                webgl_max=webgl_max,
+                hover_text=hover_text
+            )
+            st.plotly_chart(fig_ltv_cac, use_container_width=True)
+        else:
+            st.info("Для LTV/CAC добавьте в каталог customer_lifespan_months и avg_purchases_per_year")
+
+def show_portfolio_table(results):
+    """Постраничная таблица с фильтрацией и сортировкой на стороне сервера"""
+    st.subheader("📋 Товары")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        marketplaces = st.multiselect(
+            "Маркетплейс:",
+            sorted(results['marketplace'].dropna().unique()) if 'marketplace' in results else [],
+            key="portfolio_marketplaces"
+        )
+        loss_making_only = st.checkbox("Только убыточные", key="portfolio_loss_only")
+    
+    with col2:
+        categories = st.multiselect(
+            "Категория:",
+            sorted(results['category'].dropna().unique()) if 'category' in results else [],
+            key="portfolio_categories"
+        )
+        margin_range = st.slider(
+            "Маржинальность (%):", -100.0, 100.0, (-100.0, 100.0), step=1.0, key="portfolio_margin"
+        )
+    
+    with col3:
+        sort_by = st.selectbox(
+            "Сортировка:",
+            list(SORTABLE_COLUMNS.keys()),
+            format_func=SORTABLE_COLUMNS.get,
+            key="portfolio_sort"
+        )
+        ascending = st.toggle("По возрастанию", key="portfolio_ascending")
+        page_size = st.selectbox("Строк на странице:", [50, 100, 200, 500], index=2, key="portfolio_page_size")
+    
+    # Крайние значения слайдера означают отсутствие ограничения
+    margin_filter = None if margin_range == (-100.0, 100.0) else margin_range
+    
+    page = st.number_input("Страница:", min_value=1, step=1, value=1, key="portfolio_page")
+    
+    portfolio_page = query_portfolio(
+        results,
+        marketplaces=marketplaces,
+        categories=categories,
+        margin_range=margin_filter,
+        loss_making_only=loss_making_only,
+        sort_by=sort_by,
+        ascending=ascending,
+        page=page,
+        page_size=page_size
+    )
+    
+    columns = [column for column in PORTFOLIO_TABLE_COLUMNS if column in portfolio_page.rows]
+    st.dataframe(
+        portfolio_page.rows[columns].rename(columns=PORTFOLIO_TABLE_COLUMNS),
+        use_container_width=True,
+        hide_index=True
+    )
+    
+    st.caption(
+        f"Строки {portfolio_page.first_row:,}–{portfolio_page.last_row:,} из {portfolio_page.total_rows:,} "
+        f"(страница {portfolio_page.page} из {portfolio_page.page_count})"
+    )
+
+def show_portfolio_reports(results):
+    """Пакетная генерация PDF отчетов по всем SKU в ZIP архив"""
+    st.subheader("📄 Отчеты по SKU")
+    
+    if st.button("Сформировать PDF отчеты", key="portfolio_pdf_batch"):
+        # Строки передаются в пакет по одной, архив пишется во временный каталог
+        # сессии: он переживает перезапуски и удаляется вместе с записью
+        # (при новой генерации или закрытии сессии)
+        reports = (dict(zip(results.columns, row)) for row in results.itertuples(index=False, name=None))
+        directory = tempfile.TemporaryDirectory()
+        path = os.path.join(directory.name, 'portfolio_reports.zip')
+        with st.spinner("Генерация отчетов..."):
+            stats = ExportManager().create_pdf_batch(reports, path)
+        st.session_state.portfolio_reports = {
+            'directory': directory,
+            'path': path,
+            'stats': stats,
+            'file_id': st.session_state.get('portfolio_file_id')
+        }
+    
+    archive = st.session_state.get('portfolio_reports')
+    if archive is not None and archive['file_id'] != st.session_state.get('portfolio_file_id'):
+        # Архив по прежнему каталогу удаляется вместе с записью
+        del st.session_state.portfolio_reports
+        archive = None
+    if archive is None:
+        return
+    
+    stats = archive['stats']
+    st.caption(
+        f"Отчетов: {stats['reports']:,} за {stats['seconds']:.1f} с "
+        f"({stats['reports_per_second']:,.0f} отчетов/с)"
+    )
+    if stats['failed']:
+        st.warning(f"⚠️ Не удалось сформировать {len(stats['failed'])} отчетов")
+    
+    size_mb = os.path.getsize(archive['path']) / 2 ** 20
+    if size_mb > PORTFOLIO_REPORTS_MAX_ARCHIVE_MB:
+        st.warning(
+            f"⚠️ Архив занимает {size_mb:,.0f} МБ - больше {PORTFOLIO_REPORTS_MAX_ARCHIVE_MB} МБ, "
+            f"которые можно отдать через браузер. Разделите каталог на части."
+        )
+        return
+    
+    # Файл читается только при нажатии (и тогда целиком попадает в память сервера)
+    st.download_button(
+        label=f"📥 Скачать архив ({size_mb:,.1f} МБ)",
+        data=Path(archive['path']).read_bytes,
+        file_name="portfolio_reports.zip",
+        mime="application/zip"
+    )
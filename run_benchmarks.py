@@ -0,0 +1,200 @@
+"""
+Скрипт для запуска бенчмарков проекта
+
+Примеры:
+    python run_benchmarks.py
+    python run_benchmarks.py --sizes 1,1000 --only calculate
+    python run_benchmarks.py --compare benchmarks/results/<файл>.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks.suite import BENCHMARKS, BenchmarkData
+
+DEFAULT_SIZES = [1, 1_000, 100_000, 1_000_000]
+RESULTS_DIR = os.path.join("benchmarks", "results")
+
+# Повторы и прогрев: для больших каталогов достаточно одного прогона
+SMALL_SIZE_MAX = 10_000
+
+# Во сколько раз результат может быть медленнее базового без сигнала о регрессии
+REGRESSION_THRESHOLD = 1.25
+
+
+def git_revision():
+    """Текущий коммит и наличие незафиксированных изменений"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit, dirty
+
+
+def time_benchmark(benchmark, data, repeat, warmup=True):
+    """Замер времени выполнения (прогревочный вызов не учитывается)"""
+    if warmup:
+        benchmark.run(data)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        benchmark.run(data)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run(sizes, repeat, only=None, no_limits=False, seed=None, names=None):
+    """
+    Запуск бенчмарков для всех размеров каталога
+    
+    Args:
+        only: Подстроки имени - запускаются бенчмарки, содержащие любую из них
+        names: Точные имена бенчмарков
+    """
+    results = []
+    
+    for size in sizes:
+        data = BenchmarkData(size) if seed is None else BenchmarkData(size, seed)
+        small = size <= SMALL_SIZE_MAX
+        size_repeat = repeat if small else 1
+        
+        try:
+            for benchmark in BENCHMARKS:
+                if only and not any(pattern in benchmark.name for pattern in only):
+                    continue
+                if names is not None and benchmark.name not in names:
+                    continue
+                
+                entry = {"name": benchmark.name, "group": benchmark.group, "size": size}
+                if benchmark.max_size is not None and size > benchmark.max_size and not no_limits:
+                    entry["skipped"] = f"размер больше {benchmark.max_size:,}"
+                    results.append(entry)
+                    continue
+                
+                timings = time_benchmark(benchmark, data, size_repeat, warmup=small)
+                entry.update({
+                    "repeat": size_repeat,
+                    "min_s": min(timings),
+                    "median_s": statistics.median(timings),
+                    "per_sku_us": min(timings) / size * 1e6
+                })
+                results.append(entry)
+                print(f"{benchmark.name:<32} {size:>10,} SKU  {entry['min_s'] * 1000:>11.2f} мс  "
+                      f"{entry['per_sku_us']:>10.2f} мкс/SKU")
+        finally:
+            data.cleanup()
+    
+    return results
+
+
+def write_results(results, sizes, path):
+    """Запись результатов и сведений о запуске в JSON"""
+    commit, dirty = git_revision()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sizes": sizes,
+        "results": results
+    }
+    
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def save(results, sizes, output_dir):
+    """Сохранение результатов в JSON (имя файла - время и коммит)"""
+    commit, dirty = git_revision()
+    suffix = f"{commit}-dirty" if dirty else commit
+    started = datetime.now(timezone.utc)
+    return write_results(results, sizes, os.path.join(output_dir, f"{started.strftime('%Y%m%dT%H%M%SZ')}_{suffix}.json"))
+
+
+def compare(results, baseline_path, threshold, required=()):
+    """
+    Сравнение с базовым запуском (печатает таблицу времен: было, стало, изменение)
+    
+    Args:
+        required: Пары (бенчмарк, размер), которые обязаны быть сравнены
+            (например, PERF_GATE); пара без замера или базового значения
+            тоже считается регрессией
+    
+    Returns:
+        Список регрессий (бенчмарк, размер, было, стало); у обязательных пар
+        без сравнения отсутствующее время - None
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(entry["name"], entry["size"]): entry for entry in json.load(f)["results"]}
+    
+    regressions = []
+    compared = set()
+    print(f"\nСравнение с {baseline_path} (порог +{(threshold - 1) * 100:.0f}%):")
+    print(f"  {'Бенчмарк':<32} {'SKU':>10}  {'Было, мс':>11}  {'Стало, мс':>11}  {'Изменение':>9}")
+    for entry in results:
+        previous = baseline.get((entry["name"], entry["size"]))
+        if previous is None or "min_s" not in previous or "min_s" not in entry:
+            continue
+        
+        compared.add((entry["name"], entry["size"]))
+        ratio = entry["min_s"] / previous["min_s"] if previous["min_s"] > 0 else 1.0
+        mark = "⚠️ " if ratio > threshold else "  "
+        print(f"{mark}{entry['name']:<32} {entry['size']:>10,}  {previous['min_s'] * 1000:>11.2f}  "
+              f"{entry['min_s'] * 1000:>11.2f}  {(ratio - 1) * 100:>+8.1f}%")
+        if ratio > threshold:
+            regressions.append((entry["name"], entry["size"], previous["min_s"], entry["min_s"]))
+    
+    measured = {(entry["name"], entry["size"]): entry.get("min_s") for entry in results}
+    for name, size in required:
+        if (name, size) not in compared:
+            previous = baseline.get((name, size), {}).get("min_s")
+            print(f"⚠️ {name:<32} {size:>10,}  не сравнен: нет "
+                  f"{'базового значения' if previous is None else 'замера'}")
+            regressions.append((name, size, previous, measured.get((name, size))))
+    
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарки калькулятора юнит-экономики")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Размеры каталога через запятую (по умолчанию 1,1000,100000,1000000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Повторы замера для небольших каталогов")
+    parser.add_argument("--only", action="append", help="Запускать только бенчмарки, содержащие подстроку")
+    parser.add_argument("--no-limits", action="store_true", help="Не пропускать бенчмарки по max_size")
+    parser.add_argument("--seed", type=int, help="Зерно генератора входных данных")
+    parser.add_argument("--output-dir", default=RESULTS_DIR, help="Каталог для JSON с результатами")
+    parser.add_argument("--compare", help="JSON предыдущего запуска для поиска регрессий")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Допустимое замедление относительно базового запуска")
+    args = parser.parse_args()
+    
+    if not os.path.exists("benchmarks") or not os.path.exists("utils"):
+        print("ОШИБКА: Скрипт должен запускаться из корневой директории проекта")
+        sys.exit(1)
+    
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = run(sizes, args.repeat, only=args.only, no_limits=args.no_limits, seed=args.seed)
+    
+    path = save(results, sizes, args.output_dir)
+    print(f"\nРезультаты сохранены: {path}")
+    
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"\nНайдено регрессий: {len(regressions)}")
+            sys.exit(1)
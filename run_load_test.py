@@ -0,0 +1,73 @@
+"""
+Скрипт нагрузочного тестирования: N параллельных сессий мастера в одном процессе
+
+Примеры:
+    python run_load_test.py --sessions 10
+    python run_load_test.py --sessions 50 --passes 2 --think-time 2 --output load.json
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+
+from benchmarks.load import run_load_test
+from data.synthetic_catalog import DEFAULT_SEED
+
+
+def print_report(report):
+    """Вывод отчета нагрузочного теста"""
+    print(f"Сессий: {report['sessions']}, проходов: {report['completed_passes']} "
+          f"из {report['sessions'] * report['passes_per_session']} за {report['seconds']:.1f} с")
+    print(f"Пропускная способность: {report['reruns_per_second']:.1f} перезапусков/с, "
+          f"{report['passes_per_second']:.2f} проходов/с")
+    
+    print(f"\n{'Действие':<16} {'Кол-во':>7} {'p50, мс':>9} {'p95, мс':>9} {'p99, мс':>9} {'max, мс':>9}")
+    rows = [('Всего', report['latency']), ('Без очереди', report['service'])]
+    rows += list(report['latency_by_action'].items())
+    for action, summary in rows:
+        if summary:
+            print(f"{action:<16} {summary['count']:>7} {summary['p50_ms']:>9.0f} {summary['p95_ms']:>9.0f} "
+                  f"{summary['p99_ms']:>9.0f} {summary['max_ms']:>9.0f}")
+    
+    memory = report['memory']
+    if memory['process_growth_bytes'] is not None:
+        print(f"\nПамять процесса: +{memory['process_growth_bytes'] / 2**20:.1f} МБ "
+              f"({memory['process_growth_per_session_bytes'] / 2**20:.2f} МБ на сессию)")
+    if memory['session_state_bytes'] is not None:
+        print(f"Состояние сессии: {memory['session_state_bytes'] / 1024:.1f} КБ", end="")
+        if memory['session_state_growth_per_pass_bytes'] is not None:
+            print(f", +{memory['session_state_growth_per_pass_bytes'] / 1024:.1f} КБ за проход", end="")
+        print()
+    
+    for index, errors in report['failed_sessions'].items():
+        print(f"⚠️ Сессия {index}: {errors[0]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Нагрузочный тест калькулятора юнит-экономики")
+    parser.add_argument("--sessions", type=int, default=10, help="Количество параллельных сессий")
+    parser.add_argument("--passes", type=int, default=1, help="Проходов мастера в каждой сессии")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="Средняя пауза пользователя между действиями, с (0 - без пауз)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Зерно генератора входных данных")
+    parser.add_argument("--output", help="JSON для сохранения отчета")
+    args = parser.parse_args()
+    
+    if not os.path.exists("benchmarks") or not os.path.exists("utils"):
+        print("ОШИБКА: Скрипт должен запускаться из корневой директории проекта")
+        sys.exit(1)
+    
+    # Предупреждения Streamlit о запуске вне сервера не относятся к замеру
+    logging.disable(logging.WARNING)
+    
+    report = run_load_test(args.sessions, passes=args.passes, seed=args.seed, think_time=args.think_time)
+    print_report(report)
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nОтчет сохранен: {args.output}")
+    
+    if report['failed_sessions']:
+        sys.exit(1)
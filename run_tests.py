@@ -1,17 +1,89 @@
 """
 Скрипт для запуска тестов проекта
+
+Примеры:
+    python run_tests.py
+    python run_tests.py --perf                     # проверка скорости по базовому файлу
+    python run_tests.py --perf --update-baseline   # записать новый базовый файл
 """
+import argparse
 import unittest
 import pytest
 import sys
 import os
 
+# Горячие пути для проверки скорости: бенчмарк и размер каталога
+PERF_GATE = [
+    ("calculate_unit_economics", 1_000),
+    ("calculate_unit_economics_batch", 10_000),
+    ("calculate_cohort_ltv", 1_000),
+    ("create_excel_report", 1)
+]
+PERF_BASELINE_PATH = os.path.join("benchmarks", "baseline.json")
+PERF_MAX_SLOWDOWN_PERCENT = 25.0
+PERF_REPEAT = 10
+
+
+def run_performance_gate(baseline_path, max_slowdown_percent, repeat, update_baseline=False):
+    """
+    Замер горячих путей и сравнение с базовым файлом
+    
+    Returns:
+        True, если ни один горячий путь не замедлился больше допустимого
+    """
+    # Бенчмарки импортируются только в этом режиме: они тянут генератор каталога и экспорт
+    from run_benchmarks import compare, run, write_results
+    
+    # Базовый файл зависит от машины и в репозиторий не входит: без него проверка пропускается
+    if not update_baseline and not os.path.exists(baseline_path):
+        print(f"Проверка скорости пропущена: нет базового файла {baseline_path}. "
+              f"Запишите его на этой машине командой: python run_tests.py --perf --update-baseline")
+        return True
+    
+    sizes = sorted({size for _, size in PERF_GATE})
+    results = []
+    for size in sizes:
+        results += run([size], repeat, names={name for name, gate_size in PERF_GATE if gate_size == size})
+    
+    if update_baseline:
+        print(f"\nБазовый файл записан: {write_results(results, sizes, baseline_path)}")
+        return True
+    
+    regressions = compare(results, baseline_path, 1 + max_slowdown_percent / 100, required=PERF_GATE)
+    uncompared = [(name, size) for name, size, previous, current in regressions if previous is None or current is None]
+    if uncompared:
+        print(f"\nГорячие пути без сравнения с базовым файлом: {len(uncompared)}. "
+              f"Обновите его командой: python run_tests.py --perf --update-baseline")
+    if len(regressions) > len(uncompared):
+        print(f"\nГорячие пути медленнее базовых больше чем на {max_slowdown_percent:.0f}%: "
+              f"{len(regressions) - len(uncompared)}")
+    if regressions:
+        return False
+    
+    print("\nРегрессий скорости не найдено")
+    return True
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Тесты калькулятора юнит-экономики")
+    parser.add_argument("--perf", action="store_true", help="Проверка скорости горячих путей вместо тестов")
+    parser.add_argument("--baseline", default=PERF_BASELINE_PATH, help="Базовый файл с временами бенчмарков")
+    parser.add_argument("--max-slowdown", type=float, default=PERF_MAX_SLOWDOWN_PERCENT,
+                        help="Допустимое замедление относительно базового файла, %%")
+    parser.add_argument("--repeat", type=int, default=PERF_REPEAT, help="Повторы замера")
+    parser.add_argument("--update-baseline", action="store_true", help="Записать результаты как новый базовый файл")
+    args = parser.parse_args()
+    
     # Проверим, что рабочая директория содержит необходимые модули
     if not os.path.exists("utils") or not os.path.exists("tests"):
         print("ОШИБКА: Скрипт должен запускаться из корневой директории проекта")
         sys.exit(1)
     
+    if args.perf:
+        print("Проверка скорости горячих путей...")
+        passed = run_performance_gate(args.baseline, args.max_slowdown, args.repeat, args.update_baseline)
+        sys.exit(0 if passed else 1)
+    
     # Запускаем тесты через unittest
     print("Запуск тестов через unittest...")
     unittest_suite = unittest.defaultTestLoader.discover("tests")
@@ -23,4 +95,4 @@ if __name__ == "__main__":
     
     # Возвращаем код ошибки, если тесты не прошли
     if not unittest_result.wasSuccessful():
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
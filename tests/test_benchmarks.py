@@ -0,0 +1,104 @@
+"""
+Тесты для набора бенчмарков
+"""
+
+import json
+import os
+import tempfile
+import logging
+import unittest
+from benchmarks.load import run_load_test
+from benchmarks.suite import BENCHMARKS, BenchmarkData
+from run_benchmarks import compare
+from run_tests import run_performance_gate
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Тесты запуска бенчмарков и сравнения запусков"""
+    
+    def test_all_benchmarks_run(self):
+        """Каждый бенчмарк выполняется на небольшом каталоге"""
+        data = BenchmarkData(3)
+        try:
+            for benchmark in BENCHMARKS:
+                with self.subTest(benchmark=benchmark.name):
+                    benchmark.run(data)
+        finally:
+            data.cleanup()
+    
+    def test_compare_detects_regression(self):
+        """Замедление сверх порога считается регрессией"""
+        baseline = {'results': [
+            {'name': 'fast', 'size': 1, 'min_s': 1.0},
+            {'name': 'slow', 'size': 1, 'min_s': 1.0}
+        ]}
+        results = [
+            {'name': 'fast', 'size': 1, 'min_s': 1.1},
+            {'name': 'slow', 'size': 1, 'min_s': 2.0},
+            {'name': 'new', 'size': 1, 'min_s': 5.0}
+        ]
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'baseline.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(baseline, f)
+            regressions = compare(results, path, threshold=1.25)
+        
+        self.assertEqual([(name, size) for name, size, _, _ in regressions], [('slow', 1)])
+    
+    def test_compare_reports_uncompared_required(self):
+        """Обязательный бенчмарк без базового значения или замера не проходит молча"""
+        baseline = {'results': [
+            {'name': 'fast', 'size': 1, 'min_s': 1.0},
+            {'name': 'skipped', 'size': 1, 'min_s': 1.0},
+            {'name': 'failed', 'size': 1, 'error': 'ValueError'}
+        ]}
+        results = [
+            {'name': 'fast', 'size': 1, 'min_s': 1.0},
+            {'name': 'new', 'size': 1, 'min_s': 2.0},
+            {'name': 'failed', 'size': 1, 'min_s': 3.0}
+        ]
+        required = [('fast', 1), ('new', 1), ('skipped', 1), ('failed', 1)]
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'baseline.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(baseline, f)
+            regressions = compare(results, path, threshold=1.25, required=required)
+            self.assertEqual(compare(results, path, threshold=1.25), [])
+        
+        self.assertEqual(regressions, [('new', 1, None, 2.0), ('skipped', 1, 1.0, None), ('failed', 1, None, 3.0)])
+    
+    def test_performance_gate(self):
+        """Проверка скорости проходит по своему базовому файлу и падает на ускоренном"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'baseline.json')
+            self.assertTrue(run_performance_gate(path, 25.0, repeat=1, update_baseline=True))
+            self.assertTrue(run_performance_gate(path, 1000.0, repeat=1))
+            
+            with open(path, encoding='utf-8') as f:
+                baseline = json.load(f)
+            for entry in baseline['results']:
+                entry['min_s'] /= 100
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(baseline, f)
+            
+            self.assertFalse(run_performance_gate(path, 25.0, repeat=1))
+    
+    def test_load_test_completes_wizard(self):
+        """Параллельные сессии проходят мастер, дашборд и экспорт без ошибок"""
+        logging.disable(logging.WARNING)
+        try:
+            report = run_load_test(2, passes=1, seed=7)
+        finally:
+            logging.disable(logging.NOTSET)
+        
+        self.assertEqual(report['failed_sessions'], {})
+        self.assertEqual(report['completed_passes'], 2)
+        self.assertIn('export', report['latency_by_action'])
+        self.assertEqual(report['latency']['count'], report['reruns'])
+        self.assertGreater(report['memory']['session_state_bytes'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
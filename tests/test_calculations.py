@@ -3,7 +3,12 @@
 """
 
 import unittest
-from utils.calculations import UnitEconomicsCalculator
+from decimal import Decimal
+import numpy as np
+import pandas as pd
+from utils.calculations import BATCH_MONEY_COLUMNS, FLOAT32_BATCH_ERROR_BOUND, UnitEconomicsCalculator
+from utils.data_models import UnitInputs
+from utils.money import to_kopecks, total_rubles
 
 
 class TestUnitEconomicsCalculator(unittest.TestCase):
@@ -40,26 +45,26 @@ class TestUnitEconomicsCalculator(unittest.TestCase):
         
     def test_calculate_cogs(self):
         """Тест расчета себестоимости"""
-        cogs = self.calculator._calculate_cogs(self.test_data)
+        cogs = self.calculator._calculate_cogs(UnitInputs.from_dict(self.test_data))
         expected_cogs = 410  # 300 + 50 + 20 + 30 + 10
         self.assertEqual(cogs, expected_cogs)
         
     def test_calculate_marketplace_costs(self):
         """Тест расчета расходов маркетплейса"""
-        marketplace_costs = self.calculator._calculate_marketplace_costs(self.test_data)
+        marketplace_costs = self.calculator._calculate_marketplace_costs(UnitInputs.from_dict(self.test_data))
         # 1000 * 0.15 (commission) + 100 (fulfillment) + 50 (storage) + 20 (payment) + 1000 * 0.02 (OZON fee)
         expected_costs = 150 + 100 + 50 + 20 + 20
         self.assertEqual(marketplace_costs, expected_costs)
         
     def test_calculate_marketing_costs(self):
         """Тест расчета маркетинговых затрат"""
-        marketing_costs = self.calculator._calculate_marketing_costs(self.test_data)
+        marketing_costs = self.calculator._calculate_marketing_costs(UnitInputs.from_dict(self.test_data))
         expected_costs = 140  # 80 + 20 + 10 + 30
         self.assertEqual(marketing_costs, expected_costs)
         
     def test_calculate_operational_costs(self):
         """Тест расчета операционных затрат"""
-        operational_costs = self.calculator._calculate_operational_costs(self.test_data)
+        operational_costs = self.calculator._calculate_operational_costs(UnitInputs.from_dict(self.test_data))
         expected_costs = 90  # 40 + 20 + 30
         self.assertEqual(operational_costs, expected_costs)
         
@@ -76,6 +81,19 @@ class TestUnitEconomicsCalculator(unittest.TestCase):
         # Проверка маржинальности с небольшой погрешностью из-за чисел с плавающей точкой
         self.assertAlmostEqual(result['profit_margin'], 2.0, places=1)  # (20 / 1000) * 100
         
+    def test_unit_inputs_record(self):
+        """Запись UnitInputs дает тот же результат, что и словарь"""
+        record = UnitInputs.from_dict(self.test_data)
+        self.assertEqual(self.calculator.calculate_unit_economics(record),
+                         self.calculator.calculate_unit_economics(self.test_data))
+        
+        # Пустые значения заменяются значениями по умолчанию при нормализации
+        normalized = UnitInputs.from_dict({'selling_price': None, 'commission_rate': 0, 'marketplace': 'OZON'})
+        self.assertEqual(normalized.selling_price, 0)
+        self.assertEqual(normalized.commission_rate, 15)
+        self.assertEqual(normalized.marketplace, 'OZON')
+        self.assertIs(UnitInputs.coerce(record), record)
+        
     def test_edge_cases(self):
         """Тест обработки граничных случаев"""
         # Тест с нулевой ценой
@@ -117,6 +135,72 @@ class TestUnitEconomicsCalculator(unittest.TestCase):
         # Проверяем, что длина массива соответствует количеству месяцев
         self.assertEqual(len(result['retention_by_month']), min(36, cohort_data['customer_lifespan_months']))
 
+        
+    def test_batch_matches_scalar(self):
+        """Пакетный расчет совпадает со скалярным для каждой строки"""
+        rows = [
+            self.test_data,
+            dict(self.test_data, marketplace='Wildberries', commission_rate=0),
+            dict(self.test_data, selling_price=0, purchase_cost=None)
+        ]
+        
+        results = self.calculator.calculate_unit_economics_batch(pd.DataFrame(rows))
+        
+        for i, row in enumerate(rows):
+            expected = self.calculator.calculate_unit_economics(row)
+            for key, value in expected.items():
+                self.assertAlmostEqual(results.iloc[i][key], value, places=9)
+        
+        # Идентификаторы переносятся в результаты
+        self.assertEqual(results['marketplace'].tolist(), ['OZON', 'Wildberries', 'OZON'])
+    
+    def test_batch_fixed_point(self):
+        """Расчет в копейках сходится с итогами, посчитанными в Decimal"""
+        rows = [
+            dict(self.test_data, selling_price=999.99, commission_rate=17.5, purchase_cost=333.335),
+            dict(self.test_data, marketplace='Wildberries', selling_price=0.1, payment_amount=0.2),
+            dict(self.test_data, selling_price=0, purchase_cost=None)
+        ]
+        inputs = pd.DataFrame(rows * 1000)
+        
+        kopecks = self.calculator.calculate_unit_economics_batch_kopecks(inputs)
+        self.assertEqual(kopecks['unit_profit'].dtype, np.int64)
+        
+        # Комиссия 17.5% с 999.99 = 174.99825 -> 175.00, закупка 333.335 -> 333.34
+        self.assertEqual(kopecks['marketplace_costs'].iloc[0], 17500 + 10000 + 5000 + 2000 + 2000)
+        self.assertEqual(kopecks['total_cogs'].iloc[0], 33334 + 5000 + 2000 + 3000 + 1000)
+        
+        # Итог по каталогу точно равен сумме строк в Decimal
+        expected = sum(Decimal(int(k)) / 100 for k in kopecks['unit_profit'].iloc[:3]) * 1000
+        self.assertEqual(total_rubles(kopecks['unit_profit'].to_numpy()), expected)
+        
+        # Граница с float API: те же суммы в рублях, отличие от float-расчета - до копейки на статью
+        rubles = self.calculator.calculate_unit_economics_batch(inputs, fixed_point=True)
+        floats = self.calculator.calculate_unit_economics_batch(inputs)
+        for column in BATCH_MONEY_COLUMNS:
+            with self.subTest(column=column):
+                np.testing.assert_array_equal(to_kopecks(rubles[column]), kopecks[column])
+                np.testing.assert_allclose(rubles[column], floats[column], atol=0.05)
+    
+    def test_batch_float32(self):
+        """Расчет в float32 укладывается в документированную границу ошибки"""
+        rng = np.random.default_rng(7)
+        inputs = pd.DataFrame({
+            field: rng.uniform(0, 5000, 10_000)
+            for field in ['selling_price', 'purchase_cost', 'fulfillment_cost', 'ppc_cost_per_unit', 'customer_service']
+        })
+        inputs['selling_price'] *= 200
+        
+        reference = self.calculator.calculate_unit_economics_batch(inputs)
+        results = self.calculator.calculate_unit_economics_batch(inputs, float32=True)
+        
+        scale = (reference['selling_price'] + reference['total_costs']).to_numpy()
+        for column in BATCH_MONEY_COLUMNS:
+            with self.subTest(column=column):
+                self.assertEqual(results[column].dtype, np.float32)
+                error = np.abs(results[column].to_numpy(dtype=np.float64) - reference[column].to_numpy())
+                self.assertTrue(np.all(error <= FLOAT32_BATCH_ERROR_BOUND * scale))
+
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
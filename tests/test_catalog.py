@@ -0,0 +1,89 @@
+"""
+Тесты для столбцового каталога моделей
+"""
+
+import unittest
+import numpy as np
+import pandas as pd
+from utils.catalog import ENUM_CODE_DTYPE, ProductCatalog
+from utils.data_models import (
+    CostStructure,
+    CustomerMetrics,
+    MarketingCosts,
+    MarketplaceCosts,
+    MarketplaceType,
+    OperationalCosts,
+    ProductInfo
+)
+
+
+def make_models(i):
+    """Набор моделей одного SKU (часть SKU - с нулевыми знаменателями)"""
+    return (
+        ProductInfo(f"Товар {i}", "Одежда" if i % 2 else "Электроника", 1000.0 + i, 0.5, "10×10×10",
+                    MarketplaceType.OZON if i % 3 == 0 else MarketplaceType.WILDBERRIES),
+        CostStructure(300.0 + i, packaging_cost=20.0),
+        MarketplaceCosts(15.0, 50.0, 2.0, 30, 2.5),
+        MarketingCosts(10.0, 25.0, 2.5 if i % 5 else 0.0, external_marketing=5.0),
+        OperationalCosts(100000.0, 50000.0, 5000.0, 15.0, 8.0, 100.0, 0 if i % 7 == 0 else 100 + i),
+        CustomerMetrics(25.0, 1.5, 18, cross_sell_revenue=50.0)
+    )
+
+
+class TestProductCatalog(unittest.TestCase):
+    """Тесты каталога в виде столбцов NumPy"""
+    
+    def setUp(self):
+        self.models = [make_models(i) for i in range(30)]
+        self.catalog = ProductCatalog.from_models(self.models)
+    
+    def test_metrics_match_dataclasses(self):
+        """Показатели по массивам и по строке совпадают со свойствами dataclass"""
+        for i, (product, costs, marketplace, marketing, operational, customer) in enumerate(self.models):
+            row = self.catalog[i]
+            expected = {
+                'total_cogs': costs.total_cogs,
+                'marketplace_costs': marketplace.calculate_total_costs(product.selling_price),
+                'marketing_costs': marketing.calculate_total_costs(product.selling_price),
+                'cac_ppc': marketing.cac_ppc,
+                'fixed_cost_per_unit': operational.fixed_cost_per_unit,
+                'total_operational_cost_per_unit': operational.total_operational_cost_per_unit,
+                'ltv': customer.calculate_ltv(product.selling_price)
+            }
+            for name, value in expected.items():
+                with self.subTest(sku=i, metric=name):
+                    self.assertAlmostEqual(getattr(self.catalog, name)[i], value, places=9)
+                    self.assertAlmostEqual(getattr(row, name), value, places=9)
+            
+            self.assertEqual(row.to_models(), self.models[i])
+    
+    def test_codes_and_views(self):
+        """Перечисления хранятся кодами, строки и срезы не копируют данные"""
+        self.assertEqual(self.catalog.marketplace.dtype, ENUM_CODE_DTYPE)
+        self.assertEqual(int(self.catalog.enum_mask('marketplace', MarketplaceType.OZON).sum()), 10)
+        self.assertEqual(int(self.catalog.category_mask('Одежда').sum()), 15)
+        
+        head = self.catalog[:10]
+        self.assertTrue(np.shares_memory(head.selling_price, self.catalog.selling_price))
+        
+        row = self.catalog[3]
+        self.catalog.selling_price[3] = 5000.0
+        self.assertEqual(row.selling_price, 5000.0)
+        self.assertEqual(row.marketplace, MarketplaceType.OZON)
+    
+    def test_from_frame_defaults(self):
+        """Отсутствующие столбцы получают значения по умолчанию моделей"""
+        catalog = ProductCatalog.from_frame(pd.DataFrame({
+            'selling_price': [100.0, 200.0],
+            'purchase_cost': [40.0, None],
+            'marketplace': ['OZON', 'Неизвестный']
+        }))
+        
+        self.assertEqual(catalog.purchase_cost.tolist(), [40.0, 0.0])
+        self.assertEqual(catalog.packaging_cost.tolist(), [0.0, 0.0])
+        self.assertEqual([row.marketplace for row in catalog], [MarketplaceType.OZON, MarketplaceType.OTHER])
+        self.assertEqual(catalog.to_frame()['marketplace'].tolist(), ['OZON', 'Другой'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+Тесты для модуля columnar.py
+"""
+
+import io
+import unittest
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.calculations import UnitEconomicsCalculator
+from utils.columnar import read_arrow, read_parquet, to_arrow_table, write_arrow, write_parquet
+
+
+class TestColumnar(unittest.TestCase):
+    """Тесты столбцового обмена данными"""
+    
+    def setUp(self):
+        """Подготовка входных данных каталога"""
+        self.inputs = pd.DataFrame({
+            'sku': ['A', 'B', 'C', 'D'],
+            'marketplace': ['OZON', 'Wildberries', 'OZON', 'Яндекс.Маркет'],
+            'category': ['Электроника', 'Одежда', 'Одежда', 'Электроника'],
+            'selling_price': [1000.0, 500.0, 800.0, 1234.56],
+            'purchase_cost': [400.0, 200.0, 300.0, 600.0],
+            'commission_rate': [15.0, 17.0, 12.0, 10.0]
+        })
+    
+    def test_schema(self):
+        """Маркетплейс и категория кодируются словарем, float32 по запросу"""
+        schema = to_arrow_table(self.inputs, float32=True).schema
+        
+        self.assertTrue(pa.types.is_dictionary(schema.field('marketplace').type))
+        self.assertTrue(pa.types.is_dictionary(schema.field('category').type))
+        self.assertFalse(pa.types.is_dictionary(schema.field('sku').type))
+        self.assertEqual(schema.field('selling_price').type, pa.float32())
+    
+    def test_parquet_round_trip_into_engine(self):
+        """Входные данные из Parquet сразу подаются в расчетный движок"""
+        output = io.BytesIO()
+        write_parquet(self.inputs, output)
+        output.seek(0)
+        inputs = read_parquet(output)
+        
+        calculator = UnitEconomicsCalculator()
+        expected = calculator.calculate_unit_economics_batch(self.inputs)
+        actual = calculator.calculate_unit_economics_batch(inputs)
+        
+        np.testing.assert_allclose(actual['unit_profit'], expected['unit_profit'])
+        self.assertEqual(list(actual['marketplace']), list(self.inputs['marketplace']))
+    
+    def test_parquet_chunks(self):
+        """Части дописываются в один файл"""
+        output = io.BytesIO()
+        rows = write_parquet(iter([self.inputs.iloc[:2], self.inputs.iloc[2:]]), output, float32=True)
+        output.seek(0)
+        
+        self.assertEqual(rows, 4)
+        self.assertEqual(pq.read_metadata(output).num_rows, 4)
+        
+        output.seek(0)
+        result = read_parquet(output, columns=['sku', 'selling_price'])
+        self.assertEqual(result['selling_price'].dtype, np.float64)
+        self.assertAlmostEqual(result['selling_price'].iloc[3], 1234.56, places=3)
+    
+    def test_arrow_round_trip(self):
+        """Arrow IPC сохраняет значения без потерь"""
+        output = io.BytesIO()
+        write_arrow(self.inputs, output)
+        output.seek(0)
+        result = read_arrow(output)
+        
+        pd.testing.assert_series_equal(result['selling_price'], self.inputs['selling_price'])
+        self.assertEqual(list(result['category']), list(self.inputs['category']))
+
+
+if __name__ == '__main__':
+    unittest.main()
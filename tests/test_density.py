@@ -0,0 +1,45 @@
+"""
+Тесты для модуля density.py
+"""
+
+import unittest
+import numpy as np
+from utils.density import choose_render_mode, density_scatter_figure, robust_range
+
+
+class TestDensityScatter(unittest.TestCase):
+    """Тесты выбора способа отображения больших наборов точек"""
+    
+    def test_mode_thresholds(self):
+        """Способ отображения переключается по порогам"""
+        self.assertEqual(choose_render_mode(100, raw_max=1000, webgl_max=10000), 'raw')
+        self.assertEqual(choose_render_mode(5000, raw_max=1000, webgl_max=10000), 'webgl')
+        self.assertEqual(choose_render_mode(50000, raw_max=1000, webgl_max=10000), 'density')
+    
+    def test_small_set_uses_markers(self):
+        """Небольшой набор отображается обычными маркерами"""
+        fig = density_scatter_figure([1, 2, 3], [4, 5, 6])
+        
+        self.assertEqual(fig.data[0].type, 'scatter')
+        self.assertEqual(len(fig.data[0].x), 3)
+    
+    def test_large_set_is_binned(self):
+        """Большой набор агрегируется в корзины: в них все точки, кроме отсеченных выбросов"""
+        rng = np.random.default_rng(0)
+        x = rng.uniform(0, 100, 20000)
+        y = rng.uniform(0, 50, 20000)
+        
+        fig = density_scatter_figure(x, y, raw_max=100, webgl_max=1000, bins=(10, 5))
+        z = np.array(fig.data[0].z, dtype=float)
+        
+        self.assertEqual(fig.data[0].type, 'heatmap')
+        self.assertEqual(z.shape, (5, 10))
+        self.assertEqual(fig.layout.meta['render_mode'], 'density')
+        # Выбросы за пределами диапазона корзин отсекаются (по 0.5% с каждой стороны)
+        (x_low, x_high), (y_low, y_high) = robust_range(x), robust_range(y)
+        inside = (x >= x_low) & (x <= x_high) & (y >= y_low) & (y <= y_high)
+        self.assertEqual(np.nansum(z), inside.sum())
+
+
+if __name__ == '__main__':
+    unittest.main()
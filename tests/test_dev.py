@@ -0,0 +1,159 @@
+"""
+Тесты отслеживания изменений сервера разработки
+"""
+
+import contextlib
+import importlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from streamlit.runtime.pages_manager import PagesManager
+from streamlit.watcher.local_sources_watcher import LocalSourcesWatcher
+from watchdog.events import FileModifiedEvent
+import dev
+from dev import RED, StreamlitHandler, start_log_pumps
+
+
+class TestStreamlitHandler(unittest.TestCase):
+    """Тесты фильтрации, объединения и проверки содержимого изменений"""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+        os.makedirs(os.path.join(self.root, "utils"))
+        for name in ("app.py", "utils/calculations.py", "unit_economics_товар.json", "notes.txt"):
+            self.write(name, "initial")
+        
+        self.batches = []
+        self.flushed = threading.Event()
+        
+        def process(paths):
+            self.batches.append(paths)
+            self.flushed.set()
+        
+        self.handler = StreamlitHandler(process, debounce=0.05, root=self.root)
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def write(self, name, content):
+        with open(os.path.join(self.root, name), "w", encoding="utf-8") as f:
+            f.write(content)
+    
+    def modify(self, name, content=None):
+        if content is not None:
+            self.write(name, content)
+        self.handler.on_any_event(FileModifiedEvent(os.path.join(self.root, name)))
+    
+    def test_burst_is_coalesced(self):
+        """Пачка изменений - одна перезагрузка, только измененные файлы"""
+        self.modify("utils/calculations.py", "changed")
+        self.modify("utils/calculations.py", "changed again")
+        self.modify("app.py")  # сохранен без изменений
+        self.modify("unit_economics_товар.json", "saved calculation")
+        self.modify("notes.txt", "not watched")
+        
+        self.assertTrue(self.flushed.wait(2))
+        self.assertEqual(self.batches, [["utils/calculations.py"]])
+    
+    def test_unchanged_content_is_ignored(self):
+        """Файл без изменения содержимого не вызывает перезагрузку"""
+        self.modify("app.py")
+        
+        self.assertFalse(self.flushed.wait(0.3))
+        self.assertEqual(self.batches, [])
+
+
+class TestReloadMode(unittest.TestCase):
+    """Тесты перезагрузки кода в работающем сервере (--mode reload)"""
+    
+    def test_handle_change(self):
+        """Код применяет Streamlit, остальные отслеживаемые файлы перезапускают сервер"""
+        with mock.patch.object(dev, 'reload_mode', True, create=True), \
+                mock.patch.object(dev, 'restart_streamlit') as restart, \
+                contextlib.redirect_stdout(io.StringIO()):
+            dev.handle_change(["app.py", "utils/calculations.py"])
+            restart.assert_not_called()
+            
+            dev.handle_change(["utils/calculations.py", ".streamlit/settings.json"])
+            restart.assert_called_once()
+        
+        with mock.patch.object(dev, 'reload_mode', False, create=True), \
+                mock.patch.object(dev, 'restart_streamlit') as restart:
+            dev.handle_change(["utils/calculations.py"])
+            restart.assert_called_once()
+    
+    def test_streamlit_watcher_unloads_changed_modules(self):
+        """Наблюдатель Streamlit выгружает измененный модуль и импортирующие его - скрипт видит новый код"""
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, "reload_fixture"))
+            for name, source in (("main.py", "import reload_fixture.user\n"), ("reload_fixture/__init__.py", ""),
+                                 ("reload_fixture/base.py", "VALUE = 1\n"),
+                                 ("reload_fixture/user.py", "from reload_fixture.base import VALUE\n")):
+                with open(os.path.join(root, name), "w", encoding="utf-8") as f:
+                    f.write(source)
+            
+            sys.path.insert(0, root)
+            uses_pages_directory = PagesManager.uses_pages_directory
+            watcher = LocalSourcesWatcher(PagesManager(os.path.join(root, "main.py")))
+            PagesManager.uses_pages_directory = uses_pages_directory
+            try:
+                self.assertEqual(importlib.import_module("reload_fixture.user").VALUE, 1)
+                changed = threading.Event()
+                watcher.register_file_change_callback(lambda path: changed.set())
+                watcher.update_watched_modules()
+                time.sleep(0.2)
+                changed.clear()
+                
+                with open(os.path.join(root, "reload_fixture", "base.py"), "w", encoding="utf-8") as f:
+                    f.write("VALUE = 2\n")
+                self.assertTrue(changed.wait(10))
+                
+                # Начало следующего прогона скрипта
+                watcher.on_script_run()
+                self.assertNotIn("reload_fixture.base", sys.modules)
+                self.assertNotIn("reload_fixture.user", sys.modules)
+                self.assertEqual(importlib.import_module("reload_fixture.user").VALUE, 2)
+            finally:
+                watcher.close()
+                sys.path.remove(root)
+                for name in [name for name in sys.modules if name.startswith("reload_fixture")]:
+                    del sys.modules[name]
+
+
+class TestLogPumps(unittest.TestCase):
+    """Тесты пересылки вывода процесса"""
+    
+    def test_streams_are_drained_concurrently(self):
+        """Объемный stderr не блокирует процесс, строки получают время и цвет уровня"""
+        script = (
+            "import sys\n"
+            "for i in range(2000): sys.stderr.write('debug ' + 'x' * 100 + '\\n')\n"
+            "print('ready')\n"
+            "sys.stderr.write('Traceback (most recent call last):\\n  File x\\nValueError: boom\\n')\n"
+        )
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            process = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE,
+                                       stderr=subprocess.PIPE, universal_newlines=True, bufsize=1)
+            threads = start_log_pumps(process)
+            self.assertEqual(process.wait(timeout=30), 0)
+            for thread in threads:
+                thread.join(timeout=5)
+        
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 2000 + 1 + 3)
+        self.assertTrue(any(line.endswith("out ready") for line in lines))
+        self.assertIn(RED, next(line for line in lines if "File x" in line))
+        self.assertIn(RED, next(line for line in lines if "ValueError" in line))
+        self.assertNotIn(RED, lines[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
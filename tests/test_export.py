@@ -0,0 +1,234 @@
+"""
+Тесты для модуля export.py
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+import unittest
+import zipfile
+from unittest import mock
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from utils import export
+from utils.export import ExportManager, orjson
+
+
+class TestCalculationExport(unittest.TestCase):
+    """Тесты экспорта одного расчета"""
+    
+    def setUp(self):
+        """Подготовка данных расчета"""
+        self.data = {
+            'product_name': 'Кружка',
+            'selling_price': 1000.0,
+            'unit_profit': 120.0,
+            'profit_margin': 12.0,
+            'scenarios': {'Базовый': {'selling_price': 1000.0, 'unit_profit': 120.0}}
+        }
+    
+    def test_csv_report(self):
+        """CSV содержит табличные разделы отчета, а не JSON"""
+        content = ExportManager().create_csv_report(self.data).decode('utf-8-sig')
+        
+        self.assertTrue(content.startswith('Основные результаты\nПараметр,Значение\n'))
+        self.assertIn('\nДетальные расчеты\nКатегория затрат,Статья расходов,Сумма (₽),Доля от цены (%)\n', content)
+        self.assertIn('\nСценарии\n', content)
+        self.assertIn('Товар,Кружка', content)
+    
+    def test_excel_report_sheets(self):
+        """Excel содержит те же разделы на отдельных листах"""
+        workbook = load_workbook(io.BytesIO(ExportManager().create_excel_report(self.data)))
+        
+        self.assertEqual(workbook.sheetnames, ['Основные результаты', 'Детальные расчеты', 'Сценарии', 'Рекомендации'])
+    
+    def test_content_digest(self):
+        """Хэш не зависит от порядка ключей и меняется вместе с данными"""
+        reordered = dict(reversed(list(self.data.items())))
+        changed = dict(self.data, selling_price=1100.0)
+        
+        self.assertEqual(ExportManager.content_digest(self.data), ExportManager.content_digest(reordered))
+        self.assertNotEqual(ExportManager.content_digest(self.data), ExportManager.content_digest(changed))
+
+
+class TestCatalogExcelExport(unittest.TestCase):
+    """Тесты потокового Excel отчета по каталогу"""
+    
+    def setUp(self):
+        """Подготовка частей результатов пакетного расчета"""
+        self.chunks = [
+            pd.DataFrame({
+                'sku': ['A', 'B', 'C'],
+                'marketplace': ['OZON', 'Wildberries', 'OZON'],
+                'selling_price': [1000.0, 500.0, 800.0],
+                'unit_profit': [200.0, np.nan, 80.0]
+            }),
+            pd.DataFrame({
+                'sku': ['D', 'E'],
+                'marketplace': ['Wildberries', 'Яндекс.Маркет'],
+                'selling_price': [300.0, 2000.0],
+                'unit_profit': [-30.0, 600.0]
+            })
+        ]
+    
+    def test_single_sheet(self):
+        """Все части записываются на один лист под общим заголовком"""
+        output = io.BytesIO()
+        rows = ExportManager().write_catalog_excel(iter(self.chunks), output)
+        
+        sheet = load_workbook(output).active
+        values = list(sheet.values)
+        
+        self.assertEqual(rows, 5)
+        self.assertEqual(values[0], ('SKU', 'Маркетплейс', 'Цена продажи (₽)', 'Прибыль с единицы (₽)'))
+        self.assertEqual(len(values), 6)
+        self.assertIsNone(values[2][3])
+    
+    def test_split_by_marketplace(self):
+        """Отдельный лист для каждого маркетплейса"""
+        output = io.BytesIO()
+        ExportManager().write_catalog_excel(self.chunks, output, split_by_marketplace=True)
+        
+        workbook = load_workbook(output)
+        
+        self.assertEqual(workbook.sheetnames, ['OZON', 'Wildberries', 'Яндекс.Маркет'])
+        self.assertEqual([row[0] for row in workbook['Wildberries'].values], ['SKU', 'B', 'D'])
+    
+    def test_ndjson_records(self):
+        """NDJSON: одна запись на SKU, NaN выгружается как null"""
+        output = io.BytesIO()
+        stats = ExportManager().write_catalog_ndjson(iter(self.chunks), output, backend='json')
+        records = [json.loads(line) for line in output.getvalue().decode('utf-8').splitlines()]
+        
+        self.assertEqual(stats['records'], 5)
+        self.assertEqual([record['sku'] for record in records], ['A', 'B', 'C', 'D', 'E'])
+        self.assertIsNone(records[1]['unit_profit'])
+        self.assertEqual(records[4]['marketplace'], 'Яндекс.Маркет')
+    
+    def test_ndjson_backends_match(self):
+        """Ускоренный сериализатор дает те же записи"""
+        if orjson is None:
+            self.skipTest("orjson не установлен")
+        
+        outputs = {}
+        for backend in ('json', 'orjson'):
+            outputs[backend] = io.BytesIO()
+            ExportManager().write_catalog_ndjson(self.chunks, outputs[backend], columns=['sku', 'unit_profit'], backend=backend)
+        
+        parse = lambda output: [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(parse(outputs['json']), parse(outputs['orjson']))
+        
+        with self.assertRaises(ValueError):
+            ExportManager().write_catalog_ndjson(self.chunks, io.BytesIO(), backend='yaml')
+    
+    def test_empty_catalog(self):
+        """Пустой каталог дает книгу с заголовком"""
+        output = io.BytesIO()
+        rows = ExportManager().write_catalog_excel([], output)
+        
+        self.assertEqual(rows, 0)
+        self.assertEqual(load_workbook(output).active.max_row, 1)
+
+
+class TestCatalogExportMemory(unittest.TestCase):
+    """Пиковая память потокового экспорта каталога не зависит от числа строк"""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    @staticmethod
+    def catalog(rows: int) -> pd.DataFrame:
+        rng = np.random.default_rng(0)
+        return pd.DataFrame({
+            'sku': [f'SKU-{i}' for i in range(rows)],
+            'marketplace': rng.choice(['OZON', 'Wildberries'], rows),
+            'selling_price': rng.uniform(100, 2000, rows),
+            'unit_profit': np.where(rng.random(rows) < 0.1, np.nan, rng.uniform(-100, 500, rows))
+        })
+    
+    def peak_memory(self, write, frame: pd.DataFrame, suffix: str) -> int:
+        path = os.path.join(self.tmpdir.name, f'catalog.{suffix}')
+        tracemalloc.start()
+        try:
+            write(frame, path)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    
+    def test_peak_memory_is_flat(self):
+        """DataFrame целиком режется на части: память при 4x строк почти та же"""
+        small, large = self.catalog(4_000), self.catalog(16_000)
+        writers = {'xlsx': ExportManager().write_catalog_excel, 'ndjson': ExportManager().write_catalog_ndjson}
+        
+        with mock.patch.object(export, 'CATALOG_CHUNK_ROWS', 1_000):
+            for suffix, write in writers.items():
+                with self.subTest(format=suffix):
+                    small_peak = self.peak_memory(write, small, suffix)
+                    large_peak = self.peak_memory(write, large, suffix)
+                    self.assertLess(large_peak, small_peak * 1.3)
+
+
+class TestPDFBatch(unittest.TestCase):
+    """Тесты пакетной генерации PDF отчетов"""
+    
+    def setUp(self):
+        """Подготовка данных отчетов"""
+        # Исполнители spawn заново выполняют главный модуль, а AppTest в других
+        # тестах оставляет главным модулем свой временный скрипт
+        self.addCleanup(sys.modules.__setitem__, '__main__', sys.modules['__main__'])
+        sys.modules['__main__'] = sys.modules[__name__]
+        self.reports = [
+            {'sku': f'SKU-{i}', 'product_name': 'Кружка', 'selling_price': 1000.0 + i, 'unit_profit': 100.0}
+            for i in range(5)
+        ]
+    
+    def test_single_report(self):
+        """Отчет по одному товару: кириллица выводится встроенным шрифтом"""
+        content = ExportManager().create_pdf_report(self.reports[0])
+        
+        self.assertIsInstance(content, bytes)
+        self.assertTrue(content.startswith(b'%PDF'))
+        self.assertIn(b'DejaVuSans', content)
+        # Глифы «К» и «ж» есть в таблице соответствия символов шрифта
+        self.assertIn(b'<041A>', content)
+        self.assertIn(b'<0436>', content)
+    
+    def test_batch_in_process(self):
+        """Все отчеты попадают в архив, ошибочные учитываются отдельно"""
+        reports = self.reports + [{'sku': 'SKU-0', 'selling_price': 'не число'}]
+        output = io.BytesIO()
+        stats = ExportManager().create_pdf_batch(iter(reports), output, max_workers=0)
+        
+        self.assertEqual(stats['reports'], 5)
+        self.assertEqual(len(stats['failed']), 1)
+        self.assertGreater(stats['reports_per_second'], 0)
+        self.assertEqual(sorted(zipfile.ZipFile(output).namelist()), [f'SKU-{i}.pdf' for i in range(5)])
+    
+    def test_batch_process_pool(self):
+        """Генерация в пуле процессов"""
+        output = io.BytesIO()
+        stats = ExportManager().create_pdf_batch(self.reports, output, max_workers=2)
+        
+        self.assertEqual(stats['reports'], 5)
+        self.assertEqual(len(zipfile.ZipFile(output).namelist()), 5)
+    
+    def test_batch_process_pool_failure(self):
+        """Ошибка передачи отчета в процесс учитывается в failed, остальные отчеты пишутся"""
+        reports = self.reports + [{'sku': 'SKU-X', 'selling_price': lambda: 0}]
+        output = io.BytesIO()
+        stats = ExportManager().create_pdf_batch(reports, output, max_workers=2)
+        
+        self.assertEqual(stats['reports'], 5)
+        self.assertEqual([failure['name'] for failure in stats['failed']], ['SKU-X'])
+        self.assertEqual(len(zipfile.ZipFile(output).namelist()), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Тесты для модуля figure_cache.py
+"""
+
+import unittest
+import numpy as np
+import plotly.graph_objects as go
+from utils.figure_cache import VALUE_SIZE_BYTES, FigureCache, estimate_figure_size
+
+
+class TestFigureCache(unittest.TestCase):
+    """Тесты для класса FigureCache"""
+    
+    def setUp(self):
+        """Подготовка кэша и счетчика построений"""
+        self.cache = FigureCache(maxsize=2)
+        self.build_count = 0
+    
+    def _builder(self, values):
+        def build():
+            self.build_count += 1
+            return go.Figure(go.Bar(y=values))
+        return build
+    
+    def test_unchanged_data_is_not_rebuilt(self):
+        """Повторный запрос с теми же данными берется из кэша"""
+        first = self.cache.get_or_build('bars', [1, 2], self._builder([1, 2]))
+        second = self.cache.get_or_build('bars', [1, 2], self._builder([1, 2]))
+        
+        self.assertEqual(self.build_count, 1)
+        self.assertIs(first, second)
+        self.assertEqual(self.cache.stats['bars']['builds'], 1)
+        self.assertEqual(self.cache.stats['bars']['hits'], 1)
+        self.assertGreater(self.cache.stats['bars']['size_bytes'], 0)
+    
+    def test_changed_data_is_rebuilt(self):
+        """Изменение среза данных приводит к новому построению"""
+        self.cache.get_or_build('bars', [1, 2], self._builder([1, 2]))
+        self.cache.get_or_build('bars', [1, 3], self._builder([1, 3]))
+        
+        self.assertEqual(self.build_count, 2)
+        self.assertEqual(self.cache.stats['bars']['builds'], 2)
+    
+    def test_lru_eviction(self):
+        """При превышении размера вытесняется самая старая запись"""
+        self.cache.get_or_build('a', 1, self._builder([1]))
+        self.cache.get_or_build('b', 2, self._builder([2]))
+        self.cache.get_or_build('c', 3, self._builder([3]))
+        self.assertEqual(len(self.cache), 2)
+        
+        self.cache.get_or_build('a', 1, self._builder([1]))
+        self.assertEqual(self.build_count, 4)
+    
+    
+    def test_size_estimate(self):
+        """Размер графика оценивается по массивам трасс без сериализации"""
+        figure = go.Figure([go.Bar(x=list('abcd'), y=[1, 2, 3, 4]),
+                            go.Scatter(y=np.arange(100, dtype=np.float64))])
+        self.assertEqual(estimate_figure_size(figure), 8 * VALUE_SIZE_BYTES + 100 * 8)
+        
+        self.cache.get_or_build('chart', 1, lambda: figure)
+        self.assertEqual(self.cache.size_bytes, estimate_figure_size(figure))
+        self.assertEqual(self.cache.stats['chart']['size_bytes'], self.cache.size_bytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Тесты для модуля portfolio.py
+"""
+
+import unittest
+import numpy as np
+import pandas as pd
+from utils.portfolio import add_monthly_profit, margin_distribution, portfolio_kpis, query_portfolio
+
+
+class TestPortfolio(unittest.TestCase):
+    """Тесты для анализа портфеля"""
+    
+    def setUp(self):
+        """Подготовка результатов пакетного расчета"""
+        self.results = add_monthly_profit(pd.DataFrame({
+            'sku': ['A', 'B', 'C', 'D', 'E'],
+            'marketplace': ['OZON', 'OZON', 'Wildberries', 'Wildberries', 'OZON'],
+            'category': ['X', 'Y', 'X', 'Y', 'X'],
+            'selling_price': [1000.0, 500.0, 800.0, 300.0, 2000.0],
+            'unit_profit': [200.0, -50.0, 80.0, -30.0, 600.0],
+            'profit_margin': [20.0, -10.0, 10.0, -10.0, 30.0],
+            'monthly_sales_volume': [10.0, 20.0, 5.0, 100.0, 1.0]
+        }))
+    
+    def test_kpis(self):
+        """Агрегаты портфеля"""
+        kpis = portfolio_kpis(self.results)
+        
+        self.assertEqual(kpis['sku_count'], 5)
+        # 200*10 - 50*20 + 80*5 - 30*100 + 600*1
+        self.assertAlmostEqual(kpis['total_monthly_profit'], -1000.0)
+        self.assertAlmostEqual(kpis['loss_making_share'], 0.4)
+        self.assertAlmostEqual(kpis['median_margin'], 10.0)
+    
+    def test_kpis_accumulate_float64(self):
+        """Итоги по столбцам float32 накапливаются в float64, по копейкам - точно"""
+        results = pd.DataFrame({
+            'selling_price': np.full(1_000_000, 1.1, dtype=np.float32),
+            'unit_profit': np.full(1_000_000, 0.1, dtype=np.float32),
+            'monthly_sales_volume': np.ones(1_000_000, dtype=np.float32),
+            'profit_margin': np.full(1_000_000, 9.09, dtype=np.float32)
+        })
+        kpis = portfolio_kpis(results)
+        self.assertIsInstance(kpis['total_monthly_profit'], float)
+        self.assertAlmostEqual(kpis['total_monthly_profit'], 1_000_000 * float(np.float32(0.1)), places=3)
+        
+        results['unit_profit'] = np.full(1_000_000, 10, dtype=np.int64)
+        results['monthly_sales_volume'] = np.full(1_000_000, 3, dtype=np.int64)
+        self.assertEqual(portfolio_kpis(results)['total_monthly_profit'], 30_000_000)
+    
+    def test_kpis_empty(self):
+        """Пустой портфель не вызывает ошибок"""
+        kpis = portfolio_kpis(self.results.iloc[0:0])
+        self.assertEqual(kpis['sku_count'], 0)
+        self.assertEqual(kpis['loss_making_share'], 0.0)
+    
+    def test_query_filters_sorts_and_pages(self):
+        """Фильтрация, сортировка и постраничная выборка"""
+        page = query_portfolio(self.results, marketplaces=['OZON'], sort_by='unit_profit', page_size=2)
+        
+        self.assertEqual(page.total_rows, 3)
+        self.assertEqual(page.page_count, 2)
+        self.assertEqual(page.rows['sku'].tolist(), ['E', 'A'])
+        
+        second = query_portfolio(self.results, marketplaces=['OZON'], sort_by='unit_profit', page=2, page_size=2)
+        self.assertEqual(second.rows['sku'].tolist(), ['B'])
+        self.assertEqual((second.first_row, second.last_row), (3, 3))
+    
+    def test_query_loss_making_ascending(self):
+        """Только убыточные SKU по возрастанию прибыли"""
+        page = query_portfolio(self.results, loss_making_only=True, sort_by='unit_profit', ascending=True)
+        self.assertEqual(page.rows['sku'].tolist(), ['B', 'D'])
+    
+    def test_margin_distribution(self):
+        """Гистограмма учитывает все SKU"""
+        counts, edges = margin_distribution(self.results, bins=4)
+        self.assertEqual(counts.sum(), 5)
+        self.assertEqual(len(edges), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
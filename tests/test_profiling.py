@@ -0,0 +1,109 @@
+"""
+Тесты для модуля profiling.py
+"""
+
+import gc
+import time
+import unittest
+from utils.profiling import Tracer, TracingHooks, instrument, uninstrument
+
+
+class Sample:
+    """Класс с функциями для трассировки"""
+    
+    def outer(self):
+        self.inner()
+        self.inner()
+        return self.helper(2)
+    
+    def inner(self):
+        time.sleep(0.001)
+    
+    @staticmethod
+    def helper(value):
+        return value * 2
+
+
+class TestTracer(unittest.TestCase):
+    """Тесты трассировки функций"""
+    
+    def tearDown(self):
+        uninstrument(Sample)
+    
+    def test_disabled_tracer_records_nothing(self):
+        """Выключенный трассировщик не сохраняет перезапуски"""
+        instrument(Sample, 'test')
+        tracer = Tracer()
+        with tracer.rerun('script'):
+            Sample().outer()
+        
+        self.assertIsNone(tracer.last_rerun())
+    
+    def test_calls_and_timings(self):
+        """Вызовы считаются по функциям, staticmethod остается статическим"""
+        instrument(Sample, 'test')
+        tracer = Tracer()
+        tracer.set_enabled(True)
+        
+        with tracer.rerun('script'):
+            self.assertEqual(Sample().outer(), 4)
+            with tracer.rerun('fragment'):
+                Sample().inner()
+        
+        stats = {entry['name']: entry for entry in tracer.rerun_stats()}
+        
+        self.assertEqual(len(tracer.reruns), 1)
+        self.assertEqual(stats['Sample.outer']['calls'], 1)
+        self.assertEqual(stats['Sample.inner']['calls'], 3)
+        self.assertEqual(stats['Sample.helper']['calls'], 1)
+        self.assertEqual(stats['fragment']['category'], 'rerun')
+        self.assertGreaterEqual(stats['Sample.inner']['total_ms'], 3.0)
+        self.assertLess(tracer.untraced_ms(), tracer.last_rerun()['duration_ms'])
+    
+    def test_chrome_trace(self):
+        """Выгрузка в формате Chrome Trace Event"""
+        instrument(Sample, 'test')
+        tracer = Tracer()
+        tracer.set_enabled(True)
+        with tracer.rerun('script'):
+            Sample().inner()
+        
+        events = tracer.chrome_trace()['traceEvents']
+        
+        self.assertEqual([event['name'] for event in events], ['script', 'Sample.inner'])
+        self.assertTrue(all(event['ph'] == 'X' and event['dur'] >= 0 for event in events))
+    
+    def test_hooks_follow_sessions(self):
+        """Обертки стоят, пока трассировка включена хотя бы в одной сессии"""
+        hooks = TracingHooks()
+        hooks.add(Sample, 'test')
+        first, second = Tracer(hooks), Tracer(hooks)
+        
+        first.set_enabled(True)
+        second.set_enabled(True)
+        first.set_enabled(False)
+        self.assertTrue(hasattr(Sample.inner, '__traced__'))
+        
+        second.set_enabled(False)
+        self.assertFalse(hasattr(Sample.inner, '__traced__'))
+        self.assertFalse(hasattr(Sample.helper, '__traced__'))
+        self.assertEqual(Sample.helper(3), 6)
+    
+    def test_hooks_released_with_closed_session(self):
+        """Сессия, закрытая с включенной трассировкой, освобождает хуки"""
+        hooks = TracingHooks()
+        hooks.add(Sample, 'test')
+        tracer = Tracer(hooks)
+        tracer.set_enabled(True)
+        tracer.set_enabled(False)
+        tracer.set_enabled(True)
+        self.assertEqual(hooks.users, 1)
+        
+        del tracer
+        gc.collect()
+        self.assertEqual(hooks.users, 0)
+        self.assertFalse(hasattr(Sample.inner, '__traced__'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+"""
+Тесты справочных таблиц маркетплейсов
+"""
+
+import unittest
+from data import reference
+from data.marketplace_data import MARKETPLACE_COMMISSIONS, get_category_benchmark
+from utils.calculations import UnitEconomicsCalculator, shared_calculator
+
+
+class TestReferenceSegments(unittest.TestCase):
+    """Тесты таблицы сегментов маркетплейс × категория"""
+    
+    def test_segments_match_reference_data(self):
+        """Строки таблицы совпадают с тарифами и бенчмарками справочника"""
+        segments = reference.compile_segments()
+        pairs = [(marketplace, category) for marketplace, categories in MARKETPLACE_COMMISSIONS.items()
+                 for category in categories]
+        self.assertEqual(list(zip(segments['marketplace'], segments['category'])), pairs)
+        
+        row = segments[pairs.index(('OZON', 'Электроника'))]
+        tariff = MARKETPLACE_COMMISSIONS['OZON']['Электроника']
+        self.assertEqual(row['commission_rate'], tariff['commission_rate'])
+        self.assertEqual(row['packaging'], tariff['additional_fees']['packaging'])
+        self.assertEqual(row['avg_price'], get_category_benchmark('OZON', 'Электроника')['avg_price'])
+    
+    def test_segments_are_read_only(self):
+        """Общая таблица не изменяется"""
+        with self.assertRaises(ValueError):
+            reference.reference_segments()['commission_rate'][0] = 0
+    
+    def test_shared_per_process(self):
+        """Таблица и калькулятор создаются один раз на процесс"""
+        self.assertIs(reference.reference_segments(), reference.reference_segments())
+        self.assertIs(shared_calculator(), shared_calculator())
+        self.assertIsInstance(shared_calculator(), UnitEconomicsCalculator)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+"""
+Тесты компактной модели данных калькулятора
+"""
+
+import logging
+import os
+import pickle
+import unittest
+from unittest import mock
+from streamlit.testing.v1 import AppTest
+from benchmarks.load import APP_PATH, LoadSession
+from data.synthetic_catalog import generate_catalog
+from utils.calculations import UnitEconomicsCalculator
+from utils.session import DERIVED_KEYS, MISSING, RESULT_KEYS, STEP_RESULTS, CalculatorSession
+
+
+INPUTS = {
+    'marketplace': 'OZON',
+    'product_name': 'Товар',
+    'selling_price': 1000.0,
+    'purchase_cost': 300.0,
+    'commission_rate': 15.0,
+    'fulfillment_cost': 100.0,
+    'ppc_cost_per_unit': 80.0,
+    'monthly_sales_volume': 100
+}
+
+
+class TestCalculatorSession(unittest.TestCase):
+    """Тесты вводов, кэша результатов и истории отмены"""
+    
+    def setUp(self):
+        self.calculator = UnitEconomicsCalculator()
+        self.session = CalculatorSession(history_size=10)
+        self.session.update(INPUTS)
+        self.result = self.calculator.calculate_unit_economics(self.session)
+        self.session.update(self.result)
+    
+    def test_result_keys_match_calculator(self):
+        """Ключи кэша - результаты calculate_unit_economics, кроме ввода selling_price"""
+        self.assertEqual(set(RESULT_KEYS) | {'selling_price'}, set(self.result))
+    
+    def test_behaves_like_calculator_dict(self):
+        """Словарный интерфейс совпадает с прежним плоским словарем"""
+        expected = dict(INPUTS, commission_amount=150.0, mandatory_marketing=20.0, **self.result)
+        
+        self.assertEqual(dict(self.session), expected)
+        self.assertEqual(self.session.copy(), expected)
+        self.assertEqual(len(self.session), len(expected))
+        self.assertIn('unit_profit', self.session)
+        self.assertEqual(self.session.get('missing', 0), 0)
+        self.assertEqual(self.calculator.calculate_unit_economics(self.session), self.result)
+    
+    def test_results_are_evicted_and_recomputed(self):
+        """Вытесненные и устаревшие результаты пересчитываются из вводов"""
+        self.session.evict_results()
+        self.assertEqual(self.session['unit_profit'], self.result['unit_profit'])
+        
+        self.session.update({'scenarios': {'Реалистичный': self.result}})
+        self.session['selling_price'] = 1200.0
+        
+        self.assertEqual(self.session['unit_profit'], self.calculator.calculate_unit_economics(
+            dict(INPUTS, selling_price=1200.0))['unit_profit'])
+        # Сценарии по прежним вводам сбрасываются
+        for key in DERIVED_KEYS:
+            self.assertNotIn(key, self.session)
+    
+    def test_step_results(self):
+        """Показатели этапов не хранятся, а считаются из вводов по формулам этапов"""
+        self.session.update({
+            'ppc_budget_percent': 10.0, 'ppc_cost_per_unit': 100.0, 'avg_cpc': 15.0, 'conversion_rate': 3.0,
+            'external_marketing': 0.0, 'influencer_marketing': 0.0, 'content_creation': 50.0,
+            'total_marketing_costs': 150.0
+        })
+        
+        self.assertNotIn('total_marketing_costs', self.session.inputs)
+        self.assertEqual(self.session['total_marketing_costs'], 150.0)
+        self.assertAlmostEqual(self.session['cac_ppc'], 500.0)
+        
+        self.session['selling_price'] = 2000.0
+        self.assertEqual(self.session['ppc_cost_per_unit'], 200.0)
+        self.assertEqual(self.session['total_marketing_costs'], 250.0)
+        self.assertEqual(self.session['marketing_costs'], 250.0)
+        
+        # Без исходных данных (старый сохраненный расчет) показатель хранится как ввод
+        legacy = CalculatorSession({'selling_price': 1000.0, 'total_cost': 420.0})
+        self.assertEqual(legacy.inputs['total_cost'], 420.0)
+        legacy.update({'purchase_cost': 400.0, 'packaging_cost': 10.0, 'labeling_cost': 0.0,
+                       'quality_control': 0.0, 'certification': 0.0, 'total_cost': 410.0})
+        self.assertNotIn('total_cost', legacy.inputs)
+        self.assertEqual(legacy['total_cost'], 410.0)
+    
+    def test_wizard_reads_step_results(self):
+        """Этапы app.py сохраняют только вводы, показатели этапов считает сессия"""
+        logging.disable(logging.WARNING)
+        try:
+            session = LoadSession(0, generate_catalog(1, seed=3).to_dict('records'), seed=3).run()
+        finally:
+            logging.disable(logging.NOTSET)
+        
+        self.assertEqual(session.errors, [])
+        data = session.app_test.session_state['calculator_data']
+        self.assertEqual(set(STEP_RESULTS) & set(data.inputs), set())
+        for key in STEP_RESULTS:
+            self.assertIn(key, data)
+    
+    def test_wizard_undo_reseeds_widgets(self):
+        """Отмена в мастере возвращает виджеты, включая пересчитываемые из вводов"""
+        with mock.patch.dict(os.environ, {'UNIT_ECON_UNDO_STEPS': '5'}):
+            at = AppTest.from_file(APP_PATH, default_timeout=60)
+            at.session_state['current_step'] = 4
+            at.run()
+            storage_total = at.session_state['calculator_data']['storage_total']
+            
+            at.number_input(key='storage_cost_per_day').set_value(7.0).run()
+            self.assertNotEqual(at.session_state['calculator_data']['storage_total'], storage_total)
+            
+            next(button for button in at.sidebar.button if 'Отменить' in button.label).click().run()
+        
+        self.assertEqual(len(at.exception), 0)
+        self.assertEqual(at.session_state['calculator_data']['storage_total'], storage_total)
+        self.assertEqual(at.session_state['storage_cost_per_day'], 2.0)
+    
+    def test_undo_redo(self):
+        """История хранит изменившиеся ключи и отменяет их по одному обновлению"""
+        self.session.clear_history()
+        self.session.update(INPUTS)  # без изменений - не попадает в историю
+        self.assertFalse(self.session.can_undo)
+        
+        self.session.update({'selling_price': 1500.0, 'weight': 0.5})
+        self.session.update({'purchase_cost': 400.0})
+        
+        self.assertEqual(self.session.undo(), {'purchase_cost': 300.0})
+        self.assertEqual(self.session.undo(), {'selling_price': 1000.0, 'weight': MISSING})
+        self.assertNotIn('weight', self.session)
+        self.assertEqual(self.session['unit_profit'], self.result['unit_profit'])
+        
+        self.assertEqual(self.session.redo(), {'selling_price': 1500.0, 'weight': 0.5})
+        self.assertEqual(self.session['weight'], 0.5)
+        
+        # Новое изменение очищает повтор
+        self.session['purchase_cost'] = 250.0
+        self.assertFalse(self.session.can_redo)
+    
+    def test_history_is_bounded(self):
+        """История ограничена history_size; с нулевым размером отключена"""
+        session = CalculatorSession(history_size=3)
+        for price in range(10):
+            session['selling_price'] = float(price)
+        self.assertEqual(len(session._undo), 3)
+        
+        session = CalculatorSession(INPUTS, history_size=0)
+        session['selling_price'] = 1.0
+        self.assertFalse(session.can_undo)
+    
+    def test_compact_state(self):
+        """Сериализуются только вводы: состояние меньше плоского словаря"""
+        self.session = CalculatorSession(self.session)
+        flat = dict(self.session)
+        compact = pickle.dumps(self.session)
+        
+        self.assertLess(len(compact), len(pickle.dumps(flat)))
+        
+        restored = pickle.loads(compact)
+        self.assertEqual(dict(restored), flat)
+        
+        saved = self.session.to_dict(include_results=False)
+        self.assertEqual(saved, INPUTS)
+        loaded = CalculatorSession.from_dict(saved, has_results=True)
+        self.assertEqual(dict(loaded), flat)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+Тесты бинарного снимка сессии
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from utils import snapshot
+from utils.calculations import UnitEconomicsCalculator
+from utils.session import RESULT_KEYS, CalculatorSession
+
+
+INPUTS = {
+    'marketplace': 'Wildberries',
+    'product_name': 'Кружка',
+    'selling_price': 1000.0,
+    'purchase_cost': 300.0,
+    'commission_rate': 15.0,
+    'payment_processing': 1.5,
+    'fulfillment_cost': 100.0,
+    'storage_total': 20.0,
+    'monthly_sales_volume': 100
+}
+
+
+class TestSnapshot(unittest.TestCase):
+    """Тесты снимка и восстановления сессии"""
+    
+    def setUp(self):
+        self.session = CalculatorSession(INPUTS)
+        self.session.update(UnitEconomicsCalculator().calculate_unit_economics(self.session))
+        self.session['scenarios'] = {'Базовый': {'unit_profit': np.float64(120.5), 'units': np.int64(3)}}
+        self.expected = dict(self.session)
+    
+    def backends(self):
+        return ['json'] + (['msgpack'] if snapshot.msgpack is not None else [])
+    
+    def test_round_trip(self):
+        """Вводы, результаты и прогресс мастера восстанавливаются"""
+        for backend in self.backends():
+            with self.subTest(backend=backend):
+                data = snapshot.dumps(self.session, 9, {1, 2, 3, 8}, backend=backend)
+                self.assertTrue(data.startswith(snapshot.SNAPSHOT_MAGIC))
+                
+                session, current_step, completed_steps = snapshot.loads(data, history_size=5)
+                self.assertEqual(dict(session), self.expected)
+                self.assertTrue(session.has_results)
+                self.assertEqual(session.history_size, 5)
+                self.assertEqual(current_step, 9)
+                self.assertEqual(completed_steps, {1, 2, 3, 8})
+    
+    def test_results_restored_without_recomputation(self):
+        """Снимок той же версии движка не пересчитывается, другой - пересчитывается"""
+        data = snapshot.dumps(self.session, backend='json')
+        calculate = 'utils.calculations.UnitEconomicsCalculator.calculate_unit_economics'
+        
+        with mock.patch(calculate) as calculate_mock:
+            session, _, _ = snapshot.loads(data)
+            self.assertEqual({key: session[key] for key in RESULT_KEYS},
+                             {key: self.expected[key] for key in RESULT_KEYS})
+        calculate_mock.assert_not_called()
+        
+        with mock.patch.object(snapshot, 'engine_version', return_value='other'):
+            session, _, _ = snapshot.loads(data)
+        self.assertIsNone(session._results)
+        self.assertEqual(session['unit_profit'], self.expected['unit_profit'])
+    
+    def test_invalid_snapshot(self):
+        """Чужой файл и снимок более новой схемы отклоняются"""
+        with self.assertRaises(ValueError):
+            snapshot.loads(b'{"selling_price": 1000}')
+        
+        data = bytearray(snapshot.dumps(self.session, backend='json'))
+        data[len(snapshot.SNAPSHOT_MAGIC)] = snapshot.SNAPSHOT_VERSION + 1
+        with self.assertRaises(ValueError):
+            snapshot.loads(bytes(data))
+    
+    def test_malformed_snapshot(self):
+        """Поврежденное тело снимка отклоняется с ValueError"""
+        header = snapshot.SNAPSHOT_MAGIC + bytes((snapshot.SNAPSHOT_VERSION, snapshot.CODEC_JSON))
+        data = snapshot.dumps(self.session, backend='json')
+        bodies = [
+            data[len(header):-10],
+            b'[1, 2, 3]',
+            b'{"inputs": {}}',
+            b'{"inputs": 5, "has_results": false, "engine": "", "results": {}, '
+            b'"current_step": 1, "completed_steps": []}',
+            b'{"inputs": {}, "has_results": false, "engine": "", "results": {}, '
+            b'"current_step": "first", "completed_steps": []}',
+            '{"inputs": {}}'.encode('utf-16'),
+        ]
+        for body in bodies:
+            with self.subTest(body=body[:20]):
+                with self.assertRaises(ValueError):
+                    snapshot.loads(header + body)
+        
+        if snapshot.msgpack is not None:
+            msgpack_header = header[:-1] + bytes((snapshot.CODEC_MSGPACK,))
+            with self.assertRaises(ValueError):
+                snapshot.loads(msgpack_header + b'\xc1')
+    
+    def test_engine_version_covers_dependencies(self):
+        """Отпечаток движка меняется вместе с моделями данных и денежной арифметикой"""
+        version = snapshot.engine_version()
+        for module in (snapshot.data_models, snapshot.money):
+            with self.subTest(module=module.__name__), tempfile.TemporaryDirectory() as directory:
+                changed = os.path.join(directory, 'changed.py')
+                with open(module.__file__, 'rb') as source, open(changed, 'wb') as target:
+                    target.write(source.read() + b'\n# changed\n')
+                with mock.patch.object(module, '__file__', changed):
+                    self.assertNotEqual(snapshot.engine_version(), version)
+    
+    def test_is_snapshot(self):
+        """Снимок отличается от сохраненного JSON по расширению"""
+        self.assertTrue(snapshot.is_snapshot(f"calc.{snapshot.SNAPSHOT_EXTENSION.upper()}"))
+        self.assertFalse(snapshot.is_snapshot('unit_economics_товар.json'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+Тесты для генератора синтетического каталога
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from data.marketplace_data import MARKETPLACE_COMMISSIONS, get_category_benchmark
+from data.synthetic_catalog import generate_catalog, iter_catalog_chunks, write_catalog
+from utils.calculations import UnitEconomicsCalculator
+
+
+class TestSyntheticCatalog(unittest.TestCase):
+    """Тесты генерации каталога по тарифам и бенчмаркам"""
+    
+    def test_reproducible(self):
+        """Одинаковое зерно дает одинаковый каталог"""
+        pd.testing.assert_frame_equal(generate_catalog(100, seed=1), generate_catalog(100, seed=1))
+        self.assertFalse(generate_catalog(100, seed=1).equals(generate_catalog(100, seed=2)))
+    
+    def test_tariffs(self):
+        """Товары попадают только в существующие сегменты с их комиссией"""
+        catalog = generate_catalog(2000)
+        
+        for row in catalog.drop_duplicates(['marketplace', 'category']).itertuples():
+            tariff = MARKETPLACE_COMMISSIONS[row.marketplace][row.category]
+            self.assertEqual(row.commission_rate, tariff['commission_rate'])
+    
+    def test_margins_follow_benchmarks(self):
+        """Медианная маржинальность категории близка к бенчмарку"""
+        catalog = generate_catalog(50000)
+        results = UnitEconomicsCalculator().calculate_unit_economics_batch(catalog)
+        medians = results.groupby(['marketplace', 'category'], observed=True)['profit_margin'].median()
+        
+        for (marketplace, category), median in medians.items():
+            benchmark = get_category_benchmark(marketplace, category)['avg_margin'] * 100
+            self.assertAlmostEqual(median, benchmark, delta=5)
+    
+    def test_marketplace_weights(self):
+        """Доли маркетплейсов задаются весами"""
+        catalog = generate_catalog(5000, marketplace_weights={'OZON': 1.0})
+        self.assertEqual(set(catalog['marketplace']), {'OZON'})
+    
+    def test_chunks(self):
+        """Части каталога нумеруются подряд и записываются в файл"""
+        chunks = list(iter_catalog_chunks(250, chunk_size=100))
+        skus = np.concatenate([chunk['sku'].to_numpy() for chunk in chunks])
+        
+        self.assertEqual([len(chunk) for chunk in chunks], [100, 100, 50])
+        self.assertEqual(skus[0], 'SKU-00000000')
+        self.assertEqual(skus[-1], 'SKU-00000249')
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'catalog.csv')
+            self.assertEqual(write_catalog(250, path, chunk_size=100), 250)
+            self.assertEqual(len(pd.read_csv(path)), 250)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Тесты для модуля telemetry.py
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+import numpy as np
+import pandas as pd
+from utils.telemetry import TelemetryStore, build_report, estimate_size, session_state_size
+
+
+class TestTelemetry(unittest.TestCase):
+    """Тесты записи телеметрии и отчета"""
+    
+    def setUp(self):
+        """Временная база телеметрии"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'telemetry.sqlite3')
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def test_estimate_size(self):
+        """Таблицы оцениваются по памяти, несериализуемое не учитывается"""
+        frame = pd.DataFrame({'value': np.zeros(1000)})
+        sizes = session_state_size({'data': {'price': 1000}, 'frame': frame, 'lock': threading.Lock()})
+        
+        self.assertGreater(sizes['data'], 0)
+        self.assertGreaterEqual(sizes['frame'], 8000)
+        self.assertEqual(sizes['lock'], 0)
+        self.assertEqual(estimate_size(np.zeros(10)), 80)
+    
+    def test_buffered_records_and_report(self):
+        """Записи буферизуются, отчет считает перцентили и крупные сессии"""
+        store = TelemetryStore(self.path, flush_interval=3600)
+        for i in range(100):
+            store.record('small', 'script:step_1', float(i + 1), page='Калькулятор', page_ms=i / 2,
+                         state_sizes={'calculator_data': 100, 'other': 50})
+        store.record('large', 'fragment:step_5', 5.0, page='Калькулятор',
+                     state_sizes={'calculator_data': 10000})
+        
+        self.assertEqual(sqlite3.connect(self.path).execute('SELECT COUNT(*) FROM reruns').fetchone()[0], 0)
+        store.close()
+        
+        report = build_report(self.path)
+        
+        self.assertEqual(report['reruns']['count'], 100)
+        self.assertAlmostEqual(report['reruns']['p50_ms'], 50.5)
+        self.assertAlmostEqual(report['reruns']['p95_ms'], 95.05)
+        self.assertEqual(report['fragments']['count'], 1)
+        self.assertIn('Калькулятор', report['pages'])
+        self.assertEqual(report['largest_sessions'][0]['session_id'], 'large')
+        self.assertEqual(report['largest_sessions'][1]['max_state_bytes'], 150)
+    
+    def test_retention(self):
+        """Старые записи удаляются при открытии базы"""
+        store = TelemetryStore(self.path)
+        store.record('old', 'script:step_1', 1.0)
+        store.close()
+        
+        connection = sqlite3.connect(self.path)
+        connection.execute('UPDATE reruns SET ts = ?', (time.time() - 30 * 86400,))
+        connection.commit()
+        connection.close()
+        
+        TelemetryStore(self.path, retention_days=14).close()
+        self.assertEqual(build_report(self.path)['reruns']['count'], 0)
+    
+    def test_retention_while_running(self):
+        """Открытая база удаляет старые записи при сбросе буфера, не чаще prune_interval"""
+        store = TelemetryStore(self.path, flush_interval=0, prune_interval=3600)
+        
+        def age_records():
+            connection = sqlite3.connect(self.path)
+            connection.execute('UPDATE reruns SET ts = ?', (time.time() - 30 * 86400,))
+            connection.commit()
+            connection.close()
+        
+        store.record('old', 'script:step_1', 1.0)
+        age_records()
+        store.record('new', 'script:step_1', 2.0)
+        self.assertEqual(build_report(self.path)['reruns']['count'], 2)
+        
+        store.prune_interval = 0
+        store.record('newest', 'script:step_1', 3.0)
+        store.close()
+        sessions = sqlite3.connect(self.path).execute('SELECT session_id FROM reruns ORDER BY ts').fetchall()
+        self.assertEqual(sessions, [('new',), ('newest',)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,31 @@
+import functools
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Union
+
+from utils.data_models import UnitInputs
+from utils.money import apply_rate, from_kopecks, mul_div_round, to_basis_points, to_kopecks
+
+# Поля входных данных по статьям затрат (используются в пакетном расчете в копейках)
+COGS_FIELDS = ['purchase_cost', 'packaging_cost', 'labeling_cost', 'quality_control', 'certification']
+MARKETING_FIELDS = ['ppc_cost_per_unit', 'external_marketing', 'influencer_marketing', 'content_creation']
+OPERATIONAL_FIELDS = ['fixed_cost_per_unit', 'customer_service', 'return_cost_per_unit']
+
+# Идентификаторы товара, переносимые в результаты пакетного расчета
+BATCH_ID_COLUMNS = ['sku', 'product_name', 'marketplace', 'category']
+
+# Денежные столбцы результатов пакетного расчета (в режиме фиксированной точки - копейки int64)
+BATCH_MONEY_COLUMNS = ['selling_price', 'total_cogs', 'marketplace_costs', 'marketing_costs', 'operational_costs',
+                       'total_costs', 'unit_profit', 'contribution_margin', 'breakeven_price']
+
+# Дополнительная комиссия OZON, базисные пункты
+OZON_EXTRA_FEE_BASIS_POINTS = 200
+
+# Граница ошибки пакетного расчета в float32 относительно float64: каждая из ~20
+# операций вносит не больше половины ulp (2**-24 относительно операнда), поэтому
+# |ошибка| денежного столбца <= FLOAT32_BATCH_ERROR_BOUND * (selling_price + total_costs).
+# Для цены 1 000 ₽ это около 0.5 копейки, для 1 000 000 ₽ - около 5 ₽.
+FLOAT32_BATCH_ERROR_BOUND = 20 * 2.0 ** -24
 
 class UnitEconomicsCalculator:
     """
@@ -23,24 +48,21 @@ class UnitEconomicsCalculator:
             'transformation_weight': 15
         }
     
-    def calculate_unit_economics(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def calculate_unit_economics(self, data: Union[Dict[str, Any], UnitInputs]) -> Dict[str, Any]:
         """
         Основной метод расчета юнит-экономики
-        """
-        # Базовые данные с проверкой на None
-        selling_price = data.get('selling_price', 0) or 0
-        
-        # Расчет себестоимости (COGS)
-        total_cogs = self._calculate_cogs(data)
         
-        # Расчет расходов маркетплейса
-        marketplace_costs = self._calculate_marketplace_costs(data)
-        
-        # Расчет маркетинговых расходов
-        marketing_costs = self._calculate_marketing_costs(data)
+        Принимает словарь калькулятора или готовую запись UnitInputs
+        (проверка на None выполняется один раз при нормализации).
+        """
+        inputs = UnitInputs.coerce(data)
+        selling_price = inputs.selling_price
         
-        # Расчет операционных расходов
-        operational_costs = self._calculate_operational_costs(data)
+        # Статьи затрат
+        total_cogs = self._calculate_cogs(inputs)
+        marketplace_costs = self._calculate_marketplace_costs(inputs)
+        marketing_costs = self._calculate_marketing_costs(inputs)
+        operational_costs = self._calculate_operational_costs(inputs)
         
         # Общие затраты
         total_costs = total_cogs + marketplace_costs + marketing_costs + operational_costs
@@ -70,7 +92,149 @@ class UnitEconomicsCalculator:
             'breakeven_price': breakeven_price
         }
     
-    def _calculate_cogs(self, data: Dict[str, Any]) -> float:
+    def calculate_unit_economics_batch(self, inputs: pd.DataFrame, fixed_point: bool = False,
+                                       float32: bool = False) -> pd.DataFrame:
+        """
+        Векторизованный расчет юнит-экономики для каталога товаров
+        
+        Одна строка inputs - один SKU с теми же полями, что и словарь для
+        calculate_unit_economics. Отсутствующие столбцы и пустые значения
+        обрабатываются так же, как в скалярном расчете.
+        
+        Args:
+            inputs: Входные данные каталога
+            fixed_point: Считать в целых копейках (см. calculate_unit_economics_batch_kopecks);
+                каждая сумма округляется до копейки, результат переводится обратно в рубли
+            float32: Считать и хранить вещественные столбцы в float32 - вдвое меньше
+                памяти и трафика для больших каталогов; ошибка относительно float64
+                ограничена FLOAT32_BATCH_ERROR_BOUND. Итоги по столбцам накапливайте
+                в float64 (так делает portfolio_kpis)
+        
+        Returns:
+            DataFrame с результатами по столбцам (индекс совпадает с inputs);
+            идентификаторы товара и объем продаж переносятся из входных данных
+        """
+        dtype = np.float32 if float32 else np.float64
+        
+        if fixed_point:
+            results = self.calculate_unit_economics_batch_kopecks(inputs)
+            for column in BATCH_MONEY_COLUMNS:
+                results[column] = from_kopecks(results[column].to_numpy()).astype(dtype, copy=False)
+            results['profit_margin'] = results['profit_margin'].to_numpy().astype(dtype, copy=False)
+            return results
+        
+        def column(name, default=0):
+            return self._column(inputs, name, default, dtype)
+        
+        # Запись со столбцами вместо чисел: статьи затрат считаются теми же
+        # методами, что и в calculate_unit_economics
+        units = UnitInputs(**{field: column(field, default) for field, default in UnitInputs._field_defaults.items()
+                              if field != 'marketplace'},
+                           marketplace=inputs['marketplace'].to_numpy() if 'marketplace' in inputs else '')
+        selling_price = units.selling_price
+        
+        total_cogs = self._calculate_cogs(units)
+        marketplace_costs = self._calculate_marketplace_costs(units)
+        marketing_costs = self._calculate_marketing_costs(units)
+        operational_costs = self._calculate_operational_costs(units)
+        
+        total_costs = total_cogs + marketplace_costs + marketing_costs + operational_costs
+        unit_profit = selling_price - total_costs
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            profit_margin = np.where(selling_price > 0, unit_profit / selling_price * 100, 0.0)
+        
+        results = pd.DataFrame({
+            'selling_price': selling_price,
+            'total_cogs': total_cogs,
+            'marketplace_costs': marketplace_costs,
+            'marketing_costs': marketing_costs,
+            'operational_costs': operational_costs,
+            'total_costs': total_costs,
+            'unit_profit': unit_profit,
+            'profit_margin': profit_margin,
+            'contribution_margin': selling_price - total_cogs - marketplace_costs,
+            'breakeven_price': np.where(total_costs <= 0, total_costs, total_costs / 0.8)
+        }, index=inputs.index)
+        
+        identity_columns = [column for column in BATCH_ID_COLUMNS if column in inputs]
+        if identity_columns:
+            results = pd.concat([inputs[identity_columns], results], axis=1)
+        results['monthly_sales_volume'] = column('monthly_sales_volume')
+        
+        return results
+    
+    def calculate_unit_economics_batch_kopecks(self, inputs: pd.DataFrame) -> pd.DataFrame:
+        """
+        Пакетный расчет с фиксированной точкой: деньги в копейках int64, ставки в базисных пунктах
+        
+        Входные суммы округляются до копейки, комиссии - до копейки с каждой
+        позиции (арифметическое округление), дальше только целочисленное сложение.
+        Поэтому суммы по столбцам (в т.ч. месячная прибыль из add_monthly_profit)
+        сходятся с бухгалтерскими итогами без накопленной ошибки float.
+        
+        Returns:
+            DataFrame как у calculate_unit_economics_batch, денежные столбцы
+            (BATCH_MONEY_COLUMNS) - в копейках, объем продаж - int64
+        """
+        selling_price = to_kopecks(self._column(inputs, 'selling_price'))
+        
+        def kopecks(fields):
+            return sum(to_kopecks(self._column(inputs, field)) for field in fields)
+        
+        total_cogs = kopecks(COGS_FIELDS)
+        
+        commission_rate = to_basis_points(self._column(inputs, 'commission_rate', 15))
+        marketplace_costs = (apply_rate(selling_price, commission_rate)
+                             + kopecks(['fulfillment_cost', 'storage_total', 'payment_amount']))
+        if 'marketplace' in inputs:
+            is_ozon = (inputs['marketplace'] == 'OZON').to_numpy()
+            marketplace_costs = marketplace_costs + np.where(
+                is_ozon, apply_rate(selling_price, OZON_EXTRA_FEE_BASIS_POINTS), 0
+            )
+        
+        marketing_costs = kopecks(MARKETING_FIELDS)
+        operational_costs = kopecks(OPERATIONAL_FIELDS)
+        
+        total_costs = total_cogs + marketplace_costs + marketing_costs + operational_costs
+        unit_profit = selling_price - total_costs
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            profit_margin = np.where(selling_price > 0, unit_profit / selling_price * 100, 0.0)
+        
+        results = pd.DataFrame({
+            'selling_price': selling_price,
+            'total_cogs': total_cogs,
+            'marketplace_costs': marketplace_costs,
+            'marketing_costs': marketing_costs,
+            'operational_costs': operational_costs,
+            'total_costs': total_costs,
+            'unit_profit': unit_profit,
+            'profit_margin': profit_margin,
+            'contribution_margin': selling_price - total_cogs - marketplace_costs,
+            # total_costs / 0.8 = total_costs * 5 / 4
+            'breakeven_price': np.where(total_costs <= 0, total_costs, mul_div_round(total_costs, 5, 4))
+        }, index=inputs.index)
+        
+        identity_columns = [column for column in BATCH_ID_COLUMNS if column in inputs]
+        if identity_columns:
+            results = pd.concat([inputs[identity_columns], results], axis=1)
+        results['monthly_sales_volume'] = np.rint(self._column(inputs, 'monthly_sales_volume')).astype(np.int64)
+        
+        return results
+    
+    @staticmethod
+    def _column(inputs: pd.DataFrame, name: str, default: float = 0, dtype=np.float64) -> np.ndarray:
+        """Столбец как float64 (или dtype) с заменой пустых и нулевых значений (аналог `x or default`)"""
+        if name not in inputs:
+            return np.full(len(inputs), default, dtype=dtype)
+        values = pd.to_numeric(inputs[name], errors='coerce').to_numpy(dtype=dtype, na_value=np.nan)
+        return np.where(np.isnan(values) | (values == 0), dtype(default), values)
+    
+    # Статьи затрат: поля inputs - числа (calculate_unit_economics) или
+    # столбцы numpy (calculate_unit_economics_batch)
+    
+    def _calculate_cogs(self, inputs: UnitInputs) -> float:
         """
         Расчет себестоимости товара (Cost of Goods Sold)
         
@@ -81,15 +245,10 @@ class UnitEconomicsCalculator:
         - Расходы на контроль качества
         - Расходы на сертификацию
         """
-        purchase_cost = data.get('purchase_cost', 0) or 0
-        packaging_cost = data.get('packaging_cost', 0) or 0
-        labeling_cost = data.get('labeling_cost', 0) or 0
-        quality_control = data.get('quality_control', 0) or 0
-        certification = data.get('certification', 0) or 0
-        
-        return purchase_cost + packaging_cost + labeling_cost + quality_control + certification
+        return (inputs.purchase_cost + inputs.packaging_cost + inputs.labeling_cost
+                + inputs.quality_control + inputs.certification)
     
-    def _calculate_marketplace_costs(self, data: Dict[str, Any]) -> float:
+    def _calculate_marketplace_costs(self, inputs: UnitInputs) -> float:
         """
         Расчет расходов маркетплейса
         
@@ -100,23 +259,16 @@ class UnitEconomicsCalculator:
         - Стоимость обработки платежа
         - Дополнительные комиссии (например, маркетинговая комиссия OZON)
         """
-        selling_price = data.get('selling_price', 0) or 0
-        commission_rate = (data.get('commission_rate', 15) or 15) / 100  # Защита от None
-        fulfillment_cost = data.get('fulfillment_cost', 0) or 0
-        storage_total = data.get('storage_total', 0) or 0
-        payment_amount = data.get('payment_amount', 0) or 0
-        
-        commission_amount = selling_price * commission_rate
+        selling_price = inputs.selling_price
+        commission_amount = selling_price * (inputs.commission_rate / 100)
         
-        # Дополнительные расходы для OZON
-        marketplace = data.get('marketplace', '')
-        additional_costs = 0
-        if marketplace == 'OZON':
-            additional_costs = selling_price * 0.02  # Обязательная маркетинговая комиссия
+        # Обязательная маркетинговая комиссия OZON (сравнение вместо условия - маска для столбцов)
+        additional_costs = selling_price * 0.02 * (inputs.marketplace == 'OZON')
         
-        return commission_amount + fulfillment_cost + storage_total + payment_amount + additional_costs
+        return (commission_amount + inputs.fulfillment_cost + inputs.storage_total
+                + inputs.payment_amount + additional_costs)
     
-    def _calculate_marketing_costs(self, data: Dict[str, Any]) -> float:
+    def _calculate_marketing_costs(self, inputs: UnitInputs) -> float:
         """
         Расчет маркетинговых расходов
         
@@ -126,14 +278,10 @@ class UnitEconomicsCalculator:
         - Расходы на инфлюенсеров на единицу
         - Затраты на создание контента на единицу
         """
-        ppc_cost_per_unit = data.get('ppc_cost_per_unit', 0) or 0
-        external_marketing = data.get('external_marketing', 0) or 0
-        influencer_marketing = data.get('influencer_marketing', 0) or 0
-        content_creation = data.get('content_creation', 0) or 0
-        
-        return ppc_cost_per_unit + external_marketing + influencer_marketing + content_creation
+        return (inputs.ppc_cost_per_unit + inputs.external_marketing
+                + inputs.influencer_marketing + inputs.content_creation)
     
-    def _calculate_operational_costs(self, data: Dict[str, Any]) -> float:
+    def _calculate_operational_costs(self, inputs: UnitInputs) -> float:
         """
         Расчет операционных расходов
         
@@ -142,11 +290,7 @@ class UnitEconomicsCalculator:
         - Расходы на обслуживание клиентов
         - Расходы на обработку возвратов
         """
-        fixed_cost_per_unit = data.get('fixed_cost_per_unit', 0) or 0
-        customer_service = data.get('customer_service', 0) or 0
-        return_cost_per_unit = data.get('return_cost_per_unit', 0) or 0
-        
-        return fixed_cost_per_unit + customer_service + return_cost_per_unit
+        return inputs.fixed_cost_per_unit + inputs.customer_service + inputs.return_cost_per_unit
     
     def calculate_profit_score(self, result: Dict[str, Any]) -> int:
         """
@@ -471,3 +615,9 @@ class UnitEconomicsCalculator:
             results[var] = var_results
                 
         return results
+
+
+@functools.lru_cache(maxsize=None)
+def shared_calculator() -> UnitEconomicsCalculator:
+    """Калькулятор, общий для всех сессий процесса (состояние - только пороги benchmarks)"""
+    return UnitEconomicsCalculator()
@@ -0,0 +1,321 @@
+"""
+Каталог товаров в виде столбцов NumPy (struct-of-arrays) для моделей data_models
+"""
+
+from dataclasses import MISSING
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.data_models import (
+    BusinessModel,
+    CostStructure,
+    CustomerMetrics,
+    MarketingCosts,
+    MarketplaceCosts,
+    MarketplaceType,
+    OperationalCosts,
+    ProductInfo
+)
+
+# Числовые поля моделей: поле -> (модель, тип столбца)
+NUMERIC_FIELDS: Dict[str, Tuple[type, np.dtype]] = {
+    'selling_price': (ProductInfo, np.float64),
+    'weight': (ProductInfo, np.float64),
+    'purchase_cost': (CostStructure, np.float64),
+    'packaging_cost': (CostStructure, np.float64),
+    'labeling_cost': (CostStructure, np.float64),
+    'quality_control': (CostStructure, np.float64),
+    'certification': (CostStructure, np.float64),
+    'commission_rate': (MarketplaceCosts, np.float64),
+    'fulfillment_cost': (MarketplaceCosts, np.float64),
+    'storage_cost_per_day': (MarketplaceCosts, np.float64),
+    'storage_days': (MarketplaceCosts, np.int32),
+    'payment_processing_rate': (MarketplaceCosts, np.float64),
+    'additional_fees': (MarketplaceCosts, np.float64),
+    'ppc_budget_percent': (MarketingCosts, np.float64),
+    'avg_cpc': (MarketingCosts, np.float64),
+    'conversion_rate': (MarketingCosts, np.float64),
+    'external_marketing': (MarketingCosts, np.float64),
+    'influencer_marketing': (MarketingCosts, np.float64),
+    'content_creation': (MarketingCosts, np.float64),
+    'staff_costs_monthly': (OperationalCosts, np.float64),
+    'office_rent_monthly': (OperationalCosts, np.float64),
+    'software_subscriptions_monthly': (OperationalCosts, np.float64),
+    'customer_service_per_order': (OperationalCosts, np.float64),
+    'return_rate': (OperationalCosts, np.float64),
+    'return_processing_cost': (OperationalCosts, np.float64),
+    'monthly_sales_volume': (OperationalCosts, np.int32),
+    'repeat_purchase_rate': (CustomerMetrics, np.float64),
+    'avg_purchases_per_year': (CustomerMetrics, np.float64),
+    'customer_lifespan_months': (CustomerMetrics, np.int32),
+    'cross_sell_revenue': (CustomerMetrics, np.float64),
+    'referral_bonus': (CustomerMetrics, np.float64)
+}
+
+# Перечисления хранятся кодами int8 (позиция в перечислении)
+ENUM_FIELDS: Dict[str, type] = {
+    'marketplace': MarketplaceType,
+    'business_model': BusinessModel
+}
+ENUM_MEMBERS: Dict[str, List[Any]] = {field: list(enum) for field, enum in ENUM_FIELDS.items()}
+ENUM_CODE_DTYPE = np.int8
+
+# Строки: название и габариты - объектные столбцы, категория - коды со словарем
+TEXT_FIELDS = ('name', 'dimensions')
+CATEGORY_CODE_DTYPE = np.int16
+
+MODELS = (ProductInfo, CostStructure, MarketplaceCosts, MarketingCosts, OperationalCosts, CustomerMetrics)
+
+
+def _safe_divide(numerator, denominator):
+    """Деление с нулем вместо результата при неположительном знаменателе"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / denominator, 0.0)
+
+
+class _CatalogMetrics:
+    """
+    Вычисляемые показатели моделей data_models
+    
+    Формулы записаны один раз: для каталога поля - столбцы и результат -
+    массив, для строки поля - скаляры и результат - число.
+    """
+    
+    __slots__ = ()
+    
+    def _result(self, value):
+        return value
+    
+    @property
+    def total_cogs(self):
+        """CostStructure.total_cogs"""
+        return self._result(self.purchase_cost + self.packaging_cost + self.labeling_cost
+                            + self.quality_control + self.certification)
+    
+    @property
+    def marketplace_costs(self):
+        """MarketplaceCosts.calculate_total_costs(selling_price)"""
+        price = self.selling_price
+        return self._result(price * (self.commission_rate / 100) + self.fulfillment_cost
+                            + self.storage_cost_per_day * self.storage_days
+                            + price * (self.payment_processing_rate / 100) + self.additional_fees)
+    
+    @property
+    def marketing_costs(self):
+        """MarketingCosts.calculate_total_costs(selling_price)"""
+        return self._result(self.selling_price * (self.ppc_budget_percent / 100) + self.external_marketing
+                            + self.influencer_marketing + self.content_creation)
+    
+    @property
+    def cac_ppc(self):
+        """MarketingCosts.cac_ppc"""
+        return self._result(_safe_divide(self.avg_cpc, self.conversion_rate / 100))
+    
+    @property
+    def fixed_cost_per_unit(self):
+        """OperationalCosts.fixed_cost_per_unit"""
+        total_fixed = self.staff_costs_monthly + self.office_rent_monthly + self.software_subscriptions_monthly
+        return self._result(_safe_divide(total_fixed, self.monthly_sales_volume))
+    
+    @property
+    def return_cost_per_unit(self):
+        """OperationalCosts.return_cost_per_unit"""
+        return self._result((self.return_rate / 100) * self.return_processing_cost)
+    
+    @property
+    def total_operational_cost_per_unit(self):
+        """OperationalCosts.total_operational_cost_per_unit"""
+        return self._result(self.fixed_cost_per_unit + self.customer_service_per_order + self.return_cost_per_unit)
+    
+    @property
+    def ltv(self):
+        """CustomerMetrics.calculate_ltv(selling_price)"""
+        purchases_per_customer = (self.customer_lifespan_months / 12) * self.avg_purchases_per_year
+        return self._result(self.selling_price * purchases_per_customer
+                            + self.cross_sell_revenue + self.referral_bonus)
+    
+    @property
+    def unit_profit(self):
+        """Цена за вычетом всех статей затрат моделей"""
+        return self._result(self.selling_price - self.total_cogs - self.marketplace_costs
+                            - self.marketing_costs - self.total_operational_cost_per_unit)
+
+
+class ProductCatalog(_CatalogMetrics):
+    """
+    Каталог товаров: каждое поле моделей - отдельный типизированный массив
+    
+    Вместо наборов dataclass-объектов (около килобайта на SKU) хранится
+    240 байт числовых данных на SKU; показатели (total_cogs, fixed_cost_per_unit, cac_ppc
+    и т.д.) считаются выражениями над массивами. Срез каталога и строка
+    (catalog[i]) ссылаются на те же массивы без копирования.
+    """
+    
+    def __init__(self, columns: Dict[str, np.ndarray], categories: Sequence[str] = ()):
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Столбцы каталога разной длины: {sorted(lengths)}")
+        missing = set(NUMERIC_FIELDS) | set(ENUM_FIELDS) | set(TEXT_FIELDS) | {'category'}
+        missing -= set(columns)
+        if missing:
+            raise ValueError(f"Нет столбцов каталога: {sorted(missing)}")
+        
+        self._columns = columns
+        self.categories = list(categories)
+    
+    def __getattr__(self, name: str) -> np.ndarray:
+        # Вызывается только для имен, которых нет у объекта: поля моделей
+        try:
+            return self.__dict__['_columns'][name]
+        except KeyError:
+            raise AttributeError(name) from None
+    
+    def __len__(self) -> int:
+        return len(self._columns['selling_price'])
+    
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return ProductCatalog({name: values[key] for name, values in self._columns.items()}, self.categories)
+        return self.row(key)
+    
+    def __iter__(self):
+        return (CatalogRow(self, index) for index in range(len(self)))
+    
+    def row(self, index: int) -> 'CatalogRow':
+        """Строка каталога (значения читаются из массивов при обращении)"""
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        return CatalogRow(self, index % len(self))
+    
+    @property
+    def nbytes(self) -> int:
+        """Размер числовых массивов и кодов (без объектных строковых столбцов)"""
+        return sum(values.nbytes for name, values in self._columns.items() if name not in TEXT_FIELDS)
+    
+    def enum_mask(self, field: str, member) -> np.ndarray:
+        """Маска строк с заданным значением перечисления (сравнение кодов)"""
+        return self._columns[field] == ENUM_MEMBERS[field].index(member)
+    
+    def category_mask(self, category: str) -> np.ndarray:
+        """Маска строк категории"""
+        if category not in self.categories:
+            return np.zeros(len(self), dtype=bool)
+        return self._columns['category'] == self.categories.index(category)
+    
+    @classmethod
+    def from_models(cls, rows: Iterable[Sequence[Any]]) -> 'ProductCatalog':
+        """
+        Каталог из наборов моделей по SKU
+        
+        Args:
+            rows: Наборы (ProductInfo, CostStructure, MarketplaceCosts,
+                MarketingCosts, OperationalCosts, CustomerMetrics)
+        """
+        values: Dict[str, List[Any]] = {name: [] for name in
+                                        [*NUMERIC_FIELDS, *ENUM_FIELDS, *TEXT_FIELDS, 'category']}
+        for models in rows:
+            by_type = {type(model): model for model in models}
+            for name, (model_type, _) in NUMERIC_FIELDS.items():
+                values[name].append(getattr(by_type[model_type], name))
+            product = by_type[ProductInfo]
+            for name in (*ENUM_FIELDS, *TEXT_FIELDS, 'category'):
+                values[name].append(getattr(product, name))
+        
+        return cls.from_frame(pd.DataFrame(values))
+    
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> 'ProductCatalog':
+        """
+        Каталог из таблицы со столбцами-полями моделей
+        
+        Отсутствующие столбцы заполняются значениями по умолчанию моделей (или нулем),
+        перечисления принимаются как элементы или их значения ('OZON', 'Private Label'),
+        неизвестный маркетплейс считается MarketplaceType.OTHER.
+        """
+        size = len(frame)
+        columns: Dict[str, np.ndarray] = {}
+        
+        for name, (model_type, dtype) in NUMERIC_FIELDS.items():
+            if name in frame:
+                values = pd.to_numeric(frame[name], errors='coerce').fillna(0)
+                columns[name] = values.to_numpy(dtype=dtype, copy=True)
+            else:
+                default = model_type.__dataclass_fields__[name].default
+                columns[name] = np.full(size, 0 if default is MISSING else default, dtype=dtype)
+        
+        for name in ENUM_FIELDS:
+            members = ENUM_MEMBERS[name]
+            default = ProductInfo.__dataclass_fields__[name].default
+            fallback = members.index(MarketplaceType.OTHER if default is MISSING else default)
+            codes = {member: index for index, member in enumerate(members)}
+            codes.update({member.value: index for index, member in enumerate(members)})
+            if name in frame:
+                series = frame[name].map(codes).fillna(fallback)
+                columns[name] = series.to_numpy(dtype=ENUM_CODE_DTYPE, copy=True)
+            else:
+                columns[name] = np.full(size, fallback, dtype=ENUM_CODE_DTYPE)
+        
+        for name in TEXT_FIELDS:
+            text = frame[name].fillna('').astype(str) if name in frame else pd.Series([''] * size)
+            columns[name] = text.to_numpy(dtype=object, copy=True)
+        
+        if 'category' in frame:
+            codes, categories = pd.factorize(frame['category'].fillna('').astype(str))
+            columns['category'] = codes.astype(CATEGORY_CODE_DTYPE)
+        else:
+            categories = ['']
+            columns['category'] = np.zeros(size, dtype=CATEGORY_CODE_DTYPE)
+        
+        return cls(columns, list(categories))
+    
+    def to_frame(self) -> pd.DataFrame:
+        """Таблица с раскодированными перечислениями и категориями"""
+        frame = pd.DataFrame({name: values for name, values in self._columns.items()
+                              if name not in ENUM_FIELDS and name != 'category'})
+        for name in ENUM_FIELDS:
+            frame[name] = pd.Categorical.from_codes(self._columns[name], [member.value for member in ENUM_MEMBERS[name]])
+        frame['category'] = pd.Categorical.from_codes(self._columns['category'], self.categories)
+        return frame
+
+
+class CatalogRow(_CatalogMetrics):
+    """
+    Строка каталога без копирования данных
+    
+    Поля читаются из столбцов каталога при обращении, показатели считаются
+    по тем же формулам, что и для всего каталога.
+    """
+    
+    __slots__ = ('_catalog', '_index')
+    
+    def __init__(self, catalog: ProductCatalog, index: int):
+        self._catalog = catalog
+        self._index = index
+    
+    def __getattr__(self, name: str):
+        try:
+            value = self._catalog._columns[name][self._index]
+        except KeyError:
+            raise AttributeError(name) from None
+        if name in ENUM_FIELDS:
+            return ENUM_MEMBERS[name][value]
+        if name == 'category':
+            return self._catalog.categories[value]
+        return value
+    
+    def _result(self, value):
+        return float(value)
+    
+    def to_models(self) -> Tuple[Any, ...]:
+        """Набор dataclass-моделей строки (копия значений)"""
+        values = {name: getattr(self, name) for name in [*NUMERIC_FIELDS, *ENUM_FIELDS, *TEXT_FIELDS, 'category']}
+        models = []
+        for model_type in MODELS:
+            fields = {}
+            for name in model_type.__dataclass_fields__:
+                value = values[name]
+                fields[name] = value.item() if isinstance(value, np.generic) else value
+            models.append(model_type(**fields))
+        return tuple(models)
@@ -0,0 +1,118 @@
+"""
+Столбцовый обмен данными калькулятора: Parquet и Arrow IPC (Feather)
+"""
+
+import os
+from typing import BinaryIO, Iterable, Optional, Sequence, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+# Столбцы с небольшим числом повторяющихся значений - хранятся словарем
+DICTIONARY_COLUMNS = ('marketplace', 'category')
+
+# Сжатие по умолчанию
+PARQUET_COMPRESSION = 'zstd'
+ARROW_COMPRESSION = 'lz4'
+
+# Размер группы строк Parquet
+PARQUET_ROW_GROUP_SIZE = 256_000
+
+Target = Union[str, os.PathLike, BinaryIO]
+
+
+def to_arrow_table(frame: pd.DataFrame, float32: bool = False) -> pa.Table:
+    """
+    Преобразование входных данных или результатов в таблицу Arrow
+    
+    Args:
+        frame: Входные данные или результаты пакетного расчета
+        float32: Хранить вещественные столбцы в float32 (вдвое меньше объем,
+                 около 7 значащих цифр)
+    """
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    
+    fields = []
+    for field in table.schema:
+        is_text = pa.types.is_string(field.type) or pa.types.is_large_string(field.type)
+        if field.name in DICTIONARY_COLUMNS and is_text:
+            field = field.with_type(pa.dictionary(pa.int32(), field.type))
+        elif float32 and pa.types.is_float64(field.type):
+            field = field.with_type(pa.float32())
+        fields.append(field)
+    
+    return table.cast(pa.schema(fields, metadata=table.schema.metadata))
+
+
+def from_arrow_table(table: pa.Table) -> pd.DataFrame:
+    """
+    Таблица Arrow в DataFrame для расчетного движка
+    
+    Вещественные столбцы приводятся к float64 (движок считает в float64),
+    словарные остаются категориальными - без повторного разбора строк.
+    """
+    fields = [
+        field.with_type(pa.float64()) if pa.types.is_floating(field.type) else field
+        for field in table.schema
+    ]
+    return table.cast(pa.schema(fields, metadata=table.schema.metadata)).to_pandas()
+
+
+def write_parquet(chunks: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+                  target: Target,
+                  float32: bool = False,
+                  compression: str = PARQUET_COMPRESSION,
+                  row_group_size: int = PARQUET_ROW_GROUP_SIZE) -> int:
+    """
+    Запись входных данных или результатов в Parquet
+    
+    Принимает DataFrame или итератор частей; части пишутся по мере поступления
+    в один файл (схема берется из первой части).
+    
+    Returns:
+        Количество записанных строк
+    """
+    if isinstance(chunks, pd.DataFrame):
+        chunks = [chunks]
+    
+    writer = None
+    rows = 0
+    try:
+        for chunk in chunks:
+            table = to_arrow_table(chunk, float32=float32)
+            if writer is None:
+                writer = pq.ParquetWriter(target, table.schema, compression=compression)
+            writer.write_table(table.cast(writer.schema), row_group_size=row_group_size)
+            rows += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    
+    return rows
+
+
+def read_parquet(source: Target, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Чтение Parquet в DataFrame, готовый для calculate_unit_economics_batch"""
+    return from_arrow_table(pq.read_table(source, columns=columns))
+
+
+def write_arrow(frame: pd.DataFrame, target: Target,
+                float32: bool = False,
+                compression: str = ARROW_COMPRESSION) -> int:
+    """
+    Запись в Arrow IPC (Feather v2) - формат для быстрого локального обмена
+    
+    Returns:
+        Количество записанных строк
+    """
+    table = to_arrow_table(frame, float32=float32)
+    feather.write_feather(table, target, compression=compression)
+    return table.num_rows
+
+
+def read_arrow(source: Target, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Чтение Arrow IPC (с отображением файла в память, если передан путь)"""
+    return from_arrow_table(feather.read_table(source, columns=columns, memory_map=True))
+
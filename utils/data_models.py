@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Union
 from enum import Enum
 
 class MarketplaceType(Enum):
@@ -119,6 +119,63 @@ class CustomerMetrics:
         monthly_revenue = selling_price * (self.avg_purchases_per_year / 12)
         return cac / monthly_revenue if monthly_revenue > 0 else 0
 
+class UnitInputs(NamedTuple):
+    """
+    Входные данные расчета юнит-экономики одного товара
+    
+    Компактная неизменяемая запись вместо словаря калькулятора: пустые значения
+    заменяются значениями по умолчанию один раз в from_dict, а не при каждом
+    обращении к полю.
+    """
+    selling_price: float = 0
+    purchase_cost: float = 0
+    packaging_cost: float = 0
+    labeling_cost: float = 0
+    quality_control: float = 0
+    certification: float = 0
+    commission_rate: float = 15
+    fulfillment_cost: float = 0
+    storage_total: float = 0
+    payment_amount: float = 0
+    marketplace: str = ''
+    ppc_cost_per_unit: float = 0
+    external_marketing: float = 0
+    influencer_marketing: float = 0
+    content_creation: float = 0
+    fixed_cost_per_unit: float = 0
+    customer_service: float = 0
+    return_cost_per_unit: float = 0
+    
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> 'UnitInputs':
+        """Запись из словаря калькулятора (None и 0 заменяются значением по умолчанию)"""
+        get = data.get
+        return tuple.__new__(cls, (
+            get('selling_price') or 0,
+            get('purchase_cost') or 0,
+            get('packaging_cost') or 0,
+            get('labeling_cost') or 0,
+            get('quality_control') or 0,
+            get('certification') or 0,
+            get('commission_rate') or 15,
+            get('fulfillment_cost') or 0,
+            get('storage_total') or 0,
+            get('payment_amount') or 0,
+            get('marketplace', ''),
+            get('ppc_cost_per_unit') or 0,
+            get('external_marketing') or 0,
+            get('influencer_marketing') or 0,
+            get('content_creation') or 0,
+            get('fixed_cost_per_unit') or 0,
+            get('customer_service') or 0,
+            get('return_cost_per_unit') or 0
+        ))
+    
+    @classmethod
+    def coerce(cls, data: Union['UnitInputs', Mapping[str, Any]]) -> 'UnitInputs':
+        """Запись как есть или нормализованный словарь"""
+        return data if type(data) is cls else cls.from_dict(data)
+
 @dataclass
 class BusinessMetrics:
     """Бизнес-метрики"""
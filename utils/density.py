@@ -0,0 +1,100 @@
+"""
+Отображение больших наборов точек: сырые маркеры, WebGL или плотность (2-D корзины)
+"""
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import plotly.graph_objects as go
+
+# Пороговые значения по умолчанию (количество точек)
+RAW_POINTS_MAX = 5_000       # до этого значения - обычные SVG-маркеры
+WEBGL_POINTS_MAX = 100_000   # до этого значения - WebGL (Scattergl), выше - плотность
+
+# Доля выбросов, отсекаемая с каждой стороны при выборе диапазона корзин (в процентах)
+OUTLIER_PERCENTILE = 0.5
+
+
+def choose_render_mode(point_count: int,
+                       raw_max: int = RAW_POINTS_MAX,
+                       webgl_max: int = WEBGL_POINTS_MAX) -> str:
+    """
+    Выбор способа отображения по количеству точек
+    
+    Returns:
+        'raw', 'webgl' или 'density'
+    """
+    if point_count <= raw_max:
+        return 'raw'
+    if point_count <= webgl_max:
+        return 'webgl'
+    return 'density'
+
+
+def robust_range(values: np.ndarray, percentile: float = OUTLIER_PERCENTILE) -> Tuple[float, float]:
+    """Диапазон значений без крайних выбросов (не вырождается в точку)"""
+    low, high = np.nanpercentile(values, [percentile, 100 - percentile])
+    if high <= low:
+        high = low + 1.0
+    return float(low), float(high)
+
+
+def density_scatter_figure(x: Sequence[float], y: Sequence[float],
+                           title: str = "",
+                           x_title: str = "",
+                           y_title: str = "",
+                           raw_max: int = RAW_POINTS_MAX,
+                           webgl_max: int = WEBGL_POINTS_MAX,
+                           bins: Tuple[int, int] = (120, 80),
+                           hover_text: Optional[Sequence[str]] = None) -> go.Figure:
+    """
+    Диаграмма рассеяния, масштабируемая до сотен тысяч точек
+    
+    Небольшие наборы отображаются маркерами, средние - через WebGL, а большие
+    предварительно агрегируются в 2-D корзины (np.histogram2d) и передаются
+    в браузер как тепловая карта: объем данных зависит от числа корзин,
+    а не от числа точек.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    mode = choose_render_mode(len(x), raw_max, webgl_max)
+    
+    if mode == 'density':
+        x_range = robust_range(x)
+        y_range = robust_range(y)
+        counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins, range=[x_range, y_range])
+        
+        # Пустые корзины не закрашиваются
+        z = np.where(counts.T > 0, counts.T, np.nan)
+        trace = go.Heatmap(
+            x=(x_edges[:-1] + x_edges[1:]) / 2,
+            y=(y_edges[:-1] + y_edges[1:]) / 2,
+            z=z,
+            colorscale='Viridis',
+            colorbar=dict(title='SKU'),
+            hovertemplate=f'{x_title}: %{{x:,.0f}}<br>{y_title}: %{{y:,.1f}}<br>SKU: %{{z:,}}<extra></extra>'
+        )
+    else:
+        scatter = go.Scatter if mode == 'raw' else go.Scattergl
+        trace = scatter(
+            x=x,
+            y=y,
+            mode='markers',
+            marker=dict(size=6 if mode == 'raw' else 3, opacity=0.6),
+            text=hover_text,
+            hovertemplate=(
+                ('%{text}<br>' if hover_text is not None else '')
+                + f'{x_title}: %{{x:,.0f}}<br>{y_title}: %{{y:,.1f}}<extra></extra>'
+            )
+        )
+    
+    fig = go.Figure(trace)
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_title,
+        yaxis_title=y_title,
+        showlegend=False,
+        meta={'render_mode': mode, 'point_count': int(len(x))}
+    )
+    return fig
+
@@ -1,9 +1,70 @@
 import pandas as pd
+import atexit
+import functools
 import io
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+from fontTools import subset as font_subset
 from fpdf import FPDF
+from fpdf.enums import XPos, YPos
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, BinaryIO, Callable, Iterable, Optional, Sequence, Union
 import base64
+import hashlib
+import json
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+
+try:
+    import orjson
+except ImportError:  # необязательный ускоренный сериализатор
+    orjson = None
+
+# Столбцы каталожного отчета и их заголовки (в порядке вывода)
+CATALOG_EXPORT_COLUMNS = {
+    'sku': 'SKU',
+    'product_name': 'Товар',
+    'marketplace': 'Маркетплейс',
+    'category': 'Категория',
+    'selling_price': 'Цена продажи (₽)',
+    'total_cogs': 'Себестоимость (₽)',
+    'marketplace_costs': 'Расходы маркетплейса (₽)',
+    'marketing_costs': 'Маркетинговые расходы (₽)',
+    'operational_costs': 'Операционные расходы (₽)',
+    'total_costs': 'Общие затраты (₽)',
+    'unit_profit': 'Прибыль с единицы (₽)',
+    'profit_margin': 'Маржинальность (%)',
+    'monthly_sales_volume': 'Объем продаж (шт/мес)',
+    'monthly_profit': 'Месячная прибыль (₽)'
+}
+
+# Отчетов в работе на один процесс при пакетной генерации PDF
+PDF_BATCH_PENDING_PER_WORKER = 4
+
+# Шрифт PDF отчетов с кириллицей (DejaVu Sans, лицензия в assets/fonts/LICENSE_DEJAVU)
+PDF_FONT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets', 'fonts')
+PDF_FONT_FAMILY = 'DejaVu'
+PDF_FONT_FILES = {'': 'DejaVuSans.ttf', 'B': 'DejaVuSans-Bold.ttf'}
+
+# Символы, которые остаются в шрифте отчета: латиница, кириллица, знаки препинания, ₽ и №
+PDF_FONT_UNICODES = [*range(0x20, 0x180), *range(0x400, 0x460), 0x490, 0x491, *range(0x2010, 0x2040),
+                     *range(0x20A0, 0x20C1), 0x2116, 0x2122]
+
+# Строк в одной части, на которые режется DataFrame при потоковом экспорте каталога
+CATALOG_CHUNK_ROWS = 50_000
+
+# Ограничения Excel на имя листа
+SHEET_NAME_MAX_LENGTH = 31
+SHEET_NAME_INVALID_CHARS = re.compile(r'[\\/*?:\[\]]')
 
 class ExportManager:
     """
@@ -21,24 +82,188 @@ class ExportManager:
         output = io.BytesIO()
         
         with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            # Основные результаты
-            self._create_summary_sheet(data, writer)
-            
-            # Детальные расчеты
-            self._create_detailed_calculations_sheet(data, writer)
-            
-            # Анализ сценариев
-            if 'scenarios' in data:
-                self._create_scenarios_sheet(data, writer)
-            
-            # Рекомендации
-            self._create_recommendations_sheet(data, writer)
+            for sheet_name, frame in self._report_frames(data).items():
+                frame.to_excel(writer, sheet_name=sheet_name, index=False)
         
         output.seek(0)
         return output.read()
     
-    def _create_summary_sheet(self, data: Dict[str, Any], writer):
-        """Создание листа с основными результатами"""
+    def create_csv_report(self, data: Dict[str, Any]) -> bytes:
+        """
+        Создание CSV отчета с результатами расчетов
+        
+        Разделы отчета (те же, что листы Excel) идут друг за другом: строка
+        с названием раздела, таблица с заголовком и пустая строка.
+        Кодировка UTF-8 с BOM, чтобы Excel корректно открывал кириллицу.
+        """
+        output = io.StringIO()
+        
+        for sheet_name, frame in self._report_frames(data).items():
+            output.write(f"{sheet_name}\n")
+            frame.to_csv(output, index=False, lineterminator='\n')
+            output.write("\n")
+        
+        return output.getvalue().encode('utf-8-sig')
+    
+    @staticmethod
+    def content_digest(data: Dict[str, Any]) -> str:
+        """Хэш содержимого расчета - ключ кэша сформированных экспортов"""
+        serialized = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(serialized.encode('utf-8')).hexdigest()
+    
+    def _report_frames(self, data: Dict[str, Any]) -> Dict[str, pd.DataFrame]:
+        """Таблицы отчета по разделам (в порядке вывода)"""
+        frames = {
+            'Основные результаты': self._summary_frame(data),
+            'Детальные расчеты': self._detailed_calculations_frame(data)
+        }
+        
+        # Анализ сценариев
+        if 'scenarios' in data:
+            frames['Сценарии'] = self._scenarios_frame(data)
+        
+        frames['Рекомендации'] = self._recommendations_frame(data)
+        return frames
+    
+    def write_catalog_excel(self, chunks: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+                            target: Union[str, BinaryIO],
+                            split_by_marketplace: bool = False,
+                            columns: Optional[Dict[str, str]] = None) -> int:
+        """
+        Потоковый Excel отчет по каталогу (сотни тысяч SKU)
+        
+        Книга открывается в режиме write-only: строки каждого листа сразу
+        сбрасываются во временный файл, а DataFrame обрабатывается частями
+        по CATALOG_CHUNK_ROWS строк, поэтому пиковая память не зависит от
+        количества строк. Результат пишется в путь или файловый объект,
+        а не в буфер в памяти.
+        
+        Args:
+            chunks: Результаты пакетного расчета - DataFrame или итератор частей
+            target: Путь к файлу или бинарный поток для записи
+            split_by_marketplace: Отдельный лист для каждого маркетплейса
+            columns: Столбцы и заголовки (по умолчанию CATALOG_EXPORT_COLUMNS)
+        
+        Returns:
+            Количество записанных строк
+        """
+        columns = columns or CATALOG_EXPORT_COLUMNS
+        chunks = _catalog_chunks(chunks)
+        
+        workbook = Workbook(write_only=True)
+        sheets = {}
+        rows_written = 0
+        
+        for chunk in chunks:
+            present = [column for column in columns if column in chunk]
+            if split_by_marketplace and 'marketplace' in chunk:
+                groups = chunk.groupby(chunk['marketplace'].fillna('Не указан'), sort=False)
+            else:
+                groups = [('Каталог', chunk)]
+            
+            for sheet_title, group in groups:
+                sheet = sheets.get(sheet_title)
+                if sheet is None:
+                    sheet = self._create_catalog_sheet(workbook, sheet_title, present, columns)
+                    sheets[sheet_title] = sheet
+                
+                # NaN недопустим в ячейке Excel - заменяем пустым значением
+                values = group[present].astype(object)
+                values = values.where(group[present].notna(), None)
+                for row in values.itertuples(index=False, name=None):
+                    sheet.append(row)
+                rows_written += len(group)
+        
+        if not sheets:
+            self._create_catalog_sheet(workbook, 'Каталог', list(columns), columns)
+        
+        workbook.save(target)
+        return rows_written
+    
+    def write_catalog_ndjson(self, chunks: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+                             target: Union[str, BinaryIO],
+                             columns: Optional[Sequence[str]] = None,
+                             backend: str = 'auto') -> Dict[str, Any]:
+        """
+        Потоковый экспорт каталога в NDJSON (одна строка JSON на SKU)
+        
+        Записи собираются из столбцов результатов по одной и пишутся
+        в файл после каждой части (DataFrame режется на части по
+        CATALOG_CHUNK_ROWS строк), поэтому память ограничена размером части.
+        
+        Args:
+            chunks: Результаты пакетного расчета - DataFrame или итератор частей
+            target: Путь к файлу или бинарный поток для записи
+            columns: Выгружаемые столбцы (по умолчанию - все столбцы части)
+            backend: 'json', 'orjson' или 'auto' (orjson, если установлен)
+        
+        Returns:
+            Статистика: количество записей, сериализатор, время и записей в секунду
+        """
+        backend, dumps = self._ndjson_serializer(backend)
+        chunks = _catalog_chunks(chunks)
+        
+        start = time.perf_counter()
+        records = 0
+        output = open(target, 'wb') if isinstance(target, (str, os.PathLike)) else target
+        try:
+            for chunk in chunks:
+                keys = [column for column in columns if column in chunk] if columns else list(chunk.columns)
+                values = [self._json_column(chunk[key]) for key in keys]
+                output.write(b''.join(dumps(dict(zip(keys, row))) for row in zip(*values)))
+                records += len(chunk)
+        finally:
+            if output is not target:
+                output.close()
+        
+        seconds = time.perf_counter() - start
+        return {
+            'records': records,
+            'backend': backend,
+            'seconds': seconds,
+            'records_per_second': records / seconds if seconds > 0 else 0.0
+        }
+    
+    @staticmethod
+    def _ndjson_serializer(backend: str):
+        """Выбор сериализатора записи NDJSON (строка JSON с переводом строки)"""
+        if backend == 'auto':
+            backend = 'orjson' if orjson is not None else 'json'
+        
+        if backend == 'orjson':
+            if orjson is None:
+                raise ImportError("Для backend='orjson' установите пакет orjson")
+            return backend, lambda record: orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+        if backend == 'json':
+            return backend, lambda record: (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+        raise ValueError(f"Неизвестный сериализатор: {backend}")
+    
+    @staticmethod
+    def _json_column(series: pd.Series) -> list:
+        """Значения столбца в типах Python; NaN заменяется на null"""
+        if series.hasnans:
+            series = series.astype(object).where(series.notna(), None)
+        return series.tolist()
+    
+    def _create_catalog_sheet(self, workbook, title: str, present: List[str], columns: Dict[str, str]):
+        """Создание листа каталога с заголовком (до записи первой строки)"""
+        title = SHEET_NAME_INVALID_CHARS.sub('_', str(title))[:SHEET_NAME_MAX_LENGTH]
+        sheet = workbook.create_sheet(title=title)
+        sheet.freeze_panes = 'A2'
+        
+        for index, column in enumerate(present):
+            sheet.column_dimensions[get_column_letter(index + 1)].width = max(12, len(columns[column]) + 2)
+        
+        header = []
+        for column in present:
+            cell = WriteOnlyCell(sheet, value=columns[column])
+            cell.font = Font(bold=True)
+            header.append(cell)
+        sheet.append(header)
+        return sheet
+    
+    def _summary_frame(self, data: Dict[str, Any]) -> pd.DataFrame:
+        """Таблица основных результатов"""
         summary_data = {
             'Параметр': [
                 'Товар',
@@ -80,11 +305,10 @@ class ExportManager:
             ]
         }
         
-        df_summary = pd.DataFrame(summary_data)
-        df_summary.to_excel(writer, sheet_name='Основные результаты', index=False)
+        return pd.DataFrame(summary_data)
     
-    def _create_detailed_calculations_sheet(self, data: Dict[str, Any], writer):
-        """Создание листа с детальными расчетами"""
+    def _detailed_calculations_frame(self, data: Dict[str, Any]) -> pd.DataFrame:
+        """Таблица детальных расчетов"""
         detailed_data = {
             'Категория затрат': [],
             'Статья расходов': [],
@@ -150,11 +374,10 @@ class ExportManager:
             detailed_data['Сумма (₽)'].append(amount)
             detailed_data['Доля от цены (%)'].append(f"{(amount / selling_price) * 100:.1f}%")
         
-        df_detailed = pd.DataFrame(detailed_data)
-        df_detailed.to_excel(writer, sheet_name='Детальные расчеты', index=False)
+        return pd.DataFrame(detailed_data)
     
-    def _create_scenarios_sheet(self, data: Dict[str, Any], writer):
-        """Создание листа с анализом сценариев"""
+    def _scenarios_frame(self, data: Dict[str, Any]) -> pd.DataFrame:
+        """Таблица анализа сценариев"""
         scenarios = data.get('scenarios', {})
         
         scenario_data = {
@@ -178,11 +401,10 @@ class ExportManager:
             monthly_profit = scenario_result.get('unit_profit', 0) * monthly_volume
             scenario_data['Месячная прибыль (₽)'].append(f"{monthly_profit:+,.0f}")
         
-        df_scenarios = pd.DataFrame(scenario_data)
-        df_scenarios.to_excel(writer, sheet_name='Сценарии', index=False)
+        return pd.DataFrame(scenario_data)
     
-    def _create_recommendations_sheet(self, data: Dict[str, Any], writer):
-        """Создание листа с рекомендациями"""
+    def _recommendations_frame(self, data: Dict[str, Any]) -> pd.DataFrame:
+        """Таблица рекомендаций"""
         recommendations_data = {
             'Тип': [],
             'Рекомендация': [],
@@ -217,78 +439,102 @@ class ExportManager:
             recommendations_data['Рекомендация'].append('Отличная маржинальность. Потенциал для масштабирования.')
             recommendations_data['Приоритет'].append('Низкий')
         
-        df_recommendations = pd.DataFrame(recommendations_data)
-        df_recommendations.to_excel(writer, sheet_name='Рекомендации', index=False)
+        return pd.DataFrame(recommendations_data)
     
     def create_pdf_report(self, data: Dict[str, Any]) -> bytes:
         """
         Создание PDF отчета с результатами расчетов
         """
-        pdf = FPDF()
-        pdf.add_page()
-        
-        # Добавляем шрифт с поддержкой Unicode
-        pdf.set_font('Arial', 'B', 16)
-        
-        # Заголовок
-        pdf.cell(0, 10, 'Unit Economics Report', ln=True, align='C')
-        pdf.ln(10)
-        
-        # Основная информация
-        pdf.set_font('Arial', 'B', 12)
-        pdf.cell(0, 8, 'Product Information:', ln=True)
-        pdf.set_font('Arial', '', 10)
-        
-        product_info = [
-            f"Product: {data.get('product_name', 'Not specified')}",
-            f"Marketplace: {data.get('marketplace', 'Not specified')}",
-            f"Category: {data.get('category', 'Not specified')}",
-            f"Selling Price: {data.get('selling_price', 0):,.0f} RUB",
-            f"Calculation Date: {self.timestamp}"
-        ]
-        
-        for info in product_info:
-            pdf.cell(0, 6, info, ln=True)
-        
-        pdf.ln(5)
-        
-        # Финансовые результаты
-        pdf.set_font('Arial', 'B', 12)
-        pdf.cell(0, 8, 'Financial Results:', ln=True)
-        pdf.set_font('Arial', '', 10)
-        
-        financial_results = [
-            f"Total Costs: {data.get('total_costs', 0):,.0f} RUB",
-            f"Unit Profit: {data.get('unit_profit', 0):+,.0f} RUB",
-            f"Profit Margin: {data.get('profit_margin', 0):.1f}%",
-            f"LTV: {data.get('ltv', 0):,.0f} RUB",
-            f"CAC: {data.get('cac', 0):,.0f} RUB",
-            f"LTV/CAC Ratio: {data.get('ltv_cac_ratio', 0):.1f}",
-            f"P.R.O.F.I.T. Score: {data.get('profit_score', 0)}/100"
-        ]
-        
-        for result in financial_results:
-            pdf.cell(0, 6, result, ln=True)
-        
-        pdf.ln(5)
-        
-        # Структура затрат
-        pdf.set_font('Arial', 'B', 12)
-        pdf.cell(0, 8, 'Cost Breakdown:', ln=True)
-        pdf.set_font('Arial', '', 10)
-        
-        cost_breakdown = [
-            f"COGS: {data.get('total_cogs', 0):,.0f} RUB",
-            f"Marketplace Costs: {data.get('marketplace_costs', 0):,.0f} RUB",
-            f"Marketing Costs: {data.get('marketing_costs', 0):,.0f} RUB",
-            f"Operational Costs: {data.get('operational_costs', 0):,.0f} RUB"
-        ]
-        
-        for cost in cost_breakdown:
-            pdf.cell(0, 6, cost, ln=True)
-        
-        # Возвращаем PDF как байты
-        return pdf.output(dest='S').encode('latin-1')
+        return PDFReportTemplate(self.timestamp).render(data)
+    
+    def create_pdf_batch(self, reports: Iterable[Dict[str, Any]],
+                         target: Union[str, BinaryIO],
+                         max_workers: Optional[int] = None,
+                         name_key: str = 'sku') -> Dict[str, Any]:
+        """
+        Пакетная генерация PDF отчетов в ZIP архив
+        
+        Отчеты рендерятся в пуле процессов; шрифты урезаются один раз,
+        шаблон готовится один раз на процесс. Готовые PDF дописываются в архив
+        по мере завершения, в работе одновременно не больше нескольких
+        отчетов на процесс, поэтому память не зависит от размера пакета.
+        
+        Args:
+            reports: Данные отчетов (словари, как для create_pdf_report)
+            target: Путь к ZIP архиву или бинарный поток
+            max_workers: Количество процессов (0 - без пула, в текущем процессе)
+            name_key: Поле для имени файла в архиве (иначе product_name)
+        
+        Returns:
+            Статистика: количество отчетов, ошибки (в том числе сбои пула процессов),
+            время и отчетов в секунду
+        """
+        start = time.perf_counter()
+        names = set()
+        failed = []
+        written = 0
+        
+        with zipfile.ZipFile(target, 'w', compression=zipfile.ZIP_STORED) as archive:
+            def store(index: int, data: Dict[str, Any], content: Optional[bytes], error: Optional[str]):
+                nonlocal written
+                if error is not None:
+                    failed.append({'index': index, 'name': data.get(name_key) or data.get('product_name'), 'error': error})
+                    return
+                archive.writestr(self._unique_report_name(data, name_key, index, names), content)
+                written += 1
+            
+            # Шрифты урезаются в этом процессе, исполнители получают готовые файлы
+            fonts = pdf_report_fonts()
+            if max_workers == 0:
+                _init_pdf_worker(self.timestamp, fonts)
+                for index, data in enumerate(reports):
+                    store(index, data, *_render_pdf_report(data))
+            else:
+                workers = max_workers or os.cpu_count() or 1
+                # spawn, а не fork: в процессе сервера Streamlit работают потоки,
+                # и копия их блокировок в дочернем процессе может зависнуть.
+                # Процесс spawn заново выполняет главный модуль (под Streamlit -
+                # скрипт страницы как __mp_main__, без сервера) - это разовая
+                # цена запуска исполнителя
+                with ProcessPoolExecutor(max_workers=workers,
+                                         mp_context=multiprocessing.get_context('spawn'),
+                                         initializer=_init_pdf_worker,
+                                         initargs=(self.timestamp, fonts)) as executor:
+                    max_pending = workers * PDF_BATCH_PENDING_PER_WORKER
+                    pending = {}
+                    
+                    for index, data in enumerate(reports):
+                        try:
+                            pending[executor.submit(_render_pdf_report, data)] = (index, data)
+                        except BrokenProcessPool as e:
+                            store(index, data, None, _report_error(e))
+                            continue
+                        if len(pending) >= max_pending:
+                            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                            for future in done:
+                                store(*pending.pop(future), *_future_report(future))
+                    
+                    for future in as_completed(pending):
+                        store(*pending[future], *_future_report(future))
+        
+        seconds = time.perf_counter() - start
+        return {
+            'reports': written,
+            'failed': failed,
+            'seconds': seconds,
+            'reports_per_second': written / seconds if seconds > 0 else 0.0
+        }
+    
+    @staticmethod
+    def _unique_report_name(data: Dict[str, Any], name_key: str, index: int, names: set) -> str:
+        """Имя файла отчета в архиве (без недопустимых символов и повторов)"""
+        base = str(data.get(name_key) or data.get('product_name') or f'report_{index + 1}')
+        base = re.sub(r'[^\w.-]+', '_', base).strip('_') or f'report_{index + 1}'
+        name = f'{base}.pdf'
+        if name in names:
+            name = f'{base}_{index + 1}.pdf'
+        names.add(name)
+        return name
     
     def create_json_export(self, data: Dict[str, Any]) -> str:
         """
@@ -328,3 +574,147 @@ class ExportManager:
         
         import json
         return json.dumps(export_data, ensure_ascii=False, indent=2)
+
+
+def _catalog_chunks(chunks: Union[pd.DataFrame, Iterable[pd.DataFrame]]) -> Iterable[pd.DataFrame]:
+    """Части каталога: DataFrame режется на срезы по CATALOG_CHUNK_ROWS строк (пустой - одна часть)"""
+    if not isinstance(chunks, pd.DataFrame):
+        return chunks
+    return (chunks.iloc[start:start + CATALOG_CHUNK_ROWS]
+            for start in range(0, max(len(chunks), 1), CATALOG_CHUNK_ROWS))
+
+
+class PDFReportTemplate:
+    """
+    Шаблон PDF отчета: разметка и шрифты готовятся один раз
+    
+    Разделы описаны строками формата, которые заполняются данными отчета;
+    для каждого отчета создается только документ, в нем регистрируются
+    заранее урезанные шрифты и выводятся строки.
+    """
+    
+    TITLE = 'Unit Economics Report'
+    
+    SECTIONS = [
+        ('Product Information:', [
+            "Product: {product_name}",
+            "Marketplace: {marketplace}",
+            "Category: {category}",
+            "Selling Price: {selling_price:,.0f} RUB",
+            "Calculation Date: {timestamp}"
+        ]),
+        ('Financial Results:', [
+            "Total Costs: {total_costs:,.0f} RUB",
+            "Unit Profit: {unit_profit:+,.0f} RUB",
+            "Profit Margin: {profit_margin:.1f}%",
+            "LTV: {ltv:,.0f} RUB",
+            "CAC: {cac:,.0f} RUB",
+            "LTV/CAC Ratio: {ltv_cac_ratio:.1f}",
+            "P.R.O.F.I.T. Score: {profit_score}/100"
+        ]),
+        ('Cost Breakdown:', [
+            "COGS: {total_cogs:,.0f} RUB",
+            "Marketplace Costs: {marketplace_costs:,.0f} RUB",
+            "Marketing Costs: {marketing_costs:,.0f} RUB",
+            "Operational Costs: {operational_costs:,.0f} RUB"
+        ])
+    ]
+    
+    TEXT_DEFAULTS = {
+        'product_name': 'Not specified',
+        'marketplace': 'Not specified',
+        'category': 'Not specified'
+    }
+    
+    def __init__(self, timestamp: str, fonts: Optional[Dict[str, str]] = None):
+        self.timestamp = timestamp
+        # Поля шаблона и их значения по умолчанию
+        self.fields = {
+            name: self.TEXT_DEFAULTS.get(name, 0)
+            for _, lines in self.SECTIONS
+            for line in lines
+            for name in re.findall(r'{(\w+)', line)
+        }
+        self.fields['timestamp'] = timestamp
+        self.fonts = fonts or pdf_report_fonts()
+    
+    def render(self, data: Dict[str, Any]) -> bytes:
+        """Рендеринг отчета по данным расчета"""
+        values = dict(self.fields)
+        values.update({key: data[key] for key in self.fields if key in data and key != 'timestamp'})
+        
+        pdf = FPDF()
+        for style, path in self.fonts.items():
+            pdf.add_font(PDF_FONT_FAMILY, style, path)
+        pdf.add_page()
+        
+        pdf.set_font(PDF_FONT_FAMILY, 'B', 16)
+        pdf.cell(0, 10, self.TITLE, new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
+        pdf.ln(10)
+        
+        for index, (title, lines) in enumerate(self.SECTIONS):
+            if index:
+                pdf.ln(5)
+            pdf.set_font(PDF_FONT_FAMILY, 'B', 12)
+            pdf.cell(0, 8, title, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+            pdf.set_font(PDF_FONT_FAMILY, '', 10)
+            for line in lines:
+                pdf.cell(0, 6, line.format_map(values), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        
+        return bytes(pdf.output())
+
+
+@functools.lru_cache(maxsize=None)
+def pdf_report_fonts() -> Dict[str, str]:
+    """
+    Файлы шрифтов отчета по начертаниям, урезанные до PDF_FONT_UNICODES
+    
+    Шрифт урезается один раз на процесс: fpdf разбирает полный DejaVu Sans
+    при каждом add_font (десятки мс на отчет), урезанный - в несколько раз
+    быстрее. Файлы лежат во временном каталоге до завершения процесса.
+    """
+    directory = tempfile.mkdtemp(prefix='unit_econ_fonts_')
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    
+    options = font_subset.Options()
+    options.name_IDs = ['*']
+    options.drop_tables.append('FFTM')
+    fonts = {}
+    for style, name in PDF_FONT_FILES.items():
+        font = font_subset.load_font(os.path.join(PDF_FONT_DIR, name), options)
+        subsetter = font_subset.Subsetter(options)
+        subsetter.populate(unicodes=PDF_FONT_UNICODES)
+        subsetter.subset(font)
+        fonts[style] = os.path.join(directory, name)
+        font_subset.save_font(font, fonts[style], options)
+    return fonts
+
+
+# Шаблон процесса-исполнителя пакетной генерации PDF
+_pdf_template: Optional[PDFReportTemplate] = None
+
+
+def _init_pdf_worker(timestamp: str, fonts: Dict[str, str]):
+    """Инициализация процесса: шаблон создается один раз"""
+    global _pdf_template
+    _pdf_template = PDFReportTemplate(timestamp, fonts)
+
+
+def _render_pdf_report(data: Dict[str, Any]):
+    """Рендеринг одного отчета в процессе пула: (PDF, ошибка)"""
+    try:
+        return _pdf_template.render(data), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _future_report(future):
+    """Результат задачи пула: (PDF, ошибка), включая сбой пула и передачи данных"""
+    try:
+        return future.result()
+    except Exception as e:
+        return None, _report_error(e)
+
+
+def _report_error(error: Exception) -> str:
+    return f"{type(error).__name__}: {error}"
@@ -0,0 +1,109 @@
+"""
+Кэш графиков Plotly с ключом по срезу данных, от которого зависит график
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Tuple
+
+import numpy as np
+import plotly.graph_objects as go
+
+# Оценка размера одного значения в списках трасс (как float64)
+VALUE_SIZE_BYTES = 8
+
+
+def estimate_figure_size(figure: go.Figure) -> int:
+    """
+    Оценка размера графика по массивам трасс (байты)
+    
+    Без сериализации в JSON: учитываются только массивы верхнего уровня
+    трасс (x, y, text, values...) - они и определяют размер графика.
+    """
+    size = 0
+    for trace in figure.data:
+        for value in trace.to_plotly_json().values():
+            if isinstance(value, np.ndarray):
+                size += value.nbytes
+            elif isinstance(value, (list, tuple)):
+                size += len(value) * VALUE_SIZE_BYTES
+    return size
+
+
+@dataclass
+class FigureCacheEntry:
+    """Построенный график и оценка его размера"""
+    figure: go.Figure
+    size_bytes: int
+
+
+class FigureCache:
+    """
+    LRU-кэш графиков: повторно строится только график, чьи данные изменились
+    
+    Ключ записи - имя графика и хэш среза данных (deps). Для каждого имени
+    ведется статистика построений и попаданий для отладочной панели.
+    """
+    
+    def __init__(self, maxsize: int = 64):
+        self.maxsize = maxsize
+        self._entries: 'OrderedDict[Tuple[str, str], FigureCacheEntry]' = OrderedDict()
+        self.stats: Dict[str, Dict[str, float]] = {}
+    
+    @staticmethod
+    def digest(deps: Any) -> str:
+        """Хэш среза данных графика"""
+        serialized = json.dumps(deps, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(serialized.encode('utf-8')).hexdigest()
+    
+    def get_or_build(self, name: str, deps: Any, builder: Callable[[], go.Figure]) -> go.Figure:
+        """
+        Возвращает график из кэша или строит его заново
+        
+        Args:
+            name: Имя графика (например, 'waterfall')
+            deps: Данные, от которых зависит график (JSON-сериализуемые)
+            builder: Функция построения графика без аргументов
+        """
+        key = (name, self.digest(deps))
+        stats = self.stats.setdefault(name, {
+            'builds': 0, 'hits': 0, 'last_build_ms': 0.0, 'total_build_ms': 0.0, 'size_bytes': 0
+        })
+        
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            stats['hits'] += 1
+            return entry.figure
+        
+        start = time.perf_counter()
+        figure = builder()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        entry = FigureCacheEntry(figure=figure, size_bytes=estimate_figure_size(figure))
+        
+        stats['builds'] += 1
+        stats['last_build_ms'] = elapsed_ms
+        stats['total_build_ms'] += elapsed_ms
+        stats['size_bytes'] = entry.size_bytes
+        
+        self._entries[key] = entry
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        
+        return figure
+    
+    @property
+    def size_bytes(self) -> int:
+        """Суммарная оценка размера графиков (см. estimate_figure_size)"""
+        return sum(entry.size_bytes for entry in self._entries.values())
+    
+    def clear(self):
+        """Очистка кэша и статистики"""
+        self._entries.clear()
+        self.stats.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,58 @@
+"""
+Денежная арифметика с фиксированной точкой: копейки и базисные пункты в int64
+"""
+
+from decimal import Decimal
+
+import numpy as np
+
+KOPECKS_PER_RUBLE = 100
+BASIS_POINTS_PER_PERCENT = 100
+BASIS_POINTS_PER_UNIT = 100 * BASIS_POINTS_PER_PERCENT
+
+# Знаков после запятой, до которых округляется произведение перед переводом в целые:
+# убирает ошибку представления (0.145 * 100 = 14.499999...)
+_REPRESENTATION_DECIMALS = 6
+
+
+def round_half_away(values) -> np.ndarray:
+    """Арифметическое округление (0.5 - от нуля), как в бухгалтерском учете"""
+    values = np.round(np.asarray(values, dtype=np.float64), _REPRESENTATION_DECIMALS)
+    return (np.sign(values) * np.floor(np.abs(values) + 0.5)).astype(np.int64)
+
+
+def to_kopecks(rubles) -> np.ndarray:
+    """Рубли (float) в целые копейки"""
+    return round_half_away(np.asarray(rubles, dtype=np.float64) * KOPECKS_PER_RUBLE)
+
+
+def to_basis_points(percent) -> np.ndarray:
+    """Проценты (float) в целые базисные пункты (1% = 100 б.п.)"""
+    return round_half_away(np.asarray(percent, dtype=np.float64) * BASIS_POINTS_PER_PERCENT)
+
+
+def from_kopecks(kopecks) -> np.ndarray:
+    """Копейки в рубли float64 (на границе с расчетами в рублях)"""
+    return np.asarray(kopecks, dtype=np.int64) / KOPECKS_PER_RUBLE
+
+
+def mul_div_round(values, numerator, denominator: int) -> np.ndarray:
+    """
+    values * numerator / denominator в целых числах с арифметическим округлением
+
+    Промежуточное произведение не должно превышать 9.2e18 (int64): для цен
+    в копейках и ставок в базисных пунктах это суммы до ~9e10 рублей.
+    """
+    product = np.asarray(values, dtype=np.int64) * np.asarray(numerator, dtype=np.int64)
+    quotient, remainder = np.divmod(np.abs(product), denominator)
+    return np.sign(product) * (quotient + (2 * remainder >= denominator))
+
+
+def apply_rate(kopecks, basis_points) -> np.ndarray:
+    """Сумма по ставке в базисных пунктах, округленная до копейки"""
+    return mul_div_round(kopecks, basis_points, BASIS_POINTS_PER_UNIT)
+
+
+def total_rubles(kopecks) -> Decimal:
+    """Точная сумма копеек в рублях (Decimal, без ошибки округления float)"""
+    return Decimal(int(np.asarray(kopecks, dtype=np.int64).sum(dtype=np.int64))) / KOPECKS_PER_RUBLE
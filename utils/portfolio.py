@@ -0,0 +1,170 @@
+"""
+Анализ портфеля товаров по столбцовым результатам пакетного расчета
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Столбцы, по которым доступна сортировка в портфеле
+SORTABLE_COLUMNS = {
+    'monthly_profit': 'Месячная прибыль',
+    'unit_profit': 'Прибыль с единицы',
+    'profit_margin': 'Маржинальность',
+    'selling_price': 'Цена продажи',
+    'total_costs': 'Общие затраты',
+    'monthly_sales_volume': 'Объем продаж'
+}
+
+
+@dataclass
+class PortfolioPage:
+    """Одна страница отфильтрованного и отсортированного портфеля"""
+    rows: pd.DataFrame
+    total_rows: int
+    page: int
+    page_count: int
+    page_size: int
+    
+    @property
+    def first_row(self) -> int:
+        return (self.page - 1) * self.page_size + 1 if self.total_rows else 0
+    
+    @property
+    def last_row(self) -> int:
+        return min(self.page * self.page_size, self.total_rows)
+
+
+def add_monthly_profit(results: pd.DataFrame) -> pd.DataFrame:
+    """Добавление месячной прибыли по SKU (прибыль с единицы × объем продаж)"""
+    results['monthly_profit'] = results['unit_profit'].to_numpy() * results['monthly_sales_volume'].to_numpy()
+    return results
+
+
+def add_ltv_cac(results: pd.DataFrame, inputs: pd.DataFrame) -> pd.DataFrame:
+    """
+    Добавление LTV, CAC и их соотношения по SKU (формулы этапа 7 калькулятора)
+    
+    Требует во входных данных customer_lifespan_months и avg_purchases_per_year;
+    при их отсутствии результаты возвращаются без изменений.
+    """
+    if 'customer_lifespan_months' not in inputs or 'avg_purchases_per_year' not in inputs:
+        return results
+    
+    def column(name):
+        if name not in inputs:
+            return np.zeros(len(inputs))
+        return pd.to_numeric(inputs[name], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+    
+    purchases_per_customer = column('customer_lifespan_months') / 12 * column('avg_purchases_per_year')
+    ltv = (results['selling_price'].to_numpy() * purchases_per_customer
+           + column('cross_sell_revenue') + column('referral_bonus'))
+    cac = results['marketing_costs'].to_numpy()
+    
+    results['ltv'] = ltv
+    results['cac'] = cac
+    with np.errstate(divide='ignore', invalid='ignore'):
+        results['ltv_cac_ratio'] = np.where(cac > 0, ltv / cac, 0.0)
+    return results
+
+
+def _total(values: np.ndarray):
+    """Сумма с накоплением в float64 для вещественных столбцов и точная для целых (копейки)"""
+    return values.sum(dtype=np.float64 if values.dtype.kind == 'f' else None)
+
+
+def portfolio_kpis(results: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Агрегированные показатели портфеля
+    
+    Все значения считаются редукциями по массивам NumPy без обхода строк;
+    суммы накапливаются в float64 и для результатов в float32.
+    """
+    unit_profit = results['unit_profit'].to_numpy()
+    volume = results['monthly_sales_volume'].to_numpy()
+    margin = results['profit_margin'].to_numpy()
+    revenue = results['selling_price'].to_numpy() * volume
+    
+    sku_count = len(results)
+    if sku_count == 0:
+        return {
+            'sku_count': 0,
+            'total_monthly_profit': 0.0,
+            'total_monthly_revenue': 0.0,
+            'loss_making_share': 0.0,
+            'median_margin': 0.0,
+            'margin_percentiles': {}
+        }
+    
+    percentiles = (10, 25, 50, 75, 90)
+    margin_values = np.percentile(margin, percentiles)
+    
+    return {
+        'sku_count': sku_count,
+        'total_monthly_profit': float(_total(unit_profit * volume)),
+        'total_monthly_revenue': float(_total(revenue)),
+        'loss_making_share': float(np.count_nonzero(unit_profit < 0) / sku_count),
+        'median_margin': float(margin_values[2]),
+        'margin_percentiles': dict(zip(percentiles, margin_values.tolist()))
+    }
+
+
+def margin_distribution(results: pd.DataFrame, bins: int = 40,
+                        margin_range: Tuple[float, float] = (-100.0, 100.0)) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Гистограмма маржинальности (значения за пределами диапазона попадают в крайние корзины)
+    
+    Returns:
+        (количество SKU в корзине, границы корзин)
+    """
+    margin = np.clip(results['profit_margin'].to_numpy(), *margin_range)
+    return np.histogram(margin, bins=bins, range=margin_range)
+
+
+def query_portfolio(results: pd.DataFrame,
+                    marketplaces: Optional[Sequence[str]] = None,
+                    categories: Optional[Sequence[str]] = None,
+                    margin_range: Optional[Tuple[float, float]] = None,
+                    loss_making_only: bool = False,
+                    sort_by: str = 'monthly_profit',
+                    ascending: bool = False,
+                    page: int = 1,
+                    page_size: int = 200) -> PortfolioPage:
+    """
+    Фильтрация, сортировка и постраничная выборка портфеля на стороне сервера
+    
+    Фильтры и сортировка выполняются над массивами; в DataFrame страницы
+    попадают только page_size строк, которые и передаются в браузер.
+    """
+    mask = np.ones(len(results), dtype=bool)
+    
+    if marketplaces:
+        mask &= results['marketplace'].isin(marketplaces).to_numpy()
+    if categories:
+        mask &= results['category'].isin(categories).to_numpy()
+    if margin_range is not None:
+        margin = results['profit_margin'].to_numpy()
+        mask &= (margin >= margin_range[0]) & (margin <= margin_range[1])
+    if loss_making_only:
+        mask &= results['unit_profit'].to_numpy() < 0
+    
+    positions = np.flatnonzero(mask)
+    total_rows = len(positions)
+    page_count = max(1, -(-total_rows // page_size))
+    page = min(max(1, page), page_count)
+    
+    sort_values = results[sort_by].to_numpy()[positions]
+    order = np.argsort(sort_values if ascending else -sort_values, kind='stable')
+    
+    start = (page - 1) * page_size
+    page_positions = positions[order[start:start + page_size]]
+    
+    return PortfolioPage(
+        rows=results.iloc[page_positions],
+        total_rows=total_rows,
+        page=page,
+        page_count=page_count,
+        page_size=page_size
+    )
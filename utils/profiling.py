@@ -0,0 +1,330 @@
+"""
+Замер времени перезапусков (reruns) приложения и фрагментов этапов
+"""
+
+import functools
+import threading
+import weakref
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from statistics import median
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional
+
+
+class RerunTimer:
+    """
+    Скользящая статистика времени выполнения по областям
+
+    Область (scope) - произвольная строка: например, 'script:step_5' для
+    полного перезапуска скрипта на этапе 5 или 'fragment:step_5' для
+    перезапуска только фрагмента этапа.
+    """
+
+    def __init__(self, window: int = 50):
+        self.window = window
+        self.samples: Dict[str, Deque[float]] = {}
+
+    @contextmanager
+    def measure(self, scope: str) -> Iterator[None]:
+        """Замер времени выполнения блока в миллисекундах"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(scope, (time.perf_counter() - start) * 1000)
+
+    def add(self, scope: str, elapsed_ms: float):
+        """Добавление замера в окно области"""
+        if scope not in self.samples:
+            self.samples[scope] = deque(maxlen=self.window)
+        self.samples[scope].append(elapsed_ms)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Последнее значение, медиана и число замеров по каждой области"""
+        return {
+            scope: {
+                'last_ms': values[-1],
+                'median_ms': median(values),
+                'count': len(values)
+            }
+            for scope, values in self.samples.items() if values
+        }
+
+    def compare_steps(self) -> Dict[int, Dict[str, float]]:
+        """
+        Сравнение полного перезапуска скрипта и перезапуска фрагмента по этапам
+
+        Returns:
+            {номер этапа: {'script_ms': ..., 'fragment_ms': ...}} по медианам
+        """
+        comparison: Dict[int, Dict[str, float]] = {}
+        for scope, stats in self.summary().items():
+            kind, _, step = scope.partition(':step_')
+            if kind not in ('script', 'fragment') or not step.isdigit():
+                continue
+            comparison.setdefault(int(step), {})[f'{kind}_ms'] = stats['median_ms']
+        return dict(sorted(comparison.items()))
+
+
+# Трассировщик текущего перезапуска (у каждой сессии Streamlit свой поток)
+_active_tracer: ContextVar[Optional['Tracer']] = ContextVar('active_tracer', default=None)
+
+# Ограничение числа интервалов в одном перезапуске (защита от циклов по каталогу)
+MAX_SPANS_PER_RERUN = 50_000
+
+
+class Tracer:
+    """
+    Необязательная трассировка перезапуска: время и число вызовов по функциям
+    
+    Функции подключаются через TracingHooks только пока трассировка включена
+    хотя бы в одной сессии, поэтому в выключенном состоянии накладных
+    расходов нет. Сессия, закрытая с включенной трассировкой, освобождает
+    хуки, когда ее трассировщик удаляется вместе с состоянием сессии.
+    Интервалы последних перезапусков выгружаются в формате Chrome Trace
+    (chrome://tracing, Perfetto).
+    """
+    
+    def __init__(self, hooks: Optional['TracingHooks'] = None, history: int = 20):
+        self.enabled = False
+        self.hooks = hooks
+        self.reruns: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self._origin = time.perf_counter()
+        self._current: Optional[Dict[str, Any]] = None
+        self._release: Optional[weakref.finalize] = None
+    
+    def set_enabled(self, enabled: bool):
+        """Включение/выключение трассировки сессии (с подключением хуков)"""
+        if enabled == self.enabled:
+            return
+        self.enabled = enabled
+        if self.hooks is None:
+            return
+        if enabled:
+            self.hooks.acquire()
+            # Хуки освобождаются и без выключения - при удалении трассировщика
+            self._release = weakref.finalize(self, self.hooks.release)
+        else:
+            self._release()
+    
+    @contextmanager
+    def rerun(self, label: str) -> Iterator[None]:
+        """
+        Трассировка перезапуска (всего скрипта или фрагмента)
+        
+        Вложенный вызов (фрагмент внутри полного перезапуска) записывается
+        как обычный интервал текущего перезапуска.
+        """
+        if not self.enabled:
+            yield
+            return
+        
+        if _active_tracer.get() is self:
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                self.record(label, 'rerun', start, time.perf_counter())
+            return
+        
+        start = time.perf_counter()
+        self._current = {'label': label, 'start': start, 'spans': [], 'dropped': 0}
+        token = _active_tracer.set(self)
+        try:
+            yield
+        finally:
+            _active_tracer.reset(token)
+            self._current['duration_ms'] = (time.perf_counter() - start) * 1000
+            self.reruns.append(self._current)
+            self._current = None
+    
+    def record(self, name: str, category: str, start: float, end: float):
+        """Добавление интервала в текущий перезапуск"""
+        if self._current is None:
+            return
+        spans = self._current['spans']
+        if len(spans) >= MAX_SPANS_PER_RERUN:
+            self._current['dropped'] += 1
+            return
+        spans.append((name, category, start, end, threading.get_ident()))
+    
+    def last_rerun(self) -> Optional[Dict[str, Any]]:
+        """Последний завершенный перезапуск"""
+        return self.reruns[-1] if self.reruns else None
+    
+    def rerun_stats(self, rerun: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Число вызовов и время по функциям за перезапуск (по умолчанию - последний)
+        
+        Время вложенных вызовов входит во время внешних (инклюзивное время).
+        """
+        rerun = rerun or self.last_rerun()
+        if rerun is None:
+            return []
+        
+        stats: Dict[str, Dict[str, Any]] = {}
+        for name, category, start, end, _ in rerun['spans']:
+            elapsed_ms = (end - start) * 1000
+            entry = stats.setdefault(name, {
+                'name': name, 'category': category, 'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0
+            })
+            entry['calls'] += 1
+            entry['total_ms'] += elapsed_ms
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+        return sorted(stats.values(), key=lambda entry: entry['total_ms'], reverse=True)
+    
+    def untraced_ms(self, rerun: Optional[Dict[str, Any]] = None) -> float:
+        """
+        Время перезапуска вне трассируемых функций (виджеты, Streamlit, прочий код)
+        
+        Из длительности перезапуска вычитаются интервалы верхнего уровня.
+        """
+        rerun = rerun or self.last_rerun()
+        if rerun is None:
+            return 0.0
+        
+        traced_s = 0.0
+        covered_until = float('-inf')
+        for _, _, start, end, _ in sorted(rerun['spans'], key=lambda span: span[2]):
+            if start >= covered_until:
+                traced_s += end - start
+                covered_until = end
+            elif end > covered_until:
+                traced_s += end - covered_until
+                covered_until = end
+        return max(0.0, rerun['duration_ms'] - traced_s * 1000)
+    
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Интервалы сохраненных перезапусков в формате Chrome Trace Event"""
+        def to_us(moment: float) -> float:
+            return round((moment - self._origin) * 1e6, 1)
+        
+        events = []
+        for rerun in self.reruns:
+            events.append({
+                'name': rerun['label'], 'cat': 'rerun', 'ph': 'X', 'pid': 1, 'tid': 0,
+                'ts': to_us(rerun['start']), 'dur': round(rerun['duration_ms'] * 1000, 1)
+            })
+            for name, category, start, end, thread_id in rerun['spans']:
+                events.append({
+                    'name': name, 'cat': category, 'ph': 'X', 'pid': 1, 'tid': thread_id,
+                    'ts': to_us(start), 'dur': round((end - start) * 1e6, 1)
+                })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def traced(func, name: str, category: str):
+    """Обертка функции: интервал записывается, только если трассировка активна"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        tracer = _active_tracer.get()
+        if tracer is None:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            tracer.record(name, category, start, time.perf_counter())
+    wrapper.__traced__ = func
+    return wrapper
+
+
+def instrument(owner, category: str, prefix: str = '', names: Optional[Iterable[str]] = None) -> int:
+    """
+    Подключение трассировки к функциям класса, модуля или словаря globals()
+    
+    Args:
+        owner: Класс, модуль или словарь пространства имен
+        category: Категория интервалов ('calculations', 'dashboard', 'wizard'...)
+        prefix: Подключать только имена с этим префиксом
+        names: Явный список имен (по умолчанию - все функции owner)
+    
+    Returns:
+        Количество подключенных функций (повторное подключение пропускается)
+    """
+    namespace = owner if isinstance(owner, dict) else vars(owner)
+    owner_name = getattr(owner, '__name__', '')
+    count = 0
+    
+    for attr in list(names if names is not None else namespace):
+        if not attr.startswith(prefix) or attr.startswith('__'):
+            continue
+        value = namespace.get(attr)
+        is_static = isinstance(value, staticmethod)
+        func = value.__func__ if is_static else value
+        if not callable(func) or isinstance(func, type) or hasattr(func, '__traced__'):
+            continue
+        
+        wrapper = traced(func, f'{owner_name}.{attr}' if isinstance(owner, type) else attr, category)
+        wrapper = staticmethod(wrapper) if is_static else wrapper
+        if isinstance(owner, dict):
+            owner[attr] = wrapper
+        else:
+            setattr(owner, attr, wrapper)
+        count += 1
+    
+    return count
+
+
+def uninstrument(owner) -> int:
+    """Снятие трассировки с функций класса, модуля или словаря globals()"""
+    namespace = owner if isinstance(owner, dict) else vars(owner)
+    count = 0
+    
+    for attr, value in list(namespace.items()):
+        is_static = isinstance(value, staticmethod)
+        func = value.__func__ if is_static else value
+        original = getattr(func, '__traced__', None)
+        if original is None:
+            continue
+        original = staticmethod(original) if is_static else original
+        if isinstance(owner, dict):
+            owner[attr] = original
+        else:
+            setattr(owner, attr, original)
+        count += 1
+    
+    return count
+
+
+class TracingHooks:
+    """
+    Набор функций для трассировки, общий для процесса
+    
+    Обертки ставятся при первом acquire() и снимаются, когда трассировку
+    выключила последняя сессия.
+    """
+    
+    def __init__(self):
+        self.targets: List[tuple] = []
+        self.users = 0
+        self._lock = threading.Lock()
+    
+    def add(self, owner, category: str, prefix: str = ''):
+        """Регистрация класса или модуля (повторная регистрация игнорируется)"""
+        with self._lock:
+            if any(target[0] is owner for target in self.targets):
+                return
+            self.targets.append((owner, category, prefix))
+            if self.users:
+                instrument(owner, category, prefix)
+    
+    def acquire(self):
+        with self._lock:
+            if self.users == 0:
+                for owner, category, prefix in self.targets:
+                    instrument(owner, category, prefix)
+            self.users += 1
+    
+    def release(self):
+        with self._lock:
+            self.users = max(0, self.users - 1)
+            if self.users == 0:
+                for owner, _, _ in self.targets:
+                    uninstrument(owner)
+
+
+# Общий для процесса набор трассируемых функций
+TRACING_HOOKS = TracingHooks()
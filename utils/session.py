@@ -0,0 +1,356 @@
+"""
+Компактная модель данных калькулятора в состоянии сессии
+"""
+
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from utils.calculations import shared_calculator
+
+# Результаты calculate_unit_economics (кроме selling_price - это ввод):
+# появляются после расчета на этапе 8 и пересчитываются из вводов
+RESULT_KEYS = ('total_cogs', 'marketplace_costs', 'marketing_costs', 'operational_costs',
+               'total_costs', 'unit_profit', 'profit_margin', 'contribution_margin', 'breakeven_price')
+
+
+def _ratio(numerator: float, denominator: float) -> float:
+    return numerator / denominator if denominator > 0 else 0
+
+
+# Показатели этапов мастера - единственное место их формул: этапы app.py
+# сохраняют вводы и читают показатели из сессии.
+# Ключ -> (исходные ключи, формула). Показатель есть, когда есть все
+# исходные ключи, и не хранится - пересчитывается при обращении.
+STEP_RESULTS: Dict[str, Tuple[Tuple[str, ...], Callable[..., float]]] = {
+    # Этап 3
+    'total_cost': (('purchase_cost', 'packaging_cost', 'labeling_cost', 'quality_control', 'certification'),
+                   lambda purchase, packaging, labeling, quality, certification:
+                   purchase + packaging + labeling + quality + certification),
+    # Этап 4
+    'commission_amount': (('selling_price', 'commission_rate'), lambda price, rate: price * (rate / 100)),
+    'payment_amount': (('selling_price', 'payment_processing'), lambda price, rate: price * (rate / 100)),
+    # 2% обязательная маркетинговая комиссия OZON
+    'mandatory_marketing': (('marketplace', 'selling_price'),
+                            lambda marketplace, price: price * 0.02 if marketplace == "OZON" else 0),
+    'total_marketplace_costs': (('commission_amount', 'fulfillment_cost', 'storage_total', 'payment_amount',
+                                 'mandatory_marketing'),
+                                lambda commission, fulfillment, storage, payment, mandatory:
+                                commission + fulfillment + storage + payment + mandatory),
+    # Этап 5
+    'ppc_cost_per_unit': (('selling_price', 'ppc_budget_percent'), lambda price, percent: price * (percent / 100)),
+    'cac_ppc': (('avg_cpc', 'conversion_rate'), lambda cpc, conversion: _ratio(cpc, conversion / 100)),
+    'total_marketing_costs': (('ppc_cost_per_unit', 'external_marketing', 'influencer_marketing', 'content_creation'),
+                              lambda ppc, external, influencer, content: ppc + external + influencer + content),
+    # Этап 6
+    'return_cost_per_unit': (('return_rate', 'return_cost'), lambda rate, cost: (rate / 100) * cost),
+    'total_operational_costs': (('fixed_cost_per_unit', 'customer_service', 'return_cost_per_unit'),
+                                lambda fixed, service, returns: fixed + service + returns),
+    # Этап 7
+    'purchases_per_customer': (('customer_lifespan_months', 'avg_purchases_per_year'),
+                               lambda months, purchases: (months / 12) * purchases),
+    'ltv': (('selling_price', 'purchases_per_customer', 'cross_sell_revenue', 'referral_bonus'),
+            lambda price, purchases, cross_sell, referral: price * purchases + cross_sell + referral),
+    'ltv_cac_ratio': (('ltv', 'cac'), _ratio),
+    'payback_period': (('cac', 'selling_price', 'avg_purchases_per_year'),
+                       lambda cac, price, purchases: cac / (price * purchases / 12) if price > 0 and purchases > 0 else 0),
+}
+
+# Производные данные, которые нельзя пересчитать без контекста этапа
+# (сценарии этапа 9): сбрасываются при изменении вводов, этап считает их заново
+DERIVED_KEYS = ('scenarios',)
+
+
+class _Missing:
+    """Отсутствие ключа в структурном диффе"""
+    
+    def __repr__(self):
+        return 'MISSING'
+    
+    def __reduce__(self):
+        return 'MISSING'
+
+
+MISSING = _Missing()
+
+
+class CalculatorSession(MutableMapping):
+    """
+    Данные калькулятора: вводы, кэш результатов и история отмены
+    
+    Ведет себя как словарь calculator_data (get, update, in, dict(...)),
+    но хранит постоянно только вводы. Результаты расчета и показатели этапов
+    (STEP_RESULTS) лежат в кэше, который можно вытеснить (evict_results):
+    при следующем обращении они пересчитываются из вводов. Необязательная
+    история отмены (history_size) хранит только прежние значения изменившихся
+    ключей каждого обновления: {ключ: было}; значения для повтора берутся из
+    вводов в момент отмены.
+    """
+    
+    # Без __dict__ у каждой сессии: объект живет в состоянии каждого пользователя
+    __slots__ = ('_inputs', '_results', '_derived', '_has_results', '_history_size', '_undo', '_redo')
+    
+    def __init__(self, data: Optional[Mapping[str, Any]] = None, history_size: int = 0):
+        self._inputs: Dict[str, Any] = {}
+        self._results: Optional[Dict[str, Any]] = None
+        self._derived: Optional[Dict[str, Any]] = None
+        self._has_results = False
+        self._history_size = history_size
+        # Списки истории создаются только при включенной истории
+        self._undo: Optional[List[Dict[str, Any]]] = [] if history_size else None
+        self._redo: Optional[List[Dict[str, Any]]] = [] if history_size else None
+        if data:
+            self.update(data)
+            self.clear_history()
+    
+    # Словарный интерфейс
+    
+    def __getitem__(self, key: str) -> Any:
+        if key in self._inputs:
+            return self._inputs[key]
+        if self._derived and key in self._derived:
+            return self._derived[key]
+        if self._results and key in self._results:
+            return self._results[key]
+        if key in RESULT_KEYS and self._has_results:
+            return self._compute_results()[key]
+        if key in STEP_RESULTS and self._is_step_result(key):
+            sources, formula = STEP_RESULTS[key]
+            value = formula(*(self[source] for source in sources))
+            self._cache(key, value)
+            return value
+        raise KeyError(key)
+    
+    def __setitem__(self, key: str, value: Any):
+        self.update({key: value})
+    
+    def __delitem__(self, key: str):
+        if key in self._inputs:
+            self._apply({key: MISSING}, record=True)
+        elif self._derived and key in self._derived:
+            del self._derived[key]
+        elif key in RESULT_KEYS and self._has_results:
+            self._has_results = False
+            self._results = None
+        else:
+            raise KeyError(key)
+    
+    def __iter__(self) -> Iterator[str]:
+        yield from self._inputs
+        yield from (key for key in STEP_RESULTS if self._is_step_result(key))
+        if self._has_results:
+            yield from (key for key in RESULT_KEYS if key not in self._inputs)
+        if self._derived:
+            yield from (key for key in self._derived if key not in self._inputs)
+    
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+    
+    def __contains__(self, key: object) -> bool:
+        return (key in self._inputs
+                or (self._has_results and key in RESULT_KEYS)
+                or (key in STEP_RESULTS and self._is_step_result(key))
+                or bool(self._derived and key in self._derived))
+    
+    def __repr__(self) -> str:
+        return f"CalculatorSession({dict(self)!r})"
+    
+    def copy(self) -> Dict[str, Any]:
+        """Плоский словарь (как у прежнего calculator_data)"""
+        return dict(self)
+    
+    def update(self, other: Any = (), **kwargs):
+        """
+        Обновление вводов и результатов одной операцией
+        
+        Изменившиеся вводы записываются в историю одним диффом и сбрасывают
+        кэш результатов и производные данные. Результаты и показатели этапов
+        не сохраняются: они пересчитываются из вводов.
+        """
+        items = dict(other, **kwargs)
+        
+        changes = {}
+        for key, value in items.items():
+            if key in RESULT_KEYS or key in DERIVED_KEYS or key in STEP_RESULTS:
+                continue
+            previous = self._inputs.get(key, MISSING)
+            if previous is MISSING or previous != value:
+                changes[key] = value
+        
+        # Показатель этапа без исходных данных (например, из старого сохраненного
+        # расчета) хранится как ввод, пока исходные данные не появятся
+        inputs = {**self._inputs, **changes}
+        for key in STEP_RESULTS:
+            if key not in items:
+                continue
+            if not self._has_sources(key, inputs):
+                if self._inputs.get(key, MISSING) != items[key]:
+                    changes[key] = items[key]
+            elif key in self._inputs:
+                changes[key] = MISSING
+        
+        if changes:
+            self._apply(changes, record=True)
+        
+        for key, value in items.items():
+            if key in RESULT_KEYS:
+                self._has_results = True
+            elif key in DERIVED_KEYS:
+                if self._derived is None:
+                    self._derived = {}
+                self._derived[key] = value
+    
+    # Вводы и кэш результатов
+    
+    @property
+    def inputs(self) -> Dict[str, Any]:
+        """Вводы пользователя (без результатов)"""
+        return dict(self._inputs)
+    
+    @property
+    def results(self) -> Dict[str, Any]:
+        """Результаты calculate_unit_economics (пустые до расчета на этапе 8)"""
+        if not self._has_results:
+            return {}
+        results = self._compute_results()
+        return {key: results[key] for key in RESULT_KEYS}
+    
+    @property
+    def has_results(self) -> bool:
+        """Выполнен ли расчет (этап 8)"""
+        return self._has_results
+    
+    def evict_results(self):
+        """Вытеснение кэша результатов и показателей этапов (производные данные сохраняются)"""
+        self._results = None
+    
+    def restore_results(self, results: Mapping[str, Any]):
+        """
+        Заполнение кэша готовыми результатами (снимок того же движка расчета)
+        
+        Принимаются только результаты и показатели этапов, которые сессия
+        сама вычислила бы из текущих вводов; остальное пересчитывается.
+        """
+        # Результаты calculate_unit_economics кэшируются только все вместе
+        if self._has_results and all(key in results for key in RESULT_KEYS):
+            for key in RESULT_KEYS:
+                self._cache(key, results[key])
+        for key in STEP_RESULTS:
+            if key in results and self._is_step_result(key):
+                self._cache(key, results[key])
+    
+    def _cache(self, key: str, value: Any):
+        if self._results is None:
+            self._results = {}
+        self._results[key] = value
+    
+    def _compute_results(self) -> Dict[str, Any]:
+        if self._results is None or RESULT_KEYS[0] not in self._results:
+            result = shared_calculator().calculate_unit_economics(self)
+            for key in RESULT_KEYS:
+                self._cache(key, result[key])
+        return self._results
+    
+    def _is_step_result(self, key: str) -> bool:
+        """Показатель этапа считается из вводов (и не хранится как ввод)"""
+        return key not in self._inputs and self._has_sources(key, self._inputs)
+    
+    @staticmethod
+    def _has_sources(key: str, inputs: Mapping[str, Any]) -> bool:
+        """Есть ли все исходные данные показателя этапа (напрямую или через другие показатели)"""
+        return all(source in inputs or (source in STEP_RESULTS and CalculatorSession._has_sources(source, inputs))
+                   for source in STEP_RESULTS[key][0])
+    
+    # История отмены
+    
+    @property
+    def history_size(self) -> int:
+        """Глубина истории отмены (0 - история выключена)"""
+        return self._history_size
+    
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+    
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+    
+    def undo(self) -> Dict[str, Any]:
+        """
+        Отмена последнего изменения вводов
+        
+        Returns:
+            Восстановленные значения {ключ: значение} (MISSING - ключ удален)
+        """
+        if not self._undo:
+            return {}
+        previous = self._undo.pop()
+        self._push(self._redo, self._apply(previous))
+        return previous
+    
+    def redo(self) -> Dict[str, Any]:
+        """Повтор отмененного изменения; возвращает примененные значения"""
+        if not self._redo:
+            return {}
+        values = self._redo.pop()
+        self._push(self._undo, self._apply(values))
+        return values
+    
+    def clear_history(self):
+        if self._history_size:
+            self._undo.clear()
+            self._redo.clear()
+    
+    def _apply(self, values: Dict[str, Any], record: bool = False) -> Dict[str, Any]:
+        """
+        Запись значений {ключ: значение} во вводы (MISSING - удаление ключа)
+        
+        Returns:
+            Прежние значения тех же ключей - дифф для обратной операции
+        """
+        previous = {key: self._inputs.get(key, MISSING) for key in values}
+        for key, value in values.items():
+            if value is MISSING:
+                self._inputs.pop(key, None)
+            else:
+                self._inputs[key] = value
+        
+        # Результаты и сценарии по прежним вводам устарели
+        self._results = None
+        self._derived = None
+        
+        if record and self._history_size:
+            self._push(self._undo, previous)
+            self._redo.clear()
+        return previous
+    
+    def _push(self, history: List[Dict[str, Any]], values: Dict[str, Any]):
+        """Добавление диффа в историю с вытеснением самого старого"""
+        history.append(values)
+        if len(history) > self._history_size:
+            del history[0]
+    
+    # Сохранение
+    
+    def to_dict(self, include_results: bool = True) -> Dict[str, Any]:
+        """Плоский словарь; без результатов - только то, из чего они пересчитываются"""
+        if include_results:
+            return dict(self)
+        return {**self._inputs, **(self._derived or {})}
+    
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any], has_results: bool = False,
+                  history_size: int = 0) -> 'CalculatorSession':
+        """Восстановление из плоского словаря (сохраненного расчета)"""
+        session = cls(data, history_size=history_size)
+        if has_results:
+            session._has_results = True
+        return session
+    
+    def __getstate__(self):
+        # Кэш результатов не сериализуется - он пересчитывается из вводов
+        return (self._inputs, self._derived, self._has_results, self._history_size, self._undo, self._redo)
+    
+    def __setstate__(self, state):
+        (self._inputs, self._derived, self._has_results, self._history_size, self._undo, self._redo) = state
+        self._results = None
@@ -0,0 +1,138 @@
+"""
+Бинарный снимок сессии калькулятора: вводы, результаты и прогресс мастера
+
+Формат: заголовок (сигнатура, версия схемы, кодек) и тело в msgpack или,
+если пакет не установлен, в компактном JSON. Вместе с результатами
+сохраняется отпечаток движка расчета: при восстановлении той же версией
+результаты сразу попадают в кэш сессии и не пересчитываются.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterable, Tuple
+
+import numpy as np
+
+from utils import calculations, data_models, money, session as session_module
+from utils.session import CalculatorSession
+
+try:
+    import msgpack
+except ImportError:  # необязательный компактный сериализатор
+    msgpack = None
+
+SNAPSHOT_MAGIC = b'UECS'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_EXTENSION = 'uecs'
+
+# Кодек тела снимка (байт заголовка)
+CODEC_MSGPACK = 1
+CODEC_JSON = 2
+
+_HEADER_SIZE = len(SNAPSHOT_MAGIC) + 2
+
+
+def engine_version() -> str:
+    """Отпечаток движка расчета - хэш исходного кода формул, их входных данных и модели сессии"""
+    digest = hashlib.blake2b(digest_size=8)
+    for module in (calculations, data_models, money, session_module):
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _plain(value: Any) -> Any:
+    """Скаляры numpy в типах Python (для сериализаторов)"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"Значение типа {type(value).__name__} не сериализуется в снимок")
+
+
+def _encode(payload: Dict[str, Any], backend: str) -> Tuple[int, bytes]:
+    if backend == 'auto':
+        backend = 'msgpack' if msgpack is not None else 'json'
+    
+    if backend == 'msgpack':
+        if msgpack is None:
+            raise ImportError("Для backend='msgpack' установите пакет msgpack")
+        return CODEC_MSGPACK, msgpack.packb(payload, default=_plain, use_bin_type=True)
+    if backend == 'json':
+        return CODEC_JSON, json.dumps(payload, ensure_ascii=False, separators=(',', ':'), default=_plain).encode('utf-8')
+    raise ValueError(f"Неизвестный сериализатор: {backend}")
+
+
+def _decode(codec: int, body: bytes) -> Dict[str, Any]:
+    if codec == CODEC_MSGPACK:
+        if msgpack is None:
+            raise ImportError("Снимок записан в msgpack: установите пакет msgpack")
+        return msgpack.unpackb(body, raw=False, strict_map_key=False)
+    if codec == CODEC_JSON:
+        return json.loads(body)
+    raise ValueError(f"Неизвестный кодек снимка: {codec}")
+
+
+def dumps(session: CalculatorSession, current_step: int = 1,
+          completed_steps: Iterable[int] = (), backend: str = 'auto') -> bytes:
+    """
+    Снимок сессии в байтах
+    
+    Args:
+        session: Данные калькулятора
+        current_step: Текущий этап мастера
+        completed_steps: Пройденные этапы
+        backend: 'msgpack', 'json' или 'auto' (msgpack, если установлен)
+    """
+    inputs = session.to_dict(include_results=False)
+    results = {key: value for key, value in session.to_dict().items() if key not in inputs}
+    payload = {
+        'inputs': inputs,
+        'results': results,
+        'has_results': session.has_results,
+        'engine': engine_version(),
+        'current_step': int(current_step),
+        'completed_steps': sorted(int(step) for step in completed_steps),
+    }
+    codec, body = _encode(payload, backend)
+    return SNAPSHOT_MAGIC + bytes((SNAPSHOT_VERSION, codec)) + body
+
+
+def loads(data: bytes, history_size: int = 0) -> Tuple[CalculatorSession, int, set]:
+    """
+    Восстановление сессии из снимка
+    
+    Результаты из снимка той же версии движка заполняют кэш сессии;
+    иначе они пересчитываются из вводов при первом обращении.
+    
+    Returns:
+        (данные калькулятора, текущий этап, пройденные этапы)
+    
+    Raises:
+        ValueError: Файл не является снимком или поврежден
+        ImportError: Снимок записан в msgpack, а пакет не установлен
+    """
+    if data[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC or len(data) < _HEADER_SIZE:
+        raise ValueError("Файл не является снимком расчета")
+    version, codec = data[len(SNAPSHOT_MAGIC)], data[len(SNAPSHOT_MAGIC) + 1]
+    if version > SNAPSHOT_VERSION:
+        raise ValueError(f"Снимок версии {version} записан более новой версией приложения")
+    
+    try:
+        payload = _decode(codec, data[_HEADER_SIZE:])
+        session = CalculatorSession.from_dict(payload['inputs'], has_results=bool(payload['has_results']),
+                                              history_size=history_size)
+        if payload['engine'] == engine_version():
+            session.restore_results(payload['results'])
+        current_step = int(payload['current_step'])
+        completed_steps = {int(step) for step in payload['completed_steps']}
+    except (KeyError, TypeError, ValueError) as e:
+        # Обрезанное тело, ошибка кодека или структура не той формы
+        raise ValueError(f"Снимок поврежден ({type(e).__name__}: {e})") from e
+    return session, current_step, completed_steps
+
+
+def is_snapshot(filename: str) -> bool:
+    """Файл снимка по расширению"""
+    return os.path.splitext(filename)[1].lower() == f".{SNAPSHOT_EXTENSION}"
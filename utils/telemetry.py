@@ -0,0 +1,219 @@
+"""
+Телеметрия перезапусков: время, размер состояния сессии и время страниц
+
+Записи пишутся в локальную базу SQLite; старые записи удаляются.
+Отчет по базе:
+    python -m utils.telemetry report --db telemetry.sqlite3
+"""
+
+import argparse
+import atexit
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_DB_PATH = 'telemetry.sqlite3'
+
+# Хранение записей и буферизация вставок
+RETENTION_DAYS = 14
+FLUSH_INTERVAL_S = 5.0
+FLUSH_BATCH_SIZE = 200
+PRUNE_INTERVAL_S = 3600.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reruns (
+    ts REAL NOT NULL,
+    session_id TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    page TEXT,
+    wall_ms REAL NOT NULL,
+    page_ms REAL,
+    state_bytes INTEGER,
+    calculator_bytes INTEGER
+);
+CREATE INDEX IF NOT EXISTS reruns_ts ON reruns (ts);
+"""
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Оценка размера значения в сериализованном виде (байты)
+    
+    Таблицы и массивы оцениваются по памяти без сериализации - иначе
+    большой портфель сериализовался бы на каждом перезапуске.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=False).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=False))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if hasattr(value, 'size_bytes'):
+        # Объекты-кэши сообщают свой размер сами (например, FigureCache)
+        return int(value.size_bytes)
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        # Несериализуемые объекты (кэши, трассировщик) не входят в размер
+        return 0
+
+
+def session_state_size(state: Mapping[str, Any]) -> Dict[str, int]:
+    """Размер состояния сессии по ключам"""
+    return {str(key): estimate_size(state[key]) for key in list(state.keys())}
+
+
+class TelemetryStore:
+    """
+    Хранилище телеметрии в SQLite, общее для всех сессий процесса
+    
+    Вставки буферизуются и сбрасываются пачкой раз в несколько секунд.
+    Записи старше retention_days удаляются при открытии базы и затем
+    при сбросе буфера, не чаще раза в prune_interval секунд.
+    """
+    
+    def __init__(self, path: str = DEFAULT_DB_PATH, retention_days: float = RETENTION_DAYS,
+                 flush_interval: float = FLUSH_INTERVAL_S, prune_interval: float = PRUNE_INTERVAL_S):
+        self.path = path
+        self.retention_days = retention_days
+        self.flush_interval = flush_interval
+        self.prune_interval = prune_interval
+        self._buffer: List[Tuple] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.executescript(SCHEMA)
+        self._prune()
+        self._connection.commit()
+        # Остаток буфера записывается при завершении процесса
+        atexit.register(self.flush)
+    
+    def record(self, session_id: str, scope: str, wall_ms: float,
+               page: Optional[str] = None, page_ms: Optional[float] = None,
+               state_sizes: Optional[Dict[str, int]] = None):
+        """Запись одного перезапуска (скрипта или фрагмента)"""
+        state_sizes = state_sizes or {}
+        row = (time.time(), session_id, scope, page, wall_ms, page_ms,
+               sum(state_sizes.values()), state_sizes.get('calculator_data'))
+        with self._lock:
+            self._buffer.append(row)
+            if (len(self._buffer) >= FLUSH_BATCH_SIZE
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush()
+    
+    def flush(self):
+        """Принудительная запись буфера в базу"""
+        with self._lock:
+            self._flush()
+    
+    def _flush(self):
+        # Долго работающий сервер удаляет устаревшие записи и без перезапуска
+        if time.monotonic() - self._last_prune >= self.prune_interval:
+            self._prune()
+        if self._buffer:
+            self._connection.executemany('INSERT INTO reruns VALUES (?, ?, ?, ?, ?, ?, ?, ?)', self._buffer)
+            self._buffer.clear()
+        if self._connection.in_transaction:
+            self._connection.commit()
+        self._last_flush = time.monotonic()
+    
+    def _prune(self):
+        """Удаление записей старше retention_days (без commit)"""
+        self._connection.execute('DELETE FROM reruns WHERE ts < ?', (time.time() - self.retention_days * 86400,))
+        self._last_prune = time.monotonic()
+    
+    def close(self):
+        self.flush()
+        self._connection.close()
+        atexit.unregister(self.flush)
+
+
+def build_report(path: str = DEFAULT_DB_PATH, since_hours: Optional[float] = None,
+                 top_sessions: int = 10) -> Dict[str, Any]:
+    """
+    Сводка по базе телеметрии
+    
+    Returns:
+        Перцентили времени перезапусков (всего и по страницам)
+        и сессии с наибольшим размером состояния
+    """
+    connection = sqlite3.connect(path)
+    try:
+        since = time.time() - since_hours * 3600 if since_hours else 0
+        frame = pd.read_sql_query(
+            'SELECT session_id, scope, page, wall_ms, page_ms, state_bytes, calculator_bytes '
+            'FROM reruns WHERE ts >= ?', connection, params=(since,)
+        )
+    finally:
+        connection.close()
+    
+    def percentiles(values: pd.Series) -> Dict[str, float]:
+        p50, p95, p99 = np.percentile(values.to_numpy(), [50, 95, 99]) if len(values) else (0.0, 0.0, 0.0)
+        return {'count': int(len(values)), 'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99)}
+    
+    scripts = frame[frame['scope'].str.startswith('script')]
+    sessions = (frame.groupby('session_id')
+                .agg(reruns=('wall_ms', 'size'),
+                     max_state_bytes=('state_bytes', 'max'),
+                     max_calculator_bytes=('calculator_bytes', 'max'))
+                .sort_values('max_state_bytes', ascending=False)
+                .head(top_sessions))
+    
+    return {
+        'reruns': percentiles(scripts['wall_ms']),
+        'fragments': percentiles(frame.loc[frame['scope'].str.startswith('fragment'), 'wall_ms']),
+        'pages': {
+            page: percentiles(group['page_ms'].dropna())
+            for page, group in scripts.groupby('page')
+        },
+        'largest_sessions': sessions.reset_index().to_dict('records')
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    """Вывод сводки телеметрии в консоль"""
+    def line(title: str, stats: Dict[str, float]):
+        print(f"  {title:<28} n={stats['count']:<7} p50={stats['p50_ms']:8.1f} мс  "
+              f"p95={stats['p95_ms']:8.1f} мс  p99={stats['p99_ms']:8.1f} мс")
+    
+    print("Время перезапусков:")
+    line("Весь скрипт", report['reruns'])
+    line("Фрагменты этапов", report['fragments'])
+    
+    print("\nВремя отрисовки страниц:")
+    for page, stats in report['pages'].items():
+        line(page, stats)
+    
+    print("\nСессии с наибольшим состоянием:")
+    for session in report['largest_sessions']:
+        calculator_kb = (session['max_calculator_bytes'] or 0) / 1024
+        print(f"  {session['session_id']:<36} {session['max_state_bytes'] / 1024:10.1f} КБ  "
+              f"(calculator_data {calculator_kb:.1f} КБ, перезапусков: {session['reruns']})")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Телеметрия приложения")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    report_parser = subparsers.add_parser('report', help="Сводка p50/p95 и крупнейшие сессии")
+    report_parser.add_argument('--db', default=DEFAULT_DB_PATH, help="Путь к базе телеметрии")
+    report_parser.add_argument('--since-hours', type=float, help="Только записи за последние N часов")
+    report_parser.add_argument('--top', type=int, default=10, help="Количество сессий в списке")
+    args = parser.parse_args()
+    
+    if not os.path.exists(args.db):
+        print(f"ОШИБКА: база телеметрии {args.db} не найдена")
+        sys.exit(1)
+    
+    try:
+        print_report(build_report(args.db, since_hours=args.since_hours, top_sessions=args.top))
+    except (sqlite3.Error, pd.errors.DatabaseError) as e:
+        print(f"ОШИБКА: не удалось прочитать базу телеметрии {args.db}: {e}")
+        sys.exit(1)